@@ -0,0 +1,55 @@
+"""Benchmark the client caches against the previous dictionary-based eviction.
+
+Usage: python benchmarks/cache_benchmark.py [size ...]
+"""
+import random
+import sys
+import time
+
+from pycordia import cache
+
+
+def bench_dict(size: int, operations: int) -> float:
+    # The eviction the client used before `pycordia.cache` existed,
+    # timed on a full cache since that is where its cost lies
+    data = dict.fromkeys(range(size))
+    start = time.perf_counter()
+    for i in range(size, size + operations):
+        if len(data.keys()) >= size:
+            first = list(data.keys())[0]
+            del data[first]
+        data[i] = i
+    return time.perf_counter() - start
+
+
+def bench_cache(cache_type, size: int, operations: int) -> float:
+    store = cache_type(size)
+    keys = list(range(operations))
+    lookups = random.Random(0).choices(keys, k=operations)
+
+    start = time.perf_counter()
+    for key, lookup in zip(keys, lookups):
+        store[key] = key
+        store.get(lookup)
+    elapsed = time.perf_counter() - start
+
+    print(f"  {cache_type.__name__:<10} {elapsed:8.3f}s  {store.stats}")
+    return elapsed
+
+
+def main(sizes):
+    for size in sizes:
+        operations = size * 2
+        print(f"size={size:,} operations={operations:,}")
+
+        for cache_type in (cache.LRUCache, cache.TTLCache, cache.LFUCache):
+            bench_cache(cache_type, size, operations)
+
+        # The old eviction is O(n) per insert; only sample a few hundred inserts
+        sample = 200
+        per_op = bench_dict(size, sample) / sample
+        print(f"  {'dict':<10} {per_op * operations:8.3f}s  (extrapolated from {sample} inserts)")
+
+
+if __name__ == "__main__":
+    main([int(float(arg)) for arg in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,76 @@
+"""Measure gateway event and REST throughput against a local fake Discord.
+
+Events are sent as zlib-stream frames and go through the client's gateway
+connection and `Client.call_event_handler`. REST requests are message sends
+going through the scheduler, rate limiter and retry policy.
+
+Usage: python benchmarks/gateway_benchmark.py [events] [requests]
+"""
+import asyncio
+import sys
+import time
+
+import pycordia
+from pycordia import models
+from pycordia.testing import FakeDiscord, message_events
+
+
+async def bench_events(count: int):
+    async with FakeDiscord(events=message_events(count)) as server:
+        client = pycordia.Client(intents=pycordia.Intents.all())
+        received = 0
+        done = asyncio.Event()
+
+        @client.event
+        async def on_message_create(message):
+            nonlocal received
+            received += 1
+            if received == count:
+                done.set()
+
+        await client.setup_http("token")
+        client.ws.bot_token = "token"
+
+        start = time.perf_counter()
+        gateway = asyncio.ensure_future(client.ws.start())
+        await done.wait()
+        elapsed = time.perf_counter() - start
+
+        gateway.cancel()
+        await client.ws.sock.close()
+        await client.http.close()
+
+    print(f"{'gateway events':<16} {count / elapsed:10,.0f} events/s "
+          f"({elapsed / count * 1e6:.1f}us per event, identifies={server.identifies})")
+
+
+async def bench_rest(count: int, limit: int):
+    async with FakeDiscord(ratelimit_limit=limit, ratelimit_reset_after=0.1) as server:
+        client = pycordia.Client(intents=pycordia.Intents.all())
+        await client.setup_http("token")
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            models.Message.send(str(810000000000000000 + i % 10), content=f"Message {i}")
+            for i in range(count)
+        ), return_exceptions=True)
+        elapsed = time.perf_counter() - start
+        await client.http.close()
+
+    print(f"{'message sends':<16} {count / elapsed:10,.0f} requests/s "
+          f"(limit {limit} per 0.1s per channel, 429 responses={server.rate_limited}, "
+          f"failed={sum(isinstance(result, Exception) for result in results)})")
+
+
+def main(events: int, requests: int):
+    print(f"events={events:,} requests={requests:,}")
+    asyncio.run(bench_events(events))
+    asyncio.run(bench_rest(requests, 1000))
+    asyncio.run(bench_rest(requests, 5))
+
+
+if __name__ == "__main__":
+    main(
+        int(float(sys.argv[1])) if len(sys.argv) > 1 else 20_000,
+        int(float(sys.argv[2])) if len(sys.argv) > 2 else 2_000
+    )
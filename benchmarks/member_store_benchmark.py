@@ -0,0 +1,93 @@
+"""Compare the memory used by `models.Member` objects and a `CompactMemberStore`.
+
+Usage: python benchmarks/member_store_benchmark.py [members]
+"""
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+from pycordia import models, state
+
+ROLE_IDS = [str(881000000000000000 + i) for i in range(40)]
+
+
+def make_payloads(count: int):
+    rng = random.Random(0)
+    for i in range(count):
+        user_id = 170000000000000000 + i * 4096 + rng.randrange(4096)
+        yield {
+            "user": {
+                "id": str(user_id),
+                "username": f"user{i}",
+                "discriminator": f"{rng.randrange(10000):04}",
+                "avatar": None
+            },
+            "nick": None,
+            "roles": rng.sample(ROLE_IDS, rng.randrange(4)),
+            "joined_at": "2021-06-01T12:30:45.123000+00:00",
+            "deaf": False,
+            "mute": False,
+            "pending": False
+        }
+
+
+def measure(label: str, build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<20} {size / 2**20:9.1f} MiB  {elapsed:7.2f}s to build")
+    return result
+
+
+def main(count: int):
+    print(f"members={count:,}")
+
+    def build_models():
+        return {payload["user"]["id"]: models.Member(payload) for payload in make_payloads(count)}
+
+    def build_compact():
+        store = state.CompactMemberStore()
+        for payload in make_payloads(count):
+            store.add("1", models.Member(payload))
+        return store
+
+    def build_compact_chunks():
+        store = state.CompactMemberStore()
+        payloads = list(make_payloads(count))
+        # Discord sends members in chunks of up to 1000
+        for start in range(0, len(payloads), 1000):
+            store.add_payloads("1", payloads[start:start + 1000])
+        return store
+
+    members = measure("models.Member dict", build_models)
+    del members
+
+    store = measure("CompactMemberStore", build_compact)
+    del store
+
+    store = measure("  from chunks", build_compact_chunks)
+
+    user_ids = store.guild_user_ids("1")
+    sample = random.Random(1).sample(user_ids, min(len(user_ids), 10_000))
+
+    start = time.perf_counter()
+    for user_id in sample:
+        store.get_member("1", user_id)
+    elapsed = time.perf_counter() - start
+    print(f"lookup by user ID: {elapsed / len(sample) * 1e6:.2f}us per member")
+
+    start = time.perf_counter()
+    with_role = store.user_ids_with_role("1", ROLE_IDS[0])
+    elapsed = time.perf_counter() - start
+    print(f"lookup by role: {len(with_role):,} members in {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main(int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000)
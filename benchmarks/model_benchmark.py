@@ -0,0 +1,88 @@
+"""Measure the memory used by models and how fast they are constructed.
+
+Payloads are taken from the interaction fixtures in `examples/`, with the
+IDs changed for every copy so that snowflakes are not shared between objects.
+
+Usage: python benchmarks/model_benchmark.py [objects]
+"""
+import copy
+import gc
+import json
+import pathlib
+import sys
+import time
+import tracemalloc
+
+from pycordia import models
+
+EXAMPLES = pathlib.Path(__file__).resolve().parent.parent / "examples"
+
+
+def load_fixtures():
+    fixtures = {"messages": [], "members": [], "users": []}
+
+    for path in sorted(EXAMPLES.glob("*.json")):
+        with open(path) as fp:
+            interaction = json.load(fp)
+
+        resolved = interaction.get("data", {}).get("resolved", {})
+        fixtures["messages"].extend(resolved.get("messages", {}).values())
+        fixtures["users"].extend(resolved.get("users", {}).values())
+
+        if "member" in interaction:
+            fixtures["members"].append(interaction["member"])
+            fixtures["users"].append(interaction["member"]["user"])
+
+    return fixtures
+
+
+def make_payloads(samples: list, count: int):
+    payloads = []
+    for i in range(count):
+        payload = copy.deepcopy(samples[i % len(samples)])
+        payload["id"] = str(900000000000000000 + i)
+        if "user" in payload:
+            payload["user"]["id"] = payload["id"]
+        payloads.append(payload)
+    return payloads
+
+
+def read_common(message: models.Message):
+    # The attributes most handlers look at
+    return message.content, message.author.id, message.channel_id
+
+
+def measure(label: str, model, payloads: list, use=None):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    objects = [model(payload) for payload in payloads]
+    if use:
+        for obj in objects:
+            use(obj)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = len(objects)
+    print(
+        f"{label:<15} {size / count:8.0f} bytes/object  "
+        f"{elapsed / count * 1e6:7.2f}us/object"
+    )
+
+
+def main(count: int):
+    fixtures = load_fixtures()
+    print(f"objects={count:,}")
+
+    messages = make_payloads(fixtures["messages"], count)
+    measure("Message", models.Message, messages, read_common)
+    measure(
+        "Message (lazy)", lambda payload: models.Message(payload, lazy=True), messages, read_common
+    )
+    measure("Member", models.Member, make_payloads(fixtures["members"], count))
+    measure("User", models.User, make_payloads(fixtures["users"], count))
+
+
+if __name__ == "__main__":
+    main(int(float(sys.argv[1])) if len(sys.argv) > 1 else 100_000)
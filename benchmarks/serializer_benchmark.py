@@ -0,0 +1,103 @@
+"""Compare the cached serializers in `pycordia.utils` with the previous
+inspect-based implementations, on component-heavy payloads.
+
+Usage: python benchmarks/serializer_benchmark.py [messages]
+"""
+import inspect
+import sys
+import time
+
+from pycordia import models, utils
+from pycordia.interactions import components
+
+
+def legacy_obj_from_dict(data: dict, obj, alias: dict = None):
+    sig = inspect.signature(obj)
+    new_inf = {}
+    for param in sig.parameters:
+        if alias and param in alias:
+            new_inf[param] = data[alias[param]]
+        elif param in data:
+            new_inf[param] = data[param]
+
+    return obj(**new_inf)
+
+
+def legacy_obj_to_dict(obj, *, alias: dict = None, ignore_fields: list = None):
+    new_inf = {}
+    if ignore_fields is None:
+        ignore_fields = []
+
+    fields = obj.__dict__ if hasattr(obj, "__dict__") else {
+        name: getattr(obj, name) for name in utils._fields_of(type(obj))
+    }
+    for key, value in fields.items():
+        if not key.startswith("_"):
+            if key not in ignore_fields:
+                if alias and key in alias:
+                    new_inf[alias[key]] = value
+                else:
+                    new_inf[key] = value
+
+    return new_inf
+
+
+def make_message(index: int) -> dict:
+    """A message with five rows of buttons and a select menu with 25 options"""
+    return {
+        "buttons": [
+            {
+                "custom_id": f"button-{index}-{i}",
+                "style": components.ButtonStyles.primary.value,
+                "label": f"Button {i}",
+                "disabled": i % 2 == 0
+            }
+            for i in range(25)
+        ],
+        "options": [
+            {"label": f"Option {i}", "value": str(i), "description": f"Option number {i}"}
+            for i in range(25)
+        ],
+        "attachments": [
+            {"id": str(900000000000000000 + i), "filename": f"file{i}.png", "size": 1024,
+             "url": "https://cdn.example/file.png", "proxy_url": "https://media.example/file.png"}
+            for i in range(4)
+        ],
+        "embeds": [{"title": f"Embed {i}", "description": "An embed", "color": 0x5865F2} for i in range(4)]
+    }
+
+
+def run(payloads: list, to_dict, from_dict):
+    for payload in payloads:
+        buttons = [from_dict(data, components.Button) for data in payload["buttons"]]
+        options = [from_dict(data, components.SelectMenuOption) for data in payload["options"]]
+        attachments = list(map(models.Attachment, payload["attachments"]))
+        embeds = list(map(models.Embed, payload["embeds"]))
+
+        for button in buttons:
+            to_dict(button)
+        for option in options:
+            to_dict(option)
+        for attachment in attachments:
+            to_dict(attachment)
+        for embed in embeds:
+            to_dict(embed, alias={"embed_type": "type"}, ignore_fields=["colour"])
+
+
+def measure(label: str, payloads: list, to_dict, from_dict):
+    start = time.perf_counter()
+    run(payloads, to_dict, from_dict)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {elapsed / len(payloads) * 1e6:8.1f}us per message")
+
+
+def main(count: int):
+    payloads = [make_message(i) for i in range(count)]
+    print(f"messages={count:,} (25 buttons, 25 options, 4 attachments, 4 embeds each)")
+
+    measure("legacy", payloads, legacy_obj_to_dict, legacy_obj_from_dict)
+    measure("cached", payloads, utils.obj_to_dict, utils.obj_from_dict)
+
+
+if __name__ == "__main__":
+    main(int(float(sys.argv[1])) if len(sys.argv) > 1 else 10_000)
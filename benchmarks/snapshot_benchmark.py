@@ -0,0 +1,58 @@
+"""Measure how long it takes to save and restore a cache snapshot.
+
+Usage: python benchmarks/snapshot_benchmark.py [entries]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from pycordia import cache, models, snapshot
+
+
+def make_user(user_id: int) -> dict:
+    return {
+        "id": str(user_id),
+        "username": f"user{user_id % 100000}",
+        "discriminator": "0001",
+        "avatar": "a1b2c3d4e5f60718293a4b5c6d7e8f90",
+        "public_flags": 64
+    }
+
+
+def main(count: int):
+    print(f"entries={count:,}")
+    source = cache.LRUCache(count)
+    for i in range(count):
+        user_id = 170000000000000000 + i * 4096
+        source[user_id] = make_user(user_id)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "users.snapshot")
+
+        start = time.perf_counter()
+        snapshot.save(path, source)
+        print(f"save:     {time.perf_counter() - start:8.3f}s  {os.path.getsize(path) / 2**20:.1f} MiB")
+
+        start = time.perf_counter()
+        restored = snapshot.Snapshot.open(path, decode=models.User)
+        print(f"open:     {(time.perf_counter() - start) * 1000:8.3f}ms")
+
+        keys = random.Random(0).sample(list(source), min(count, 10_000))
+        start = time.perf_counter()
+        for key in keys:
+            restored.get(key)
+        elapsed = time.perf_counter() - start
+        print(f"lookup:   {elapsed / len(keys) * 1e6:8.2f}us per entry, decoded into models.User")
+
+        start = time.perf_counter()
+        for key in restored:
+            restored.get(key)
+        print(f"full decode: {time.perf_counter() - start:8.3f}s")
+
+        restored.close()
+
+
+if __name__ == "__main__":
+    main(int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,55 @@
+"""Compare encoding a message payload on every send with a `MessageTemplate`.
+
+Usage: python benchmarks/template_benchmark.py [sends]
+"""
+import json
+import sys
+import time
+
+from pycordia import models, utils
+
+FIELDS = 10
+
+
+def make_embed(title, scores) -> models.Embed:
+    embed = models.Embed.create(title=title, description="Weekly leaderboard", color=0x5865F2)
+    for i, score in enumerate(scores):
+        embed.add_field(name=f"Player {i}", value=score, inline=True)
+    return embed
+
+
+def encode_payload(title: str, scores: list) -> bytes:
+    # What `Message.send` builds for every message
+    payload = {
+        "content": "",
+        "tts": False,
+        "allowed_mentions": {},
+        "embeds": [make_embed(title, scores).to_dict()],
+        "nonce": utils.nonce(),
+        "enforce_nonce": True
+    }
+    return json.dumps(payload).encode("utf-8")
+
+
+def main(count: int):
+    print(f"sends={count:,} (embed with {FIELDS} fields, {FIELDS + 1} of them variable)")
+
+    start = time.perf_counter()
+    for i in range(count):
+        encode_payload(f"Round {i}", [str(i + n) for n in range(FIELDS)])
+    elapsed = time.perf_counter() - start
+    print(f"{'payload per send':<20} {elapsed / count * 1e6:8.2f}us per send")
+
+    template = models.MessageTemplate(embeds=[
+        make_embed(models.Field("title"), [models.Field(f"score{n}") for n in range(FIELDS)])
+    ])
+
+    start = time.perf_counter()
+    for i in range(count):
+        template.render(title=f"Round {i}", **{f"score{n}": str(i + n) for n in range(FIELDS)})
+    elapsed = time.perf_counter() - start
+    print(f"{'MessageTemplate':<20} {elapsed / count * 1e6:8.2f}us per send")
+
+
+if __name__ == "__main__":
+    main(int(float(sys.argv[1])) if len(sys.argv) > 1 else 100_000)
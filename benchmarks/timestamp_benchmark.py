@@ -0,0 +1,65 @@
+"""Compare per-item and batched timestamp and snowflake decoding.
+
+Usage: python benchmarks/timestamp_benchmark.py [timestamps]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from pycordia import utils
+
+
+def make_timestamps(count: int):
+    rng = random.Random(0)
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    return [
+        (start + timedelta(milliseconds=rng.randrange(10**11))).isoformat()
+        for _ in range(count)
+    ]
+
+
+def make_snowflakes(count: int):
+    rng = random.Random(0)
+    return [str(rng.randrange(1 << 40, 1 << 62)) for _ in range(count)]
+
+
+def measure(label: str, fun, values: list):
+    start = time.perf_counter()
+    fun(values)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed / len(values) * 1e9:8.0f}ns per value")
+
+
+def main(count: int):
+    print(f"values={count:,} numpy={'yes' if utils.numpy else 'no'}")
+
+    timestamps = make_timestamps(count)
+    measure(
+        "datetime.fromisoformat",
+        lambda values: [datetime.fromisoformat(value).timestamp() for value in values],
+        timestamps
+    )
+    utils.iso_to_epoch.cache_clear()
+    measure("utils.isos_to_epoch", utils.isos_to_epoch, timestamps)
+
+    # A member chunk or message page repeating the same few timestamps
+    repeated = [timestamps[i % 50] for i in range(count)]
+    utils.iso_to_epoch.cache_clear()
+    measure(
+        "utils.iso_to_epoch (repeated)",
+        lambda values: [utils.iso_to_epoch(value) for value in values],
+        repeated
+    )
+
+    snowflakes = make_snowflakes(count)
+    measure(
+        "utils.snowflake_to_date",
+        lambda values: [utils.snowflake_to_date(int(value)) for value in values],
+        snowflakes
+    )
+    measure("utils.snowflakes_to_epoch", utils.snowflakes_to_epoch, snowflakes)
+
+
+if __name__ == "__main__":
+    main(int(float(sys.argv[1])) if len(sys.argv) > 1 else 1_000_000)
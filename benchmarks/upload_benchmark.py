@@ -0,0 +1,133 @@
+"""Compare uploading attachments from an in-memory multipart body with a streamed one.
+
+Files are uploaded to a local stand-in for the Discord API, which reads and
+discards the body. Peak memory is the peak of Python allocations during the upload.
+
+Usage: python benchmarks/upload_benchmark.py [files] [megabytes per file]
+"""
+import asyncio
+import json
+import mmap
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from aiohttp import web
+
+import pycordia
+from pycordia import models
+from pycordia.http import HTTPClient
+
+BOUNDARY = "boundary"
+
+
+def create_multipart(data, files) -> bytes:
+    # `HTTPClient.create_multipart` before attachments were streamed
+    multipart = (f'--{BOUNDARY}\n' \
+                  'Content-Disposition: form-data; name="payload_json"\n' \
+                  'Content-Type: application/json\n\n' \
+                 f'{json.dumps(data, indent=4)}\n').encode("utf-8")
+
+    for i, fl in enumerate(files):
+        multipart += (f'--{BOUNDARY}\n' \
+                      f'Content-Disposition: form-data; name="files[{i}]"; filename="{fl.filename}"\n' \
+                       'Content-Type: application/octet-stream\n\n').encode("utf-8") + fl.fp.read() + b"\n"
+    multipart += f"--{BOUNDARY}--".encode("utf-8")
+
+    return multipart
+
+
+async def receive(request: web.Request) -> web.Response:
+    received = 0
+    async for chunk in request.content.iter_chunked(1 << 16):
+        received += len(chunk)
+    return web.json_response({"id": "1", "received": received})
+
+
+async def measure(label: str, upload, total: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    received = await upload()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert received >= total, received
+    print(f"{label:<24} {elapsed * 1e3:8.1f}ms {total / elapsed / 1e6:8.1f}MB/s "
+          f"peak memory {peak / 1e6:8.1f}MB")
+
+
+async def run(count: int, size: int):
+    runner = web.AppRunner(web.Application(client_max_size=0))
+    runner.app.router.add_post("/channels/{channel_id}/messages", receive)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    pycordia.api_url = f"http://127.0.0.1:{port}"
+
+    http = HTTPClient("token")
+    await http.login()
+
+    paths = []
+    for i in range(count):
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".bin") as fp:
+            fp.truncate(size)
+            paths.append(fp.name)
+
+    payload = {"content": "Weekly backups", "attachments": []}
+    total = count * size
+
+    try:
+        async def in_memory():
+            files = [models.File(filename=f"{i}.bin", fp=open(path, "rb")) for i, path in enumerate(paths)]
+            body = create_multipart(payload, files)
+            for fl in files:
+                fl.fp.close()
+            async with http.session.post(
+                f"{pycordia.api_url}/channels/1/messages", data=body,
+                headers={"Content-Type": f'multipart/form-data; boundary="{BOUNDARY}"'}
+            ) as resp:
+                return (await resp.json())["received"]
+
+        async def streamed(make_file):
+            files = [make_file(i, path) for i, path in enumerate(paths)]
+            try:
+                resp = await http.request("POST", "channels/1/messages", payload_json=payload, files=files)
+                return resp.data["received"]
+            finally:
+                for fl in files:
+                    if hasattr(fl.fp, "close"):
+                        fl.fp.close()
+
+        def from_mmap(i, path):
+            with open(path, "rb") as fp:
+                return models.File(filename=f"{i}.bin", fp=mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ))
+
+        print(f"files={count} size={size / 1e6:.0f}MB each")
+        await measure("in-memory (before)", in_memory, total)
+        await measure("streamed file objects", lambda: streamed(
+            lambda i, path: models.File(filename=f"{i}.bin", fp=open(path, "rb"))
+        ), total)
+        await measure("streamed paths", lambda: streamed(
+            lambda i, path: models.File(filename=f"{i}.bin", fp=path)
+        ), total)
+        await measure("streamed mmap", lambda: streamed(from_mmap), total)
+    finally:
+        await http.close()
+        await runner.cleanup()
+        for path in paths:
+            os.remove(path)
+
+
+def main(count: int, size: int):
+    asyncio.run(run(count, size))
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 3,
+        int(float(sys.argv[2]) * 1e6) if len(sys.argv) > 2 else 25_000_000
+    )
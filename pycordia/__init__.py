@@ -8,7 +8,7 @@ A wrapper around the Discord HTTP API and WebSockets
 """
 
 from .client import Intents, Client
-from . import websocket, errors, events, models, http
+from . import websocket, errors, events, models, metrics, http, cache, snapshot, state, permissions, ratelimit, retry, scheduler
 
 __version__ = "0.3.0"
 
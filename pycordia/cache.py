@@ -0,0 +1,745 @@
+import bisect
+import collections
+import json
+import os
+import struct
+import tempfile
+import time
+import typing
+import warnings
+
+
+_MISSING = object()
+
+
+class CacheStats:
+    """Counters kept by every `Cache`
+
+    Attributes:
+        hits (int): Lookups that found an entry
+        misses (int): Lookups that did not find an entry
+        evictions (int): Entries removed to respect the size limit or because they expired
+    """
+    __slots__ = ("hits", "misses", "evictions")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Ratio of hits over all lookups, 0 if no lookups were made"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def reset(self):
+        """Set every counter back to 0"""
+        self.hits = self.misses = self.evictions = 0
+
+    def __repr__(self):
+        return f"<CacheStats hits={self.hits} misses={self.misses} evictions={self.evictions}>"
+
+
+class Cache:
+    """Base class for the caches used by Pycordia.
+
+    A cache behaves like a dictionary bounded to `max_size` entries. When full,
+    storing a new key evicts an entry chosen by the cache policy. All operations
+    are O(1).
+
+    Attributes:
+        max_size (int): Maximum amount of entries held at a time
+        stats (CacheStats): Hit, miss and eviction counters
+        fallback: A read-only mapping, such as a `pycordia.snapshot.Snapshot`, \
+            consulted by `get` on a miss. Entries found in it are stored in the cache. \
+            Keys stored or removed after the fallback is set are no longer looked up in it.
+
+    Operations:
+        - len(x): Amount of entries in the cache
+        - key in x: Checks if a key is cached, without counting a hit or a miss
+        - x[key] = value: Stores an entry, evicting another if the cache is full
+    """
+
+    def __init__(self, max_size: int = 1000):
+        """
+        Args:
+            max_size (int, optional): Maximum amount of entries. Defaults to 1000.
+        """
+        if max_size < 0:
+            raise ValueError("Cache size cannot be negative")
+
+        self.max_size = int(max_size)
+        self.stats = CacheStats()
+        self.fallback = None
+
+    @property
+    def fallback(self):
+        return self.__fallback
+
+    @fallback.setter
+    def fallback(self, fallback):
+        self.__fallback = fallback
+        # Keys whose fallback entry was replaced or deleted since
+        self.__masked = set()
+
+    def _mask(self, key):
+        """Stop serving `key` from the fallback, as its entry there is out of date"""
+        if self.__fallback is not None and key in self.__fallback:
+            self.__masked.add(key)
+
+    # --- Policy hooks, implemented by subclasses ---
+    def _lookup(self, key, default):
+        raise NotImplementedError
+
+    def _peek(self, key, default):
+        raise NotImplementedError
+
+    def _store(self, key, value):
+        raise NotImplementedError
+
+    def _remove(self, key):
+        raise NotImplementedError
+
+    def _evict(self):
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __iter__(self) -> typing.Iterator:
+        raise NotImplementedError
+
+    # --- Public interface ---
+    def get(self, key, default=None):
+        """Return the value for `key`, or `default` if not found.
+
+        Counts towards the hit and miss statistics.
+        """
+        value = self._lookup(key, _MISSING)
+        if value is _MISSING and self.__fallback is not None and key not in self.__masked:
+            value = self.__fallback.get(key, _MISSING)
+            if value is not _MISSING:
+                self.set(key, value)
+                # Still up to date, so it can be loaded again once evicted
+                self.__masked.discard(key)
+
+        if value is _MISSING:
+            self.stats.misses += 1
+            return default
+
+        self.stats.hits += 1
+        return value
+
+    def peek(self, key, default=None):
+        """Return the value for `key` without updating statistics or recency"""
+        value = self._peek(key, _MISSING)
+        return default if value is _MISSING else value
+
+    def set(self, key, value):
+        """Store `value` under `key`, evicting an entry if the cache is full"""
+        self._mask(key)
+        if self.max_size == 0:
+            return
+
+        if key not in self:
+            while len(self) >= self.max_size:
+                self._evict()
+                self.stats.evictions += 1
+
+        self._store(key, value)
+
+    def pop(self, key, default=None):
+        """Remove `key` and return its value, or `default` if not found"""
+        self._mask(key)
+        value = self._peek(key, _MISSING)
+        if value is _MISSING:
+            return default
+
+        self._remove(key)
+        return value
+
+    def clear(self):
+        """Remove every entry. Statistics are kept."""
+        for key in list(self):
+            self._remove(key)
+
+    def keys(self) -> typing.List:
+        return list(self)
+
+    def values(self) -> typing.List:
+        return [self._peek(key, None) for key in self]
+
+    def items(self) -> typing.List[typing.Tuple]:
+        return [(key, self._peek(key, None)) for key in self]
+
+    def __contains__(self, key) -> bool:
+        return self._peek(key, _MISSING) is not _MISSING
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        self._mask(key)
+        if key not in self:
+            raise KeyError(key)
+        self._remove(key)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} size={len(self)}/{self.max_size} {self.stats!r}>"
+
+
+class LRUCache(Cache):
+    """A cache that evicts the least recently used entry first"""
+
+    def __init__(self, max_size: int = 1000):
+        super().__init__(max_size)
+        self._data: typing.OrderedDict = collections.OrderedDict()
+
+    def _lookup(self, key, default):
+        value = self._data.get(key, default)
+        if value is not default:
+            self._data.move_to_end(key)
+        return value
+
+    def _peek(self, key, default):
+        return self._data.get(key, default)
+
+    def _store(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+    def _remove(self, key):
+        del self._data[key]
+
+    def _evict(self):
+        self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+
+class TTLCache(Cache):
+    """A cache whose entries expire `ttl` seconds after being stored.
+
+    When full, the entry closest to expiring is evicted first.
+
+    Attributes:
+        ttl (float): Lifetime of an entry, in seconds
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 600.0, *,
+        timer: typing.Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            max_size (int, optional): Maximum amount of entries. Defaults to 1000.
+            ttl (float, optional): Lifetime of an entry in seconds. Defaults to 600.
+            timer (typing.Callable, optional): Clock used for expiry. \
+                Defaults to `time.monotonic`.
+        """
+        super().__init__(max_size)
+        self.ttl = float(ttl)
+        self._timer = timer
+
+        # key: (expires_at, value), ordered by expiry since the TTL is constant
+        self._data: typing.OrderedDict = collections.OrderedDict()
+
+    def _expire(self):
+        now = self._timer()
+        data = self._data
+        while data:
+            key = next(iter(data))
+            if data[key][0] > now:
+                break
+            del data[key]
+            self.stats.evictions += 1
+
+    def _lookup(self, key, default):
+        return self._peek(key, default)
+
+    def _peek(self, key, default):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        if entry[0] <= self._timer():
+            del self._data[key]
+            self.stats.evictions += 1
+            return default
+
+        return entry[1]
+
+    def _store(self, key, value):
+        self._data[key] = (self._timer() + self.ttl, value)
+        self._data.move_to_end(key)
+
+    def _remove(self, key):
+        del self._data[key]
+
+    def _evict(self):
+        self._data.popitem(last=False)
+
+    def set(self, key, value):
+        self._expire()
+        super().set(key, value)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        now = self._timer()
+        return iter([key for key, (expires_at, _) in self._data.items() if expires_at > now])
+
+
+class LFUCache(Cache):
+    """A cache that evicts the least frequently used entry first.
+
+    Ties are broken by evicting the least recently used of those entries.
+    """
+
+    def __init__(self, max_size: int = 1000):
+        super().__init__(max_size)
+        self._data: dict = {}
+        self._counts: dict = {}
+
+        # use count: keys with that count, in order of last use
+        self._buckets: typing.Dict[int, typing.OrderedDict] = {}
+        self._min_count = 0
+
+    def _touch(self, key):
+        count = self._counts[key]
+        bucket = self._buckets[count]
+        del bucket[key]
+
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = count + 1
+
+        self._counts[key] = count + 1
+        self._buckets.setdefault(count + 1, collections.OrderedDict())[key] = None
+
+    def _lookup(self, key, default):
+        value = self._data.get(key, default)
+        if value is not default:
+            self._touch(key)
+        return value
+
+    def _peek(self, key, default):
+        return self._data.get(key, default)
+
+    def _store(self, key, value):
+        if key in self._data:
+            self._data[key] = value
+            self._touch(key)
+            return
+
+        self._data[key] = value
+        self._counts[key] = 1
+        self._buckets.setdefault(1, collections.OrderedDict())[key] = None
+        self._min_count = 1
+
+    def _remove(self, key):
+        del self._data[key]
+        count = self._counts.pop(key)
+        bucket = self._buckets[count]
+        del bucket[key]
+
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = min(self._buckets, default=0)
+
+    def _evict(self):
+        bucket = self._buckets[self._min_count]
+        key, _ = bucket.popitem(last=False)
+        del self._data[key]
+        del self._counts[key]
+
+        if not bucket:
+            del self._buckets[self._min_count]
+            self._min_count = min(self._buckets, default=0)
+
+    def clear(self):
+        self._data.clear()
+        self._counts.clear()
+        self._buckets.clear()
+        self._min_count = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+
+class ChannelHistory:
+    """The most recent message IDs of each channel, kept in bounded ring buffers
+
+    Buffers are filled from gateway events, so they hold every message sent in a
+    channel since the first one buffered. This lets recent history queries be
+    answered without the API whenever the buffered range covers them.
+
+    Attributes:
+        size (int): Maximum amount of message IDs kept per channel
+    """
+
+    def __init__(self, size: int = 100):
+        """
+        Args:
+            size (int, optional): Maximum amount of message IDs kept per channel. Defaults to 100.
+        """
+        self.size = int(size)
+        self._channels: typing.Dict[int, typing.Deque[int]] = {}
+
+    def add(self, channel_id: int, message_id: int):
+        """Record a new message in a channel"""
+        if self.size <= 0:
+            return
+
+        buffer = self._channels.get(channel_id)
+        if buffer is None:
+            buffer = self._channels[channel_id] = collections.deque(maxlen=self.size)
+
+        # Messages almost always arrive in order
+        if not buffer or message_id > buffer[-1]:
+            buffer.append(message_id)
+            return
+
+        index = bisect.bisect_left(buffer, message_id)
+        if index < len(buffer) and buffer[index] == message_id:
+            return
+        if len(buffer) == buffer.maxlen:
+            if index == 0:
+                return
+            buffer.popleft()
+            index -= 1
+        buffer.insert(index, message_id)
+
+    def remove(self, channel_id: int, message_ids: typing.Iterable[int]):
+        """Forget deleted messages of a channel"""
+        buffer = self._channels.get(channel_id)
+        if not buffer:
+            return
+
+        removed = set(message_ids)
+        kept = [message_id for message_id in buffer if message_id not in removed]
+        if len(kept) != len(buffer):
+            buffer.clear()
+            buffer.extend(kept)
+
+    def clear(self):
+        """Forget every channel, e.g. after a gap in the events received"""
+        self._channels.clear()
+
+    def query(self, channel_id: int, limit: int, *,
+        before: int = None, after: int = None
+    ) -> typing.Optional[typing.List[int]]:
+        """Return the IDs of the messages a history request would return, newest first
+
+        Arguments follow `pycordia.models.Channel.get_messages`.
+
+        Returns: A list of message IDs, or None if the buffered range does not \
+            fully cover the request
+        """
+        buffer = self._channels.get(channel_id)
+        if not buffer:
+            return None
+
+        if after is not None:
+            # Every message after `after` is known only if `after` is within the buffer
+            if after < buffer[0]:
+                return None
+
+            start = bisect.bisect_right(buffer, after)
+            return [buffer[i] for i in range(min(start + limit, len(buffer)) - 1, start - 1, -1)]
+
+        end = len(buffer) if before is None else bisect.bisect_left(buffer, before)
+        if end < limit:
+            return None
+
+        return [buffer[i] for i in range(end - 1, end - limit - 1, -1)]
+
+
+class _FileLock:
+    """An exclusive lock shared by processes, held on a file in the temporary directory
+
+    Uses `fcntl.flock` on POSIX systems and `msvcrt.locking` on Windows.
+    """
+
+    def __init__(self, name: str):
+        self._fd = os.open(
+            os.path.join(tempfile.gettempdir(), f"{name}.lock"), os.O_RDWR | os.O_CREAT, 0o600
+        )
+
+        try:
+            import fcntl
+        except ImportError:
+            import msvcrt
+
+            self._msvcrt = msvcrt
+            self._fcntl = None
+        else:
+            self._fcntl = fcntl
+
+    def __enter__(self):
+        if self._fcntl is not None:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_EX)
+            return
+
+        # `LK_LOCK` gives up after 10 attempts, keep waiting like `flock` does
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                self._msvcrt.locking(self._fd, self._msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def __exit__(self, *exc):
+        if self._fcntl is not None:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            self._msvcrt.locking(self._fd, self._msvcrt.LK_UNLCK, 1)
+
+    def close(self):
+        os.close(self._fd)
+
+
+class SharedMemoryCache(Cache):
+    """A cache held in shared memory, readable by every process on a host
+
+    Entries live in a fixed-size hash table of `max_size` slots. Each slot holds
+    a sequence number, an integer key (a snowflake) and the encoded value, so
+    reads never take a lock: a reader retries if a write happened while it was
+    copying the slot. Writes are serialized across processes with `lock`.
+
+    When every slot a key may use is taken, the entry in the key's first slot
+    is evicted. Values whose encoded form does not fit in a slot are not cached:
+    the previous entry of their key is removed, they are counted in `oversized`
+    and a warning is issued the first time it happens. Size slots for the
+    largest values you cache; the default of 4 KiB fits users and most messages.
+
+    Requires Python 3.8 or later, for `multiprocessing.shared_memory`.
+
+    Slot layout, little endian:
+        sequence (u64) - odd while a write is in progress
+        key (u64) - 0 for an empty slot
+        length (u32) - size of the encoded value
+        padding (u32)
+        value (length bytes)
+
+    Example:
+        `user_cache = SharedMemoryCache("pycordia-users", encode=User.to_dict, decode=User)`
+
+    Attributes:
+        name (str): Name of the shared memory block
+        slot_size (int): Size of each slot in bytes, including its 24 byte header
+        oversized (int): Values not cached because they did not fit in a slot
+    """
+
+    MAGIC = b"PCSM"
+    VERSION = 1
+    PROBES = 8
+
+    _header = struct.Struct("<4sIII")
+    _slot_header = struct.Struct("<QQII")
+    _sequence = struct.Struct("<Q")
+
+    def __init__(self, name: str, max_size: int = 10_000, *,
+        encode: typing.Callable[[typing.Any], typing.Any],
+        decode: typing.Callable[[typing.Any], typing.Any],
+        slot_size: int = 4096,
+        lock: typing.ContextManager = None
+    ):
+        """
+        Args:
+            name (str): Name of the shared memory block. Processes using the same name share entries.
+            max_size (int, optional): Amount of slots, at least 1. Ignored when attaching to an existing block.
+            encode (typing.Callable): Converts a value into a JSON-serializable object
+            decode (typing.Callable): Converts the JSON-serializable object back into a value
+            slot_size (int, optional): Size of each slot in bytes, a multiple of 8 larger than \
+                the slot header. Ignored when attaching.
+            lock (typing.ContextManager, optional): A lock shared by every writing process. \
+                Defaults to a lock file in the temporary directory.
+
+        Raises:
+            ValueError: `max_size` or `slot_size` is invalid, or the block is not a compatible cache
+            RuntimeError: Shared memory is not available (Python 3.7)
+        """
+        try:
+            from multiprocessing import shared_memory
+        except ImportError:
+            raise RuntimeError("SharedMemoryCache requires Python 3.8 or later") from None
+
+        if max_size < 1:
+            raise ValueError("Shared memory cache size must be at least 1")
+        if slot_size <= self._slot_header.size or slot_size % 8:
+            raise ValueError(
+                f"Slot size must be a multiple of 8 larger than {self._slot_header.size} bytes"
+            )
+
+        super().__init__(max_size)
+        self.name = name
+        self.slot_size = int(slot_size)
+        self.oversized = 0
+        self._encode = encode
+        self._decode = decode
+
+        size = self._header.size + self.max_size * self.slot_size
+        try:
+            self._shm = shared_memory.SharedMemory(name, create=True, size=size)
+            self._header.pack_into(self._shm.buf, 0, self.MAGIC, self.VERSION, self.max_size, self.slot_size)
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name)
+            magic, version, self.max_size, self.slot_size = self._header.unpack_from(self._shm.buf, 0)
+            if magic != self.MAGIC or version != self.VERSION:
+                self._shm.close()
+                raise ValueError(f"Shared memory block '{name}' is not a compatible cache")
+
+        # The block outlives this process until `unlink` is called,
+        # so it must not be removed by the resource tracker at exit
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self._shm._name, "shared_memory")  # type: ignore
+        except Exception:
+            pass
+
+        self._buf = self._shm.buf
+        self._lock = lock if lock is not None else _FileLock(name)
+
+    def _offset(self, index: int) -> int:
+        return self._header.size + index * self.slot_size
+
+    def _probe(self, key: int) -> typing.Iterator[int]:
+        home = ((key * 0x9E3779B97F4A7C15) >> 20) % self.max_size
+        for i in range(min(self.PROBES, self.max_size)):
+            yield (home + i) % self.max_size
+
+    def _read(self, index: int, key: int):
+        buf, offset = self._buf, self._offset(index)
+
+        # Seqlock read: retry if a writer touched the slot while it was copied
+        for _ in range(100):
+            sequence, slot_key, length, _ = self._slot_header.unpack_from(buf, offset)
+            if sequence & 1:
+                continue
+            if slot_key != key:
+                return _MISSING
+
+            start = offset + self._slot_header.size
+            data = bytes(buf[start:start + length])
+            if self._sequence.unpack_from(buf, offset)[0] == sequence:
+                return data
+
+        return _MISSING
+
+    def _write(self, index: int, key: int, data: bytes):
+        buf, offset = self._buf, self._offset(index)
+        sequence = self._sequence.unpack_from(buf, offset)[0]
+
+        self._sequence.pack_into(buf, offset, sequence + 1)
+        start = offset + self._slot_header.size
+        buf[start:start + len(data)] = data
+        self._slot_header.pack_into(buf, offset, sequence + 1, key, len(data), 0)
+        self._sequence.pack_into(buf, offset, sequence + 2)
+
+    def _lookup(self, key, default):
+        return self._peek(key, default)
+
+    def _peek(self, key, default):
+        key = int(key)
+        for index in self._probe(key):
+            data = self._read(index, key)
+            if data is not _MISSING:
+                return self._decode(json.loads(data))
+        return default
+
+    def set(self, key, value):
+        key = int(key)
+        self._mask(key)
+        data = json.dumps(self._encode(value), separators=(",", ":")).encode("utf-8")
+        if len(data) > self.slot_size - self._slot_header.size:
+            # A stale value must not be returned in place of the new one
+            self._remove(key)
+            if not self.oversized:
+                warnings.warn(
+                    f"Value of {len(data)} bytes does not fit in the {self.slot_size} byte slots "
+                    f"of shared memory cache '{self.name}' and was not cached",
+                    RuntimeWarning, stacklevel=2
+                )
+            self.oversized += 1
+            return
+
+        with self._lock:
+            target = None
+            for index in self._probe(key):
+                slot_key = self._slot_header.unpack_from(self._buf, self._offset(index))[1]
+                if slot_key == key:
+                    target = index
+                    break
+                if slot_key == 0 and target is None:
+                    target = index
+
+            if target is None:
+                target = next(self._probe(key))
+                self.stats.evictions += 1
+
+            self._write(target, key, data)
+
+    def _remove(self, key):
+        key = int(key)
+        with self._lock:
+            for index in self._probe(key):
+                if self._slot_header.unpack_from(self._buf, self._offset(index))[1] == key:
+                    self._write(index, 0, b"")
+
+    def clear(self):
+        with self._lock:
+            for index in range(self.max_size):
+                if self._slot_header.unpack_from(self._buf, self._offset(index))[1]:
+                    self._write(index, 0, b"")
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __iter__(self):
+        for index in range(self.max_size):
+            key = self._slot_header.unpack_from(self._buf, self._offset(index))[1]
+            if key:
+                yield key
+
+    def close(self):
+        """Detach this process from the shared memory block"""
+        self._buf.release()
+        self._shm.close()
+        if isinstance(self._lock, _FileLock):
+            self._lock.close()
+
+    def unlink(self):
+        """Destroy the shared memory block. Call once, after every process has closed it."""
+        # `SharedMemory.unlink` unregisters the block from the resource tracker
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.register(self._shm._name, "shared_memory")  # type: ignore
+        except Exception:
+            pass
+
+        self._shm.unlink()
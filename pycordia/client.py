@@ -1,10 +1,11 @@
 from pycordia import http
 import asyncio
 import enum
+import os
 
 import typing
 
-from . import events, models, websocket
+from . import cache, events, metrics, models, permissions, snapshot, state, utils, websocket
 import pycordia
 
 
@@ -58,9 +59,13 @@ class Client:
     A WebSockets client for the Discord Gateway API
 
     Attributes:
-        cache_size (int): Maz size of user and message caches
-        message_cache (Dict[str, Message]): Client's message cache - a dictionary of string - `pycordia.models.message.Message` mappings
-        user_cache (Dict[str, Message]): Client's user cache - a dictionary of string - `pycordia.models.user.User` mappings
+        cache_size (int): Default max size of user and message caches
+        message_cache (pycordia.cache.Cache): Client's message cache - a mapping of string - `pycordia.models.message.Message` entries
+        user_cache (pycordia.cache.Cache): Client's user cache - a mapping of string - `pycordia.models.user.User` entries
+        state (pycordia.state.StateStore): Guilds, channels, roles and members kept up to date by the gateway
+        history (pycordia.cache.ChannelHistory): IDs of the recent messages of each channel
+        permissions (pycordia.permissions.PermissionEngine): Effective permissions computed from `state`
+        lazy_messages (bool): Whether gateway messages decode their attributes on first access
     """
 
     def event(self, fun):
@@ -135,13 +140,33 @@ class Client:
                 }
         
 
-    def __init__(self, *, intents: int, cache_size: int = 1000):
+    def __init__(self, *, intents: int, cache_size: int = 1000,
+        message_cache: cache.Cache = None, user_cache: cache.Cache = None,
+        state_store: state.StateStore = None, history_size: int = 100,
+        lazy_messages: bool = False, connector: http.ConnectorSettings = None,
+        metrics: metrics.Metrics = None
+    ):
         """
         Args:
             intents (int): The intents for the bot to authenticate with. \
                 Preferably obtained from `pycordia.Intents`
             cache_size (int, optional): The amount of entries \
                 to store in cache at a time. Defaults to 1000.
+            message_cache (pycordia.cache.Cache, optional): The cache used for messages. \
+                Defaults to a `pycordia.cache.LRUCache` of `cache_size` entries.
+            user_cache (pycordia.cache.Cache, optional): The cache used for users. \
+                Defaults to a `pycordia.cache.LRUCache` of `cache_size` entries.
+            state_store (pycordia.state.StateStore, optional): The store for gateway-fed \
+                guilds, channels, roles and members. Defaults to a store keeping everything.
+            history_size (int, optional): The amount of recent message IDs \
+                to index per channel. Defaults to 100.
+            lazy_messages (bool, optional): Decode message attributes on first access \
+                instead of when a message is received. Defaults to False.
+            connector (pycordia.http.ConnectorSettings, optional): Pool size, per-host limit, \
+                keep-alive, DNS cache and pre-warming of the connections shared \
+                by REST requests and the gateway.
+            metrics (pycordia.metrics.Metrics, optional): Receives per-route REST \
+                timings and counters, such as a `pycordia.metrics.InMemoryMetrics`.
         """
 
         # event_name: {
@@ -152,11 +177,24 @@ class Client:
         self.intents = intents
 
         self.cache_size = int(cache_size)
-        self.user_cache: typing.Dict[str, models.User] = {}
-        self.message_cache: typing.Dict[str, models.Message] = {}
+        self.user_cache: cache.Cache = user_cache if user_cache is not None \
+            else cache.LRUCache(self.cache_size)
+        self.message_cache: cache.Cache = message_cache if message_cache is not None \
+            else cache.LRUCache(self.cache_size)
+        self.state: state.StateStore = state_store if state_store is not None \
+            else state.StateStore()
+        self.history = cache.ChannelHistory(history_size)
+        self.permissions = permissions.PermissionEngine(self.state)
+        self.lazy_messages = lazy_messages
 
         self.ws = websocket.DiscordWebSocket(self, "placeholder", self.intents)
-        self.http = http.HTTPClient("placeholder")
+        self.http = http.HTTPClient("placeholder", connector_settings=connector, metrics=metrics)
+        # Requests to the channels of a guild are queued with the guild's
+        self.http.scheduler.resolve_guild = self.__channel_guild
+
+    def __channel_guild(self, channel_id: str) -> typing.Optional[str]:
+        channel = self.state.get_channel(channel_id)
+        return channel.guild_id if channel else None
 
     async def __create_session(self, bot_token):        
         if not bot_token:
@@ -171,7 +209,10 @@ class Client:
         func_name = f"on_{event_name.lower()}"
         
         def call_handlers(*args, **kwargs):
-            event_data = self.events[func_name]
+            call_event(func_name, *args, **kwargs)
+
+        def call_event(name: str, *args, **kwargs):
+            event_data = self.events[name]
             if event_data["event"]:
                 asyncio.gather(event_data["event"](*args, **kwargs))
 
@@ -180,35 +221,77 @@ class Client:
                     asyncio.gather(listener(*args, **kwargs))
     
         
-        # --- Cached methods ---
-        if event_name.lower() == "message_create":
-            message = models.Message(event_data)
+        # --- State updates ---
+        channel_before = None
+        if event_name.lower() == "channel_update":
+            channel_before = self.state.get_channel(event_data["id"])
 
-            if len(self.message_cache.keys()) >= self.cache_size:
-                first_message = list(self.message_cache.keys())[0]
-                del self.message_cache[first_message]
+        self.state.parse_event(event_name, event_data)
+        self.permissions.parse_event(event_name, event_data)
 
+        # --- Cached methods ---
+        if event_name.lower() == "ready":
+            # Events may have been missed since the last session
+            self.history.clear()
+
+        if event_name.lower() == "message_create":
+            message = models.Message(event_data, lazy=self.lazy_messages)
             self.message_cache[message.id] = message
+            self.history.add(message.channel_id, message.id)
 
             if func_name in self.events:
                 call_handlers(message)
                 return
         elif event_name.lower() == "message_update":
-            after = models.Message(event_data)
-            
-            # print(self.message_cache, after.id)
-            
-            before = self.message_cache.get(after.id, None)
-
-            # Update the message cache
-            if len(self.message_cache.keys()) >= self.cache_size:
-                first_message = list(self.message_cache.keys())[0]
-                del self.message_cache[first_message]
-            
-            self.message_cache[after.id] = after
+            before = self.message_cache.get(utils.snowflake(event_data["id"]), None)
+
+            # Updates are often partial (e.g. embed unfurls have no author or content)
+            if before is not None:
+                after = before.updated(event_data, lazy=self.lazy_messages)
+            else:
+                after = models.Message(
+                    event_data, lazy=self.lazy_messages or "author" not in event_data
+                )
+
+            # A partial update of an uncached message would be served as a whole message later
+            if before is not None or "author" in event_data:
+                self.message_cache[after.id] = after
+
+            if "on_message_diff" in self.events:
+                changes = utils.diff_payloads(before.to_dict(), event_data, partial=True) \
+                    if before is not None else {}
+                call_event("on_message_diff", events.UpdateEvent(before, after, changes))
+
+            if func_name in self.events:
+                call_handlers(before, after)
+                return
+        elif event_name.lower() == "channel_update":
+            # The stored channel shares unchanged fields with the previous one
+            after = self.state.get_channel(event_data["id"]) or models.Channel(event_data)
+
+            if "on_channel_diff" in self.events:
+                changes = utils.diff_payloads(channel_before.to_dict(), after.to_dict()) \
+                    if channel_before is not None else {}
+                call_event("on_channel_diff", events.UpdateEvent(channel_before, after, changes))
+
+            if func_name in self.events:
+                call_handlers(after)
+                return
+        elif event_name.lower() in ("message_delete", "message_delete_bulk"):
+            if event_name.lower() == "message_delete":
+                ids = {utils.snowflake(event_data["id"])}
+            else:
+                ids = {utils.snowflake(message_id) for message_id in event_data.get("ids", [])}
+
+            cached_messages = [
+                message for message in map(self.message_cache.pop, ids) if message is not None
+            ]
+            self.history.remove(utils.snowflake(event_data["channel_id"]), ids)
 
             if func_name in self.events:
-                call_handlers(before, after)               
+                call_handlers(events.MessageDeleteEvent(
+                    event_data, event_name.lower() == "message_delete_bulk", cached_messages
+                ))
                 return
 
         # --- Uncached methods ---
@@ -222,22 +305,8 @@ class Client:
             elif event_name.lower() == "typing_start":
                 call_handlers(events.TypingStartEvent(event_data))
 
-            # ---- Message Related Events ----
-            elif event_name.lower() == "message_delete":
-                msg = self.message_cache.get(event_data["id"])
-
-                call_handlers(
-                    events.MessageDeleteEvent(event_data, False, [msg] if msg else [])
-                )
-            elif event_name.lower() == "message_delete_bulk":
-                ids = event_data.get("ids", [])
-                call_handlers(
-                    events.MessageDeleteEvent(event_data, True, 
-                        list(filter(lambda key: key in ids, self.message_cache))
-                ))
-            
             # ---- Channel Related Events ----
-            elif event_name.lower() in ("channel_create", "channel_update", "channel_delete"):
+            elif event_name.lower() in ("channel_create", "channel_delete"):
                 call_handlers(models.Channel(event_data))
 
             # ---- Unimplemented ----
@@ -274,16 +343,74 @@ class Client:
             if self.ws and self.ws.sock:
                 loop.run_until_complete(self.ws.sock.close())
 
-            if self.http and self.http.session:
-                loop.run_until_complete(self.http.session.close())
+            if self.http:
+                loop.run_until_complete(self.http.close())
+        finally:
+            self.__close_snapshots()
+
+    def save_caches(self, directory: str):
+        """Save the user and message caches as snapshots in a directory
+
+        Parameters:
+            directory (str): The directory to write the snapshots in
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        snapshot.save(
+            os.path.join(directory, "users.snapshot"), self.user_cache, encode=models.User.to_dict
+        )
+        snapshot.save(
+            os.path.join(directory, "messages.snapshot"), self.message_cache,
+            encode=models.Message.to_dict
+        )
+
+    def restore_caches(self, directory: str, *, max_age: typing.Optional[float] = 3600):
+        """Restore the user and message caches from snapshots saved with `save_caches`
+
+        Snapshots are read lazily: entries are decoded when first looked up.
+        Missing, invalid or stale snapshots are ignored. Snapshots restored \
+            earlier are closed.
+
+        Parameters:
+            directory (str): The directory the snapshots were written in
+            max_age (float, optional): Age in seconds after which snapshots are ignored. \
+                Defaults to one hour, None to restore snapshots of any age.
+        """
+        self.__close_snapshots()
+
+        self.user_cache.fallback = snapshot.Snapshot.open(
+            os.path.join(directory, "users.snapshot"), decode=models.User, max_age=max_age
+        )
+        self.message_cache.fallback = snapshot.Snapshot.open(
+            os.path.join(directory, "messages.snapshot"), decode=models.Message, max_age=max_age
+        )
+
+    def __close_snapshots(self):
+        for store in (self.user_cache, self.message_cache):
+            if isinstance(store.fallback, snapshot.Snapshot):
+                store.fallback.close()
+                store.fallback = None
+
+    async def get_channel(self, channel_id: str, *, use_cache: bool = True) -> models.Channel:
+        if use_cache:
+            channel = self.state.get_channel(channel_id)
+            if channel:
+                return channel
 
-    async def get_channel(self, channel_id: str) -> models.Channel:
         return await models.Channel.from_id(channel_id)
 
     async def get_user(self, user_id: str, *, use_cache: bool = True) -> models.User:
         return await models.User.from_id(user_id, use_cache)
 
-    async def get_guild(self, guild_id: str, *, with_counts: bool = False) -> models.Guild:
+    async def get_guild(self, guild_id: str, *,
+        with_counts: bool = False, use_cache: bool = True
+    ) -> models.Guild:
+        # Approximate counts are only provided through the API
+        if use_cache and not with_counts:
+            guild = self.state.get_guild(guild_id)
+            if guild:
+                return guild
+
         return await models.Guild.from_id(guild_id, with_counts=with_counts)
 
     @property
@@ -291,16 +418,16 @@ class Client:
         """List of guilds of which the bot is a member"""
 
         rs = await self.http.request("GET", "users/@me/guilds")
-        return list(map(models.PartialGuild, await rs.json()))
+        return list(map(models.PartialGuild, rs.data))
 
     @property
     async def user(self) -> models.User:
         """Bot's `pycordia.models.user.User` object"""
         rs = await self.http.request("GET", "users/@me")
-        return models.User(await rs.json())
+        return models.User(rs.data)
 
     @property
     async def connections(self):
         """Connections for the bot"""
         rs = await self.http.request("GET", "users/@me")
-        return list(map(models.Connection, await rs.json()))
+        return list(map(models.Connection, rs.data))
@@ -40,3 +40,8 @@ class ClientSetupError(Exception):
     """Raised when an initialized client is not found or is setup improperly"""
     def __init__(self, message=None):
         super().__init__(message or "No initialized client found")
+
+class DeadlineExceeded(Exception):
+    """Raised when a request was not sent before its deadline"""
+    def __init__(self, message=None):
+        super().__init__(message or "The request was not sent before its deadline")
@@ -21,7 +21,8 @@ class HTTPError(Exception):
     def __init__(self, data: dict):
         self.data = data 
         
-        self.code = self.data["code"]
+        # Rate limit responses have no error code
+        self.code = self.data.get("code", 0)
         self.errors = self.data.get("errors", {})
         self.message = self.data["message"]
 
@@ -1,7 +1,7 @@
 import typing
 from datetime import datetime
 
-from .models import Member, User, Message
+from .models import Channel, Member, User, Message
 from . import utils
 
 
@@ -12,15 +12,17 @@ class ReadyEvent:
     Attributes:
         gateway_version (int): The version used for the WebSockets gateway
         user (User): The bot using the gateway
-        guilds (typing.List[int]): A list of guild IDs the bot is in
+        guilds (typing.List[Snowflake]): A list of guild IDs the bot is in
         session_id (str): The session ID for the WebSockets session
         shard (tuple): The number of shards and their ID for this session
         partial_application (dict): An Application object with an ID and flags
     """
+    __slots__ = ("gateway_version", "user", "guilds", "session_id", "shard", "partial_application")
+
     def __init__(self, data: dict):
         self.gateway_version: int = data["v"]
         self.user: User = User(data["user"])
-        self.guilds: typing.List[int] = [int(guild["id"]) for guild in data ["guilds"]]
+        self.guilds: typing.List[utils.Snowflake] = [utils.snowflake(guild["id"]) for guild in data["guilds"]]
         self.session_id: str = data["session_id"]
 
         # NOTE: unimplemented
@@ -36,18 +38,20 @@ class MessageDeleteEvent:
         channel_id: The ID of the channel
         guild_id: The ID of the guild
         bulk: Whether the deletion was performed in bulk
-        cached_message: The message, if it was cached by Pycordia
+        cached_messages: The deleted messages that were cached by Pycordia
     """     
+    __slots__ = ("message_ids", "cached_messages", "channel_id", "guild_id", "bulk")
+
     def __init__(self, data: dict, bulk: bool, messages):
   
         if bulk:
-            self.message_ids = data["ids"]
+            self.message_ids = [utils.snowflake(message_id) for message_id in data["ids"]]
         else:
-            self.message_ids = [data["id"]]
+            self.message_ids = [utils.snowflake(data["id"])]
 
         self.cached_messages: typing.List[Message] = messages
-        self.channel_id = data["channel_id"]
-        self.guild_id = data.get("guild_id")
+        self.channel_id = utils.snowflake(data["channel_id"])
+        self.guild_id = utils.snowflake(data.get("guild_id"))
         self.bulk = bulk
 
 
@@ -62,11 +66,40 @@ class TypingStartEvent:
         guild_id: The ID of the guild where event was registered
     """
 
+    __slots__ = ("timestamp", "member", "user_id", "channel_id", "guild_id")
+
     def __init__(self, data: dict):
         self.timestamp = datetime.fromtimestamp(data["timestamp"])
         self.member = utils.make_optional(Member, data.get("member"))
 
-        self.user_id = data["user_id"]
-        self.channel_id = data["channel_id"]
-        self.guild_id = data["guild_id"]
+        self.user_id = utils.snowflake(data["user_id"])
+        self.channel_id = utils.snowflake(data["channel_id"])
+        self.guild_id = utils.snowflake(data.get("guild_id"))
+
+
+class UpdateEvent:
+    """Event called with the fields that changed when a message or a channel is updated
+
+    Sent to `on_message_diff` and `on_channel_diff` handlers, along with \
+        `on_message_update` and `on_channel_update`. Changes are only computed \
+        when such a handler is registered.
+
+    Attributes:
+        before: The object before the update, None if it was not cached
+        after: The object after the update
+        changes: The payload fields that changed, a mapping of \
+            field name - (old value, new value). Empty if `before` is None.
+    """
+
+    __slots__ = ("before", "after", "changes")
+
+    def __init__(self, before: typing.Union[Message, Channel, None],
+        after: typing.Union[Message, Channel], changes: typing.Dict[str, typing.Tuple]
+    ):
+        self.before = before
+        self.after = after
+        self.changes = changes
 
+    def changed(self, *fields: str) -> bool:
+        """Check if any of the given payload fields changed (example: `event.changed("content")`)"""
+        return any(field in self.changes for field in fields)
@@ -1,9 +1,246 @@
+import asyncio
+import functools
+import io
+import os
 import platform
+import time
 import pycordia
 import aiohttp
+import aiohttp.payload
 import json
 
-from typing import Dict, List, Any, Optional
+from pycordia import metrics, ratelimit, retry, scheduler, utils
+
+from typing import Callable, Dict, List, Any, Mapping, Optional, Tuple, Union
+
+
+# Bytes read from an attachment at a time while it is uploaded
+UPLOAD_CHUNK_SIZE = 1 << 18
+
+# Maximum amount of endpoints remembered as not found
+NOT_FOUND_CACHE_SIZE = 1024
+
+_DEFAULT = object()
+
+
+class _FileSource:
+    """Reads the data of a `pycordia.models.File` in chunks, from its start every time"""
+    __slots__ = ("fp", "start", "size")
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.start = 0
+        self.size: Optional[int] = None
+
+        if isinstance(fp, (bytes, bytearray, memoryview)) or hasattr(fp, "madvise"):
+            # Bytes-like data, such as an mmap'd region
+            self.fp = memoryview(fp).cast("B")
+            self.size = self.fp.nbytes
+        elif isinstance(fp, (str, os.PathLike)):
+            self.size = os.path.getsize(fp)
+        elif fp.seekable():
+            self.start = fp.tell()
+            self.size = fp.seek(0, io.SEEK_END) - self.start
+            fp.seek(self.start)
+
+    async def write(self, writer):
+        fp = self.fp
+
+        if isinstance(fp, memoryview):
+            for offset in range(0, len(fp), UPLOAD_CHUNK_SIZE):
+                await writer.write(fp[offset:offset + UPLOAD_CHUNK_SIZE])
+            return
+
+        loop = asyncio.get_running_loop()
+        if isinstance(fp, (str, os.PathLike)):
+            fp = await loop.run_in_executor(None, open, fp, "rb")
+        elif self.size is not None:
+            fp.seek(self.start)
+
+        # Files on disk are read in the default executor, in-memory files directly
+        on_disk = isinstance(fp, (io.BufferedReader, io.FileIO))
+        try:
+            while True:
+                if on_disk:
+                    chunk = await loop.run_in_executor(None, fp.read, UPLOAD_CHUNK_SIZE)
+                else:
+                    chunk = fp.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                await writer.write(chunk)
+        finally:
+            if fp is not self.fp:
+                fp.close()
+
+
+class MultipartBody(aiohttp.payload.Payload):
+    """A `multipart/form-data` body whose attachments are streamed while it is sent
+
+    The JSON payload and the headers of every part are encoded once, when the \
+        body is created. Attachments are read `UPLOAD_CHUNK_SIZE` bytes at a \
+        time while the body is written, so memory use does not grow with their \
+        size, and from their start on every write, so the body can be sent again.
+
+    Attributes:
+        size (Optional[int]): Length of the body in bytes, \
+            None if an attachment cannot tell its size
+    """
+
+    def __init__(self, data: Any, files: List['pycordia.models.File'], boundary: str):
+        """
+        Args:
+            data (Any): Any valid JSON object, sent as `payload_json`
+            files (List[pycordia.models.File]): The files to attach
+            boundary (str): The boundary between parts
+        """
+        super().__init__(None, content_type=f'multipart/form-data; boundary="{boundary}"')
+
+        # Encoded headers and JSON, and attachment sources, in order
+        self.__parts: List[Union[bytes, _FileSource]] = [
+            (f'--{boundary}\r\n'
+              'Content-Disposition: form-data; name="payload_json"\r\n'
+              'Content-Type: application/json\r\n\r\n').encode("utf-8")
+            + json.dumps(data, separators=(",", ":")).encode("utf-8")
+            + b"\r\n"
+        ]
+
+        for i, fl in enumerate(files):
+            filename = fl.filename.replace('"', "%22")
+            self.__parts.append(
+                (f'--{boundary}\r\n'
+                 f'Content-Disposition: form-data; name="files[{i}]"; filename="{filename}"\r\n'
+                  'Content-Type: application/octet-stream\r\n\r\n').encode("utf-8")
+            )
+            self.__parts.append(_FileSource(fl.fp))
+            self.__parts.append(b"\r\n")
+
+        self.__parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+
+        sizes = [len(part) if isinstance(part, bytes) else part.size for part in self.__parts]
+        self._size = None if None in sizes else sum(sizes)
+
+    async def write(self, writer):
+        for part in self.__parts:
+            if isinstance(part, bytes):
+                await writer.write(part)
+            else:
+                await part.write(writer)
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        raise TypeError("A multipart body is streamed and cannot be decoded")
+
+
+class Response:
+    """The result of a request, with its body read and decoded once
+
+    Attributes:
+        status (int): The HTTP status code
+        headers (Mapping[str, str]): The response headers
+        data (Any): The decoded JSON body, the text of a non-JSON body, \
+            or None if the body is empty (204 No Content)
+        bucket (Optional[str]): The rate limit bucket hash of the route
+        limit (Optional[int]): Requests allowed per rate limit window
+        remaining (Optional[int]): Requests left in the current window
+        reset_after (Optional[float]): Seconds until the window resets
+    """
+    __slots__ = ("status", "headers", "data", "bucket", "limit", "remaining", "reset_after")
+
+    def __init__(self, status: int, headers: Mapping[str, str], data: Any):
+        self.status = status
+        self.headers = headers
+        self.data = data
+
+        self.bucket: Optional[str] = headers.get("X-RateLimit-Bucket")
+        self.limit = utils.make_optional(int, headers.get("X-RateLimit-Limit"))
+        self.remaining = utils.make_optional(int, headers.get("X-RateLimit-Remaining"))
+        self.reset_after = utils.make_optional(float, headers.get("X-RateLimit-Reset-After"))
+
+    @property
+    def ok(self) -> bool:
+        """Whether the status code is below 400"""
+        return self.status < 400
+
+    async def json(self) -> Any:
+        """Return the decoded body, as `aiohttp.ClientResponse.json` would"""
+        return self.data
+
+    def __repr__(self):
+        return f"<Response status={self.status} bucket={self.bucket} remaining={self.remaining}>"
+
+
+class _RequestTrace:
+    """Passed to the trace callbacks of a request, to record its measurements"""
+    __slots__ = ("metrics", "route")
+
+    def __init__(self, sink: metrics.Metrics, route: str):
+        self.metrics = sink
+        self.route = route
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    """Return a trace config recording DNS, connect and time-to-first-byte timings"""
+    config = aiohttp.TraceConfig()
+
+    def timer(start: str, name: str = None):
+        async def callback(session, context, params):
+            if name is None:
+                setattr(context, start, time.perf_counter())
+                return
+
+            trace = context.trace_request_ctx
+            if isinstance(trace, _RequestTrace) and hasattr(context, start):
+                trace.metrics.observe(name, trace.route, time.perf_counter() - getattr(context, start))
+        return callback
+
+    config.on_request_start.append(timer("request_start"))
+    config.on_request_end.append(timer("request_start", "http.ttfb"))
+    config.on_dns_resolvehost_start.append(timer("dns_start"))
+    config.on_dns_resolvehost_end.append(timer("dns_start", "http.dns"))
+    config.on_connection_create_start.append(timer("connect_start"))
+    config.on_connection_create_end.append(timer("connect_start", "http.connect"))
+    return config
+
+
+class ConnectorSettings:
+    """Settings of the connection pool shared by REST requests and gateway connections
+
+    Attributes:
+        limit (int): Connections open at the same time, 0 for no limit
+        limit_per_host (int): Connections open to the same host at the same time, \
+            0 for no limit
+        keepalive_timeout (float): Seconds an idle connection is kept open for re-use
+        dns_cache_ttl (Optional[int]): Seconds resolved addresses are cached, \
+            None to cache them forever
+        prewarm (int): Connections to the API opened at login, so that the first \
+            requests do not pay for DNS and TLS setup
+    """
+    __slots__ = ("limit", "limit_per_host", "keepalive_timeout", "dns_cache_ttl", "prewarm")
+
+    def __init__(self, *, limit: int = 100, limit_per_host: int = 0,
+        keepalive_timeout: float = 15.0, dns_cache_ttl: Optional[int] = 300, prewarm: int = 0
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.prewarm = prewarm
+
+    def create_connector(self) -> aiohttp.TCPConnector:
+        """Return a new connector with these settings"""
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl
+        )
+
+    def __repr__(self):
+        return (
+            f"<ConnectorSettings limit={self.limit} limit_per_host={self.limit_per_host} "
+            f"keepalive_timeout={self.keepalive_timeout} dns_cache_ttl={self.dns_cache_ttl} "
+            f"prewarm={self.prewarm}>"
+        )
 
 
 class HTTPClient:
@@ -15,28 +252,123 @@ class HTTPClient:
             'boundary' by default.
 
         session (Optional[aiohttp.ClientSession]): An active HTTP session if any        
+        connector_settings (ConnectorSettings): Settings of the connection pool
+        connector (Optional[aiohttp.TCPConnector]): The connection pool, \
+            shared with gateway connections. Created at login.
+        negative_ttl (float): Seconds during which a GET that returned 404 \
+            fails again without a request. 0 disables it.
+        ratelimiter (pycordia.ratelimit.RateLimiter): Per-route and global rate limits, \
+            including bucket wait-time statistics
+        max_ratelimit_retries (int): Times a request is retried after a 429 response
+        retry_policy (Optional[pycordia.retry.RetryPolicy]): When requests are retried \
+            after 5xx responses, connection errors and timeouts. \
+            Such failures are raised right away if None.
+        scheduler (Optional[pycordia.scheduler.RequestScheduler]): Orders requests \
+            by priority, guild and deadline. Requests are sent right away if None.
+        json_loads (Callable[[bytes], Any]): Decodes JSON response bodies, \
+            `json.loads` by default
+        metrics (Optional[pycordia.metrics.Metrics]): Receives per-route timings, \
+            sizes and counters of requests, see `pycordia.metrics.Metrics`. \
+            Nothing is recorded if None.
     """
-    def __init__(self, bot_token: str, *, boundary: str = "boundary") -> None:
+    def __init__(self, bot_token: str, *, boundary: str = "boundary", negative_ttl: float = 5.0,
+        max_ratelimit_retries: int = 3, max_concurrency: int = 16,
+        json_loads: Callable[[bytes], Any] = json.loads,
+        connector_settings: ConnectorSettings = None,
+        retry_policy: Optional[retry.RetryPolicy] = _DEFAULT,
+        metrics: metrics.Metrics = None
+    ) -> None:
         self.bot_token = bot_token
 
         self.boundary = boundary
 
         self.session: Optional[aiohttp.ClientSession] = None
+        self.connector_settings = connector_settings or ConnectorSettings()
+        self.connector: Optional[aiohttp.TCPConnector] = None
+
+        self.negative_ttl = negative_ttl
+        self.json_loads = json_loads
+        self.metrics = metrics
+
+        self.ratelimiter = ratelimit.RateLimiter()
+        self.max_ratelimit_retries = max_ratelimit_retries
+        self.retry_policy: Optional[retry.RetryPolicy] = (
+            retry.RetryPolicy() if retry_policy is _DEFAULT else retry_policy
+        )
+        self.scheduler: Optional[scheduler.RequestScheduler] = scheduler.RequestScheduler(
+            self.ratelimiter, max_concurrency=max_concurrency
+        )
+
+        # Concurrent identical GETs share one request
+        self.__inflight: Dict[str, asyncio.Task] = {}
+        # endpoint: (expiry time, error data) for GETs that returned 404
+        self.__not_found: Dict[str, Tuple[float, dict]] = {}
 
     async def login(self):
-        """Setup an authenticated session"""
+        """Setup an authenticated session, and open `connector_settings.prewarm` connections"""
 
         # Assume reauthenticate
         if self.session:
             await self.session.close()     
-        
-        self.session = aiohttp.ClientSession(headers={
+
+        # The connector outlives sessions, so connections survive reauthentication
+        if not self.connector or self.connector.closed:
+            self.connector = self.connector_settings.create_connector()
+
+        self.session = aiohttp.ClientSession(connector=self.connector, connector_owner=False, headers={
             "Authorization": f"Bot {self.bot_token}",
             "Accept": "application/json",
             "User-Agent": f"pycordia @ v{pycordia.__version__} on {platform.platform()}"
-        })
+        }, trace_configs=[_trace_config()])
+
+        if self.connector_settings.prewarm:
+            await self.prewarm(self.connector_settings.prewarm)
+
+    async def prewarm(self, count: int):
+        """Open connections to the API ahead of the first requests
+
+        Connections are opened with concurrent requests to the `gateway` \
+            endpoint, which needs no authentication, and are then kept in the pool.
+
+        Args:
+            count (int): The amount of connections to open
+        """
+        if not self.session:
+            raise pycordia.errors.ClientSetupError("No HTTP client session found.")
+
+        async def connect():
+            async with self.session.get(f"{pycordia.api_url}/gateway") as resp:
+                await resp.read()
 
-    async def create_multipart(self, data: Any, files: List['pycordia.models.File']) -> bytes:
+        results = await asyncio.gather(*(connect() for _ in range(count)), return_exceptions=True)
+        # Pre-warming is best effort, requests open connections as usual if it failed
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+
+    def websocket_session(self) -> aiohttp.ClientSession:
+        """Return a session for gateway connections, using the shared connector
+
+        The session does not send the authorization headers of REST requests, \
+            and closing it leaves the connector open.
+        """
+        if not self.connector or self.connector.closed:
+            self.connector = self.connector_settings.create_connector()
+        return aiohttp.ClientSession(connector=self.connector, connector_owner=False)
+
+    async def close(self):
+        """Close the session and the connections of the shared connector"""
+        for task in list(self.__inflight.values()):
+            task.cancel()
+
+        if self.session:
+            await self.session.close()
+            self.session = None
+        if self.connector:
+            await self.connector.close()
+            self.connector = None
+
+    async def create_multipart(self, data: Any, files: List['pycordia.models.File']) -> MultipartBody:
         """Create the multipart used when sending attachments through Discord
         
         Arguments:
@@ -44,27 +376,19 @@ class HTTPClient:
             files (List[pycordia.models.File]): The files to be sent in the message
 
         Returns:
-            A bytes object containing the constructed multipart string
+            A `MultipartBody` streaming the files when it is sent
         """
-        multipart = (f'--{self.boundary}\n' \
-                      'Content-Disposition: form-data; name="payload_json"\n' \
-                      'Content-Type: application/json\n\n' \
-                     f'{json.dumps(data, indent=4)}\n').encode("utf-8")
-
-        for i, fl in enumerate(files):
-            multipart += (f'--{self.boundary}\n' \
-                          f'Content-Disposition: form-data; name="files[{i}]"; filename="{fl.filename}"\n' \
-                           'Content-Type: application/octet-stream\n\n').encode("utf-8") + fl.fp.read() + b"\n"
-        multipart += f"--{self.boundary}--".encode("utf-8")
-
-        return multipart
+        return MultipartBody(data, files, self.boundary)
 
     async def request(
         self, method: str, endpoint: str, *,
         payload_json=None, 
         params: Dict[str, Any] = None,
-        files: List['pycordia.models.File'] = None
-    ) -> aiohttp.ClientResponse:
+        files: List['pycordia.models.File'] = None,
+        body: bytes = None,
+        priority: 'scheduler.Priority' = None,
+        deadline: float = None
+    ) -> Response:
         """Perform a request to the Discord API and return its response
 
         Arguments:
@@ -78,13 +402,34 @@ class HTTPClient:
             params (Dict[str, Any], optional): A mapping of URL query parameters
             files (List[pycordia.models.File], optional): \
                 A list of files to provide in the request.
+            body (bytes, optional): An already encoded JSON payload, \
+                sent as is instead of `payload_json`
+            priority (pycordia.scheduler.Priority, optional): The priority class \
+                of the request. Interaction callbacks are `Priority.interaction`, \
+                other requests `Priority.normal` by default.
+            deadline (float, optional): Seconds after which the request is \
+                dropped if it is still queued
+
+        Concurrent GET requests to the same endpoint share a single request,
+        and a GET that returned 404 fails again for `negative_ttl` seconds
+        without being sent.
+
+        Requests wait while their rate limit bucket is exhausted, and are
+        retried up to `max_ratelimit_retries` times after a 429 response.
+        Idempotent requests, and sends with an enforced nonce, are retried
+        after transient failures as `retry_policy` allows. A retried DELETE
+        answered with 404 succeeds, as an earlier attempt went through.
+        While buckets are exhausted, the scheduler sends the requests of
+        higher priority classes first.
 
         Returns:
-            An `aiohttp.ClientResponse` object once a response is received
+            A `Response` holding the decoded body, status code and rate limit headers
 
         Raises:
             `pycordia.errors.HTTPError`: If the HTTP status code is above 400. 
+            `pycordia.errors.TooManyRequests`: If the request is still rate limited after every retry
             `pycordia.errors.ClientSetupError`: If no active session is found
+            `pycordia.errors.DeadlineExceeded`: If the deadline passed before the request was sent
         """
         if not payload_json:
             payload_json = {}
@@ -105,32 +450,170 @@ class HTTPClient:
             if param_list:
                 endpoint = f"{endpoint}?{'&'.join(param_list)}"
 
-        if files:
+        send = functools.partial(self.__send, method, endpoint, payload_json, files, body)
+        if self.scheduler:
+            send = functools.partial(
+                self.scheduler.submit, method, endpoint, send,
+                priority=priority, deadline=deadline
+            )
+
+        if method.upper() == "GET" and not files and not payload_json and body is None:
+            return await self.__coalesced_get(endpoint, send)
+
+        return await send()
+
+    async def __coalesced_get(self, endpoint: str, send) -> Response:
+        not_found = self.__not_found.get(endpoint)
+        if not_found:
+            if not_found[0] > time.monotonic():
+                raise pycordia.errors.determine_error(404, not_found[1])
+            del self.__not_found[endpoint]
+
+        # The request runs in a task of its own, so that a caller being
+        # cancelled does not cancel it for the other callers
+        task = self.__inflight.get(endpoint)
+        if task is None:
+            task = self.__inflight[endpoint] = asyncio.ensure_future(self.__shared_get(endpoint, send))
+            task.add_done_callback(functools.partial(self.__finish_get, endpoint))
+
+        return await asyncio.shield(task)
+
+    async def __shared_get(self, endpoint: str, send) -> Response:
+        try:
+            return await send()
+        except pycordia.errors.NotFound as error:
+            if self.negative_ttl > 0:
+                self.__remember_not_found(endpoint, error.data)
+            raise
+
+    def __finish_get(self, endpoint: str, task: asyncio.Future):
+        if self.__inflight.get(endpoint) is task:
+            del self.__inflight[endpoint]
+
+        # Retrieve the exception so that it is not logged when every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def __remember_not_found(self, endpoint: str, data: dict):
+        now = time.monotonic()
+
+        # Entries are kept in the order they expire in while `negative_ttl` is unchanged
+        while self.__not_found:
+            oldest = next(iter(self.__not_found))
+            if self.__not_found[oldest][0] > now and len(self.__not_found) < NOT_FOUND_CACHE_SIZE:
+                break
+            del self.__not_found[oldest]
+
+        self.__not_found[endpoint] = (now + self.negative_ttl, data)
+
+    async def __backoff(self, delay: float):
+        """Wait before sending a request again, giving its scheduler slot to other requests"""
+        if self.scheduler is not None:
+            await self.scheduler.sleep(delay)
+        else:
+            await asyncio.sleep(delay)
+
+    async def __send(self, method: str, endpoint: str, payload_json, files,
+        body: bytes = None
+    ) -> Response:
+        if body is not None:
+            content_type = "application/json"
+            kws = { "data": body }
+        elif files:
             multipart = await self.create_multipart(payload_json, files)
-            content_type = f'multipart/form-data; boundary="{self.boundary}"'
+            content_type = multipart.content_type
 
             kws = { "data": multipart }
         else:
-            multipart = ""
             content_type = "application/json"
             kws = { "json": payload_json } if payload_json else {}
 
-        async with self.session.request(
-            method, f"{pycordia.api_url}/{endpoint}", 
-            **kws, headers={ "Content-Type": content_type }
-        ) as resp:
-            # 204 No Content
-            if resp.status == 204:
-                # NOTE: Makeshift solution, might want to improve
-                async def json(**kwargs):
-                    return {}
-                resp.json = json
-                
-                return resp
-
-            rs = await resp.json()
+        policy = self.retry_policy
+        retryable = policy is not None and policy.is_retryable(
+            method, body if body is not None else payload_json
+        )
+        if policy is not None:
+            policy.record_request()
+
+        sink = self.metrics
+        trace = _RequestTrace(sink, metrics.route_template(method, endpoint)) if sink else None
+
+        ratelimited = retries = 0
+        while True:
+            started = time.perf_counter()
+            bucket = await self.ratelimiter.acquire(method, endpoint)
+            sent = time.perf_counter()
+
+            if trace:
+                sink.observe("http.ratelimit_wait", trace.route, sent - started)
+                sink.increment("http.requests", trace.route)
+
+            resp = None
+            try:
+                async with self.session.request(
+                    method, f"{pycordia.api_url}/{endpoint}", 
+                    **kws, headers={ "Content-Type": content_type },
+                    trace_request_ctx=trace
+                ) as resp:
+                    self.ratelimiter.update(method, endpoint, bucket, resp.headers)
+
+                    raw = await resp.read()
+            except retry.TRANSIENT_ERRORS:
+                if resp is None:
+                    bucket.release()
+                if trace:
+                    sink.increment("http.errors", trace.route)
+
+                delay = policy.next_delay(retries) if retryable else None
+                if delay is None:
+                    raise
+                retries += 1
+                await self.__backoff(delay)
+                continue
+            except BaseException:
+                if resp is None:
+                    bucket.release()
+                raise
+
+            if trace:
+                sink.observe("http.latency", trace.route, time.perf_counter() - sent)
+                sink.observe("http.response_size", trace.route, len(raw))
+                sink.increment(f"http.status.{resp.status}", trace.route)
+
+            if not raw:
+                data = None
+            elif resp.content_type == "application/json":
+                data = self.json_loads(raw)
+            else:
+                data = raw.decode(resp.charset or "utf-8", "replace")
+            # Error bodies are JSON objects, unless a proxy in front of the API answered
+            error = data if isinstance(data, dict) else {"message": str(data)}
+
+            if resp.status == 429 and ratelimited < self.max_ratelimit_retries:
+                ratelimited += 1
+                self.ratelimiter.rate_limited(
+                    bucket, float(error.get("retry_after", resp.headers.get("Retry-After", 1))),
+                    is_global=bool(error.get("global") or resp.headers.get("X-RateLimit-Global"))
+                )
+                # Queued again, to wait for the bucket to reset without a slot
+                await self.__backoff(0)
+                continue
+
+            if resp.status >= 500 and retryable:
+                delay = policy.next_delay(retries)
+                if delay is not None:
+                    retries += 1
+                    await self.__backoff(delay)
+                    continue
+
+            if resp.status == 404 and retries and method.upper() == "DELETE":
+                # An earlier attempt deleted it, but its response was lost
+                policy.stats.recovered += 1
+                return Response(resp.status, resp.headers, data)
 
             if not resp.ok:
-                raise pycordia.errors.determine_error(resp.status, rs)
-            
-            return resp
+                raise pycordia.errors.determine_error(resp.status, error)
+
+            if retries:
+                policy.stats.recovered += 1
+            return Response(resp.status, resp.headers, data)
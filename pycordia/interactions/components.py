@@ -18,6 +18,8 @@ class ButtonStyles(enum.Enum):
 
 
 class SelectMenuOption:
+    __slots__ = ("label", "value", "description", "emoji", "default")
+
     def __init__(self, *, label: str, value: str, 
         description: str = None, emoji: dict = None, 
         default: bool = False
@@ -46,6 +48,8 @@ class SelectMenu:
 
 
 class Button:
+    __slots__ = ("__on_click_func", "custom_id", "disabled", "style", "label", "emoji", "url")
+
     def __init__(self, *, custom_id: str = None, disabled: bool = False, 
         style: ButtonStyles, label: str, emoji = None, url: str = None
     ) -> None:
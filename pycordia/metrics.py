@@ -0,0 +1,189 @@
+import bisect
+import re
+import typing
+
+
+# Upper bounds of histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1 << 20, 4 << 20, 16 << 20)
+
+_MAJOR_PLACEHOLDERS = {"channels": "{channel_id}", "guilds": "{guild_id}", "webhooks": "{webhook_id}"}
+
+_SNOWFLAKE = re.compile(r"^[0-9]{15,21}$")
+
+
+def route_template(method: str, endpoint: str) -> str:
+    """Return the route of a request with every ID replaced by a placeholder
+
+    Unlike `pycordia.ratelimit.route_key`, major parameters are replaced too, \
+        so requests to every channel or guild share a route.
+
+    Returns: The route (example: `GET channels/{channel_id}/messages/{id}`)
+    """
+    segments = endpoint.split("?", 1)[0].strip("/").split("/")
+
+    route = []
+    for index, segment in enumerate(segments):
+        previous = segments[index - 1] if index else None
+
+        if previous in _MAJOR_PLACEHOLDERS:
+            route.append(_MAJOR_PLACEHOLDERS[previous])
+        elif index > 1 and segments[index - 2] in ("webhooks", "interactions"):
+            route.append("{token}")
+        elif previous == "reactions":
+            route.append("{emoji}")
+        elif _SNOWFLAKE.match(segment):
+            route.append("{id}")
+        else:
+            route.append(segment)
+
+    return f"{method.upper()} {'/'.join(route)}"
+
+
+class Metrics:
+    """Receives the measurements of REST requests
+
+    This class ignores them. Subclass it and override `observe` and `increment` \
+        to send them to a metrics system, or use `InMemoryMetrics`.
+
+    Histograms recorded by `pycordia.http.HTTPClient`, in seconds unless noted:
+        `http.dns`: Resolving the API host, for new connections
+        `http.connect`: Opening a connection, including TLS
+        `http.ttfb`: From sending a request to receiving the response headers
+        `http.latency`: From sending a request to reading the whole response
+        `http.response_size`: Size of the response body, in bytes
+        `http.ratelimit_wait`: Waiting for the rate limit before sending
+
+    Counters:
+        `http.requests`: Requests sent, retries included
+        `http.status.<code>`: Responses with each status code
+        `http.errors`: Requests that failed with a connection error or timeout
+    """
+
+    def observe(self, name: str, route: str, value: float):
+        """Record a value in a histogram
+
+        Args:
+            name (str): The name of the histogram (example: `http.latency`)
+            route (str): The route of the request, from `route_template`
+            value (float): The measured value
+        """
+
+    def increment(self, name: str, route: str, value: int = 1):
+        """Add to a counter
+
+        Args:
+            name (str): The name of the counter (example: `http.requests`)
+            route (str): The route of the request, from `route_template`
+            value (int, optional): The amount to add
+        """
+
+
+class Histogram:
+    """Counts values in fixed buckets
+
+    Attributes:
+        bounds (Tuple[float, ...]): Upper bound of every bucket but the last, \
+            which holds values above every bound
+        counts (List[int]): Values in each bucket
+        count (int): Values recorded
+        total (float): Sum of the values
+        min (Optional[float]): Lowest value
+        max (Optional[float]): Highest value
+    """
+    __slots__ = ("bounds", "counts", "count", "total", "min", "max")
+
+    def __init__(self, bounds: typing.Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: typing.Optional[float] = None
+        self.max: typing.Optional[float] = None
+
+    def observe(self, value: float):
+        """Record a value"""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        """Average of the values"""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Return the upper bound of the bucket holding a percentile
+
+        Args:
+            percent (float): The percentile, between 0 and 100
+
+        Returns: The bound, or the highest value for the last bucket
+        """
+        if not self.count:
+            return 0.0
+
+        rank = percent / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return self.max
+
+    def __repr__(self):
+        return (
+            f"<Histogram count={self.count} mean={self.mean:.4g} "
+            f"p50={self.percentile(50):.4g} p99={self.percentile(99):.4g} max={self.max}>"
+        )
+
+
+class InMemoryMetrics(Metrics):
+    """Keeps histograms and counters per route in memory
+
+    Attributes:
+        histograms (Dict[Tuple[str, str], Histogram]): A mapping of (name, route) - `Histogram`
+        counters (Dict[Tuple[str, str], int]): A mapping of (name, route) - count
+    """
+
+    def __init__(self, *, bounds: typing.Dict[str, typing.Sequence[float]] = None):
+        """
+        Args:
+            bounds (Dict[str, Sequence[float]], optional): Bucket bounds per histogram name. \
+                Histograms whose name ends in `size` use `SIZE_BUCKETS` by default, \
+                others `LATENCY_BUCKETS`.
+        """
+        self.bounds = bounds or {}
+        self.histograms: typing.Dict[typing.Tuple[str, str], Histogram] = {}
+        self.counters: typing.Dict[typing.Tuple[str, str], int] = {}
+
+    def observe(self, name: str, route: str, value: float):
+        histogram = self.histograms.get((name, route))
+        if histogram is None:
+            bounds = self.bounds.get(name) or (SIZE_BUCKETS if name.endswith("size") else LATENCY_BUCKETS)
+            histogram = self.histograms[name, route] = Histogram(bounds)
+        histogram.observe(value)
+
+    def increment(self, name: str, route: str, value: int = 1):
+        self.counters[name, route] = self.counters.get((name, route), 0) + value
+
+    def histogram(self, name: str, route: str) -> typing.Optional[Histogram]:
+        """Return the histogram of a route, None if nothing was recorded"""
+        return self.histograms.get((name, route))
+
+    def counter(self, name: str, route: str) -> int:
+        """Return the counter of a route"""
+        return self.counters.get((name, route), 0)
+
+    def routes(self) -> typing.List[str]:
+        """Return every route with measurements, sorted"""
+        return sorted({route for _, route in self.histograms} | {route for _, route in self.counters})
+
+    def clear(self):
+        """Drop every measurement"""
+        self.histograms.clear()
+        self.counters.clear()
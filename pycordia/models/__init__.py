@@ -7,7 +7,7 @@ from .message import (
     Reaction, MessageActivity
 )
 from .guild import (
-    Guild, Emoji, Role, Member, PartialGuild
+    Guild, Emoji, Role, Member, PartialGuild, SystemChannelFlags
 )
 from .channel import (
     Channel, ChannelMention
@@ -16,6 +16,7 @@ from .user import (
     Connection, User
 )
 from .webhook import Webhook
+from .template import Field, MessageTemplate
 
 active_client: 'pycordia.client.Client | None' = None
 
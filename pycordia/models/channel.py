@@ -1,6 +1,6 @@
 import enum
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 
 import pycordia
 from pycordia import utils, models
@@ -29,12 +29,22 @@ class Channel:
         - x == y: Checks if two channels are the same
     """
 
+    __slots__ = (
+        "__client", "__data", "id", "type", "guild_id", "position", "permission_overwrites", "name",
+        "topic", "nsfw", "last_message_id", "bitrate", "user_limit", "rate_limit_per_user",
+        "recipients", "icon_hash", "owner_id", "application_id", "parent_id",
+        "last_pin_timestamp", "rtc_region", "video_quality_mode", "message_count",
+        "member_count", "thread_metadata", "thread_member",
+        "thread_default_auto_archive_duration", "permissions"
+    )
+
     def __init__(self, data: dict):
         self.__client = pycordia.models.active_client
+        self.__data = data
 
-        self.id: str = data["id"]
+        self.id: utils.Snowflake = utils.snowflake(data["id"])
         self.type = ChannelType(data["type"])
-        self.guild_id: Optional[str] = data.get("guild_id")
+        self.guild_id: Optional[utils.Snowflake] = utils.snowflake(data.get("guild_id"))
         self.position: Optional[int] = data.get("position")
 
         # TODO: Define overwrite model
@@ -43,7 +53,7 @@ class Channel:
         self.name: Optional[str] = data.get("name")
         self.topic: Optional[str] = data.get("topic")
         self.nsfw: Optional[bool] = data.get("nsfw")
-        self.last_message_id: Optional[str] = data.get("last_message_id")
+        self.last_message_id: Optional[utils.Snowflake] = utils.snowflake(data.get("last_message_id"))
        
         # -- Voice channel
         self.bitrate: Optional[int] = data.get("bitrate")
@@ -55,11 +65,11 @@ class Channel:
         
         self.icon_hash: Optional[str] = data.get("icon")
 
-        self.owner_id: Optional[str] = data.get("owner_id")
-        self.application_id: Optional[str] = data.get("application_id")
-        self.parent_id: Optional[str] = data.get("parent_id")
+        self.owner_id: Optional[utils.Snowflake] = utils.snowflake(data.get("owner_id"))
+        self.application_id: Optional[utils.Snowflake] = utils.snowflake(data.get("application_id"))
+        self.parent_id: Optional[utils.Snowflake] = utils.snowflake(data.get("parent_id"))
 
-        self.last_pin_timestamp: Optional[datetime] = utils.make_optional(datetime.fromisoformat, data.get("last_pin_timestamp"))
+        self.last_pin_timestamp: Optional[datetime] = utils.make_optional(utils.parse_timestamp, data.get("last_pin_timestamp"))
         self.rtc_region: Optional[str] = data.get("rtc_region")
         self.video_quality_mode: Optional[int] = data.get("video_quality_mode")
 
@@ -74,6 +84,14 @@ class Channel:
 
         self.permissions: Optional[str] = data.get("permissions")
 
+    def to_dict(self) -> dict:
+        """Return the payload this channel was created from"""
+        data = dict(self.__data)
+        # Channels sent in a guild payload do not include their guild ID
+        if self.guild_id and "guild_id" not in data:
+            data["guild_id"] = str(self.guild_id)
+        return data
+
     def __repr__(self):
         return f"<Channel {self.type} id={self.id} name='{self.name}' topic='{self.topic}'>"
 
@@ -88,7 +106,26 @@ class Channel:
         """A channel mention"""
         return f"<#{self.id}>"
 
+    def permissions_for(self, member: Union[str, 'pycordia.models.Member']
+    ) -> 'Optional[pycordia.permissions.Permissions]':
+        """
+        Compute the permissions of a member in this channel from the client's state
+
+        Args:
+            member (Union[str, pycordia.models.Member]): A member, or the ID of a cached member
+
+        Returns: `pycordia.permissions.Permissions`, or None if the guild, \
+            member or channel is not cached
+        """
+        if not self.__client:
+            raise pycordia.errors.ClientSetupError
+
+        if not self.guild_id:
+            return None
+        return self.__client.permissions.permissions_for(self.guild_id, member, self.id)
+
     @classmethod
+    @utils.singleflight(lambda cls, channel_id: utils.snowflake(channel_id))
     async def from_id(cls, channel_id: str):
         """
         Fetch a Channel object from its ID.
@@ -104,7 +141,7 @@ class Channel:
         client = pycordia.models.active_client
 
         rs = await client.http.request("GET", f"channels/{channel_id}")
-        return Channel(await rs.json())
+        return Channel(rs.data)
 
     async def get_message(self, message_id: str, use_cache: bool = True) -> 'pycordia.models.Message':
         """ 
@@ -119,6 +156,8 @@ class Channel:
         if not self.__client:
             raise pycordia.errors.ClientSetupError
 
+        message_id = utils.snowflake(message_id)
+
         if use_cache:
             message = self.__client.message_cache.get(message_id)
 
@@ -129,10 +168,14 @@ class Channel:
                     raise ValueError("Message does not belong to this channel.")
                     
         rs = await self.__client.http.request("GET", f"channels/{self.id}/messages/{message_id}")
-        return pycordia.models.Message(await rs.json())
+        message = pycordia.models.Message(rs.data)
+
+        self.__client.message_cache[message.id] = message
+        return message
 
     async def get_messages(self, limit: int = 50, *, 
-        before: str = None, around: str = None, after: str = None
+        before: str = None, around: str = None, after: str = None,
+        use_cache: bool = True
     ) -> List['pycordia.models.Message']:
         """ 
         Get the most recent messages, given a limit (by default 50)
@@ -143,11 +186,22 @@ class Channel:
             before (str): Get messages before the message ID, as a string
             around (str): Get messages around the message ID, as a string
             after (str): Get messages after the message ID, as a string
+            use_cache (bool, defaults to True): Whether to serve the messages from \
+                the client's cache when it holds all of them
 
-        Returns: A list of `pycordia.models.Message` objects
+        Returns: A list of `pycordia.models.Message` objects, newest first
         """
         if not self.__client:
             raise pycordia.errors.ClientSetupError
+
+        if use_cache and not around:
+            message_ids = self.__client.history.query(
+                self.id, limit, before=utils.snowflake(before), after=utils.snowflake(after)
+            )
+            if message_ids is not None:
+                messages = [self.__client.message_cache.peek(message_id) for message_id in message_ids]
+                if all(messages):
+                    return messages
         
         param_string = f"?limit={limit}"
 
@@ -158,7 +212,7 @@ class Channel:
         rs = await self.__client.http.request(
             "GET", f"channels/{self.id}/messages{param_string}"
         )
-        return list(map(pycordia.models.Message, await rs.json()))
+        return list(map(pycordia.models.Message, rs.data))
 
     async def send(self, *,
         content: str = "", 
@@ -193,7 +247,7 @@ class Channel:
             raise pycordia.errors.ClientSetupError
         
         rs = await self.__client.http.request("GET", f"channels/{self.id}/pins/")
-        return list(map(pycordia.models.Message, await rs.json()))
+        return list(map(pycordia.models.Message, rs.data))
 
     async def delete(self) -> None:
         """Delete this channel. This action cannot be undone."""
@@ -218,14 +272,16 @@ class ChannelMention:
     Represents a channel mention i.e. <#channel_id>
 
     Attributes:
-        channel_id (str): ID of the channel
-        guild_id (str): ID of the channel's guild
+        channel_id (Snowflake): ID of the channel
+        guild_id (Snowflake): ID of the channel's guild
         channel_type (str): Type of the channel
         channel_name (str): Name of channel
     """
+    __slots__ = ("channel_id", "guild_id", "channel_type", "channel_name")
+
     def __init__(self, data: dict):
-        self.channel_id: str = data["id"]
-        self.guild_id: str = data["guild_id"]
+        self.channel_id: utils.Snowflake = utils.snowflake(data["id"])
+        self.guild_id: utils.Snowflake = utils.snowflake(data["guild_id"])
         self.channel_type: str = data["type"]
         self.channel_name: str = data["name"]
     
@@ -17,6 +17,11 @@ class Embed:
         fields (list): Embed fields
     """
 
+    __slots__ = (
+        "title", "embed_type", "description", "url", "timestamp", "color", "colour", "fields",
+        "__thumbnail", "__image", "__video", "__footer", "__author", "__provider"
+    )
+
     def __init__(self, data: dict):
         self.title: str = data.get("title", "")
         self.embed_type: str = data.get("type", "rich")
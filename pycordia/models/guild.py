@@ -13,8 +13,13 @@ from .user import User
 
 class Emoji:
     """Represents server specific emojis."""
+    __slots__ = (
+        "emoji_id", "name", "roles", "user", "requires_colons", "managed", "animated",
+        "available"
+    )
+
     def __init__(self, data: dict):
-        self.emoji_id: Optional[str] = data.get("id")
+        self.emoji_id: Optional[utils.Snowflake] = utils.snowflake(data.get("id"))
         self.name: Optional[str] = data.get("name")
         self.roles: List[Role] = list(map(Role, data.get("roles", [])))
         self.user: Optional[User] = utils.make_optional(User, data.get("user", {}))
@@ -34,7 +39,7 @@ class Member:
     Attributes:
         user (User): The `pycordia.models.user.User` instance of the member
         nick (str): Nickname of the user. Can be `None` if no nickname has been set
-        role_ids (List[Role]): The ID of the roles the user has
+        role_ids (List[Snowflake]): The ID of the roles the user has
         joined_at (datetime): The time the user joined
         premium_since (datetime): The time the user started boosting the server
         deaf (bool): Whether the user has been deafened in a voice channel
@@ -46,15 +51,20 @@ class Member:
         - x == y: Checks if two channels are the same; returns None if a user is not present
         - repr(x): Returns a representation of this object
     """
+    __slots__ = (
+        "user", "nick", "guild_avatar_hash", "role_ids", "joined_at", "premium_since", "deaf",
+        "mute", "pending", "permissions"
+    )
+
     def __init__(self, data: dict):
         self.user: Optional[User] = utils.make_optional(User, data.get("user", {}))
         self.nick: Optional[str] = data.get("nick")
         self.guild_avatar_hash: Optional[str] = data.get("avatar")
-        self.role_ids: list = data.get("roles", [])
+        self.role_ids: List[utils.Snowflake] = [utils.snowflake(role_id) for role_id in data.get("roles", [])]
         # NOTE: Uncomment when Roles are properly implemented
         # self.roles: list = list(map(Role, data.get("roles", [])))
-        self.joined_at: datetime = datetime.fromisoformat(data["joined_at"])
-        self.premium_since: Optional[datetime] = utils.make_optional(datetime.fromisoformat, data.get("premium_since"))
+        self.joined_at: datetime = utils.parse_timestamp(data["joined_at"])
+        self.premium_since: Optional[datetime] = utils.make_optional(utils.parse_timestamp, data.get("premium_since"))
 
         self.deaf: bool = data["deaf"]
         self.mute: bool = data["mute"]
@@ -75,14 +85,16 @@ class PartialGuild:
     Represents a partial guild
     
     Attributes:
-        id (str): ID of the guild.
+        id (Snowflake): ID of the guild.
         name (str): Name of the guild.
         icon (str): Hash of the guild's icon.
         owner (bool): Whether the connected user owns this guild.
         features (List[str]): List of features available to the guild.
     """
+    __slots__ = ("id", "name", "icon_hash", "owner", "permissions", "features")
+
     def __init__(self, data: dict):
-        self.id: str = data["id"]
+        self.id: utils.Snowflake = utils.snowflake(data["id"])
         self.name: str = data["name"]
         self.icon_hash: Optional[str] = data.get("icon")
         self.owner: Optional[bool] = data.get("owner")
@@ -94,9 +106,11 @@ class PartialGuild:
 
 
 class RoleTags:
+    __slots__ = ("bot_id", "integration_id", "premium_subscriber")
+
     def __init__(self, data: dict):
-        self.bot_id = data.get("bot_id")
-        self.integration_id = data.get("integration_id")
+        self.bot_id: Optional[utils.Snowflake] = utils.snowflake(data.get("bot_id"))
+        self.integration_id: Optional[utils.Snowflake] = utils.snowflake(data.get("integration_id"))
         self.premium_subscriber = data.get("premium_subscriber")
 
     def __repr__(self):
@@ -108,7 +122,7 @@ class Role:
     Model to represent a guild's role.
 
     Attributes:
-        id (str): ID of role
+        id (Snowflake): ID of role
         name (str): Name of role
         color (int): Role color
         colour (int): Role colour
@@ -126,8 +140,13 @@ class Role:
         - x > y: Checks if role `x` is higher up than role `y`
         - x < y: Checks if role `y` is higher up than role `x`
     """
+    __slots__ = (
+        "role_id", "role_name", "color", "colour", "hoist", "position", "permissions",
+        "managed", "mentionable", "tags"
+    )
+
     def __init__(self, data: dict):
-        self.role_id: Union[str, None] = data.get("id")
+        self.role_id: Union[utils.Snowflake, None] = utils.snowflake(data.get("id"))
         self.role_name: Union[str, None] = data.get("name")
 
         self.color: Union[int, None] = data.get("color")
@@ -147,11 +166,12 @@ class Role:
     
     def __gt__(self, other) -> bool:
         """Check if the role is higher up than another"""
-        return self.role_id > other.role_id
+        # Roles sharing a position are ordered by ID, the oldest being higher up
+        return (self.position, other.role_id) > (other.position, self.role_id)
 
     def __lt__(self, other) -> bool:
         """Check if the role is lower than another"""
-        return self.role_id < other.role_id
+        return other > self
 
     def __repr__(self):
         return f"<Role id={self.role_id} name='{self.role_name}'>"
@@ -190,22 +210,47 @@ class GuildPremiumTier(enum.Enum):
     tier_2 = 2
     tier_3 = 3
 
+class SystemChannelFlags(utils.BoolEnum):
+    """Flags of a guild's system channel, see `Guild.system_channel_flags`
+
+    Use `SystemChannelFlags.from_int` to read them and `int(x)` to send them.
+    """
+    suppress_join_notifications = 1 << 0
+    suppress_premium_subscriptions = 1 << 1
+    suppress_guild_reminder_notifications = 1 << 2
+    suppress_join_notification_replies = 1 << 3
+
 class Guild:
     """A Discord guild"""
+    __slots__ = (
+        "id", "name", "icon_hash", "template_icon_hash", "splash_hash", "discovery_splash_hash",
+        "is_bot_owner", "owner_id", "permissions", "afk_channel_id", "afk_timeout",
+        "has_widget_enabled", "widget_channel_id", "verification_level",
+        "message_notifications_level", "explicit_content_filter", "roles", "emojis", "features",
+        "mfa_level", "application_id", "system_channel_id", "system_channel_flags",
+        "rules_channel_id", "joined_at", "large", "unavailable", "member_count", "voice_states",
+        "members", "channels", "threads", "presences", "max_presences", "max_members",
+        "vanity_url_code", "description", "banner_hash", "premium_tier",
+        "premium_subscription_count", "preferred_locale", "public_updates_channel_id",
+        "max_video_channel_users", "approximate_member_count", "approximate_presence_count",
+        "welcome_screen", "nsfw_level", "stage_instances", "stickers", "scheduled_events",
+        "premium_progress_bar_enabled"
+    )
+
     def __init__(self, data: dict) -> None:
-        self.id: str = data["id"]
+        self.id: utils.Snowflake = utils.snowflake(data["id"])
         self.name: str = data["name"]
         self.icon_hash: Optional[str] = data.get("icon")
         self.template_icon_hash: Optional[str] = data.get("icon_hash")
         self.splash_hash: Optional[str] = data.get("splash")
         self.discovery_splash_hash: Optional[str] = data.get("discovery_splash")
         self.is_bot_owner: Optional[str] = data.get("owner")
-        self.owner_id: str = data["owner_id"]
+        self.owner_id: utils.Snowflake = utils.snowflake(data["owner_id"])
         self.permissions: Optional[str] = data.get("permissions")
-        self.afk_channel_id: Optional[str] = data.get("afk_channel_id")
+        self.afk_channel_id: Optional[utils.Snowflake] = utils.snowflake(data.get("afk_channel_id"))
         self.afk_timeout: int = data["afk_timeout"]
         self.has_widget_enabled: Optional[bool] = data.get("widget_enabled")
-        self.widget_channel_id: Optional[str] = data.get("widget_channel_id")
+        self.widget_channel_id: Optional[utils.Snowflake] = utils.snowflake(data.get("widget_channel_id"))
         self.verification_level = GuildVerificationLevel(data["verification_level"])
         self.message_notifications_level = GuildNotificationLevel(data["default_message_notifications"])
         self.explicit_content_filter = GuildExplicitContentFilter(data["explicit_content_filter"])
@@ -213,10 +258,12 @@ class Guild:
         self.emojis: List[Emoji] = [Emoji(emoji) for emoji in data["emojis"]]
         self.features: List[str] = data["features"]
         self.mfa_level = GuildMFALevel(data["mfa_level"])
-        self.application_id: Optional[str] = data.get("application_id")
-        self.system_channel_id: Optional[str] = data.get("system_channel_id")
-        self.system_channel_flags = data.get("system_channel_flags")
-        self.rules_channel_id: Optional[str] = data.get("rules_channel_id")
+        self.application_id: Optional[utils.Snowflake] = utils.snowflake(data.get("application_id"))
+        self.system_channel_id: Optional[utils.Snowflake] = utils.snowflake(data.get("system_channel_id"))
+        self.system_channel_flags: Optional[SystemChannelFlags] = SystemChannelFlags.from_int(
+            data["system_channel_flags"]
+        ) if data.get("system_channel_flags") is not None else None
+        self.rules_channel_id: Optional[utils.Snowflake] = utils.snowflake(data.get("rules_channel_id"))
         self.joined_at: Optional[str] = data.get("joined_at")
         self.large: Optional[bool] = data.get("large")
         self.unavailable: Optional[bool] = data.get("unavailable")
@@ -234,7 +281,7 @@ class Guild:
         self.premium_tier = GuildPremiumTier(data["premium_tier"])
         self.premium_subscription_count: Optional[int] = data.get("premium_subscription_count")
         self.preferred_locale: str = data["preferred_locale"]
-        self.public_updates_channel_id: Optional[str] = data.get("public_updates_channel_id")
+        self.public_updates_channel_id: Optional[utils.Snowflake] = utils.snowflake(data.get("public_updates_channel_id"))
         self.max_video_channel_users: Optional[int] = data.get("max_video_channel_users")
         self.approximate_member_count: Optional[int] = data.get("approximate_member_count")
         self.approximate_presence_count: Optional[int] = data.get("approximate_presence_count")
@@ -249,6 +296,7 @@ class Guild:
         self.premium_progress_bar_enabled = data.get("premium_progress_bar_enabled")
 
     @classmethod
+    @utils.singleflight(lambda cls, guild_id, *, with_counts=False: (utils.snowflake(guild_id), with_counts))
     async def from_id(cls, guild_id: str, *, with_counts: bool = False) -> Guild:
         """Get a guild from an ID
         
@@ -269,23 +317,30 @@ class Guild:
                 "with_counts": with_counts
             }
         )
-        return Guild(await rs.json())
+        return Guild(rs.data)
 
-    async def get_member(self, user_id: str) -> models.Member:
+    async def get_member(self, user_id: str, *, use_cache: bool = True) -> models.Member:
         """Get a Discord member with guild-specific information
 
         Arguments:
             user_id (str): The ID (or snowflake) of the user
+            use_cache (bool, optional): Whether to check the client's state first. \
+                Defaults to True.
         """
         client = pycordia.models.active_client
         if not client:
             raise pycordia.errors.ClientSetupError
 
+        if use_cache:
+            member = client.state.get_member(self.id, user_id)
+            if member:
+                return member
+
         rs = await client.http.request(
             "GET", f"guilds/{self.id}/members/{user_id}"
         )
 
-        return models.Member(await rs.json())
+        return models.Member(rs.data)
 
     async def get_guild_members(self, *, limit: int = 10, after: Optional[str] = None):
         """Get a list of all guild members given `limit` and `after` if provided.
@@ -305,10 +360,11 @@ class Guild:
             params={
                 "limit": limit,
                 "after": after
-            }
+            },
+            priority=pycordia.scheduler.Priority.background
         )
 
-        return list(map(models.Member, await rs.json()))
+        return list(map(models.Member, rs.data))
 
     async def search_guild_members(self, query: str, *, limit: int = 1):
         """Get a list of guild members whose display name starts with `query`
@@ -330,4 +386,4 @@ class Guild:
             }
         )
 
-        return list(map(models.Member, await rs.json()))
\ No newline at end of file
+        return list(map(models.Member, rs.data))
\ No newline at end of file
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import enum
 import io
+import mmap
+import os
 from datetime import datetime
 from typing import List, Optional, Union
 
@@ -24,6 +26,8 @@ class MessageActivity:
         party_id (str): ID of the party
     """
 
+    __slots__ = ("activity_type", "party_id")
+
     def __init__(self, data: dict):
         self.activity_type = utils.make_optional(MessageActivityType, data.get("type"))
         self.party_id: Optional[str] = data.get("party_id")
@@ -34,8 +38,14 @@ class MessageActivity:
 
 class Application:
     """Discord application model."""
+    __slots__ = (
+        "id", "name", "icon_hash", "description", "rpc_origins", "bot_public",
+        "bot_require_code_grant", "terms_of_service_url", "privacy_policy_url", "owner",
+        "cover_image_hash", "flags"
+    )
+
     def __init__(self, data: dict):
-        self.id: str = data["id"]
+        self.id: utils.Snowflake = utils.snowflake(data["id"])
         self.name: str = data["name"]
         self.icon_hash: Optional[str] = data.get("icon")
         self.description: str = data["description"]
@@ -69,6 +79,8 @@ class Application:
 
 class Reaction:
     """Represents reactions in a message."""
+    __slots__ = ("count", "me", "emoji")
+
     def __init__(self, data: dict):
         self.count: Optional[int] = data.get("count")
         self.me: Optional[bool] = data.get("me")
@@ -81,10 +93,12 @@ class Reaction:
 
 class StickerItem:
     """Represents a Discord sticker item"""
+    __slots__ = ("sticker_id", "name", "format_type")
+
     def __init__(self, data: dict):
-        self.sticker_id = data.get("id")
+        self.sticker_id: Optional[utils.Snowflake] = utils.snowflake(data.get("id"))
         self.name = data.get("name")
-        self.format_type = data.get("type")
+        self.format_type = data.get("format_type", data.get("type"))
 
     def __repr__(self):
         return f"<StickerItem id={self.sticker_id} name='{self.name}'>"
@@ -95,7 +109,7 @@ class Attachment:
     An attachment for a message
 
     Attributes:
-        attachment_id (int): The ID of the attachment
+        id (Snowflake): The ID of the attachment
         filename (str): The attachment's filename
         content_type (str): The content type
         size (int): File size
@@ -104,8 +118,10 @@ class Attachment:
         height (int): Height of attachment (only applies to images)
         width (int): Width of the attachment (only applies to images)
     """
+    __slots__ = ("id", "filename", "content_type", "size", "url", "proxy_url", "height", "width")
+
     def __init__(self, data: dict):
-        self.id: str = data["id"]
+        self.id: utils.Snowflake = utils.snowflake(data["id"])
         self.filename: str = data["filename"]
         self.content_type: Optional[str] = data.get("content_type")
         self.size: Optional[int] = data.get("size")
@@ -124,13 +140,23 @@ class Attachment:
 
 class File:
     """Represents a file, sent to Discord when sending an attachment
-    
+
+    Files are read in chunks while they are uploaded, from the current \
+        position of a file object, from a path, or from bytes-like data \
+        such as an `mmap.mmap` region.
+
     Attributes
         filename (str): The filename for the attachment
-        fp (io.BufferedIOBase): A file object for the attachment
+        fp (Union[io.BufferedIOBase, str, os.PathLike, bytes, memoryview, mmap.mmap]): \
+            A file object, the path of a file, or the data of the attachment
         description (str): A description of the attachment used as alt text
     """
-    def __init__(self, *, filename: str, fp: io.BufferedIOBase, description: str = None):
+    __slots__ = ("filename", "fp", "description")
+
+    def __init__(self, *, filename: str,
+        fp: Union[io.BufferedIOBase, str, os.PathLike, bytes, memoryview, mmap.mmap],
+        description: str = None
+    ):
         self.filename = filename
         self.fp = fp
         self.description = description
@@ -146,6 +172,8 @@ class Interaction:
         name (str): Name of the interaction
         user (`pycordia.models.user.User`): Interaction's user
     """
+    __slots__ = ("interaction_id", "interaction_type", "name", "user")
+
     def __init__(self, data: dict):
         self.interaction_id = data.get("id")
         self.interaction_type = data.get("type")
@@ -154,13 +182,15 @@ class Interaction:
 
 
 class MessageReference:
+    __slots__ = ("__msg_data", "message_id", "channel_id", "guild_id", "fail_if_not_exists")
+
     def __init__(self, ref_data: dict, msg_data: dict):
         self.__msg_data = msg_data
 
         if ref_data:
-            self.message_id: Optional[str] = ref_data.get("message_id")
-            self.channel_id: Optional[str] = ref_data.get("channel_id")
-            self.guild_id: Optional[str] = ref_data.get("guild_id")
+            self.message_id: Optional[utils.Snowflake] = utils.snowflake(ref_data.get("message_id"))
+            self.channel_id: Optional[utils.Snowflake] = utils.snowflake(ref_data.get("channel_id"))
+            self.guild_id: Optional[utils.Snowflake] = utils.snowflake(ref_data.get("guild_id"))
             self.fail_if_not_exists: Optional[bool] = ref_data.get(
                 "fail_if_not_exists"
             )
@@ -183,11 +213,16 @@ class MessageReference:
 
 class Message:
     """Represents a message sent in Discord
+
+    Lazy messages decode each attribute on first access, which is cheaper \
+        when handlers only read a few attributes. Eager messages decode every \
+        attribute up front. Both keep the payload, which `to_dict` returns and \
+        which updates are compared against.
     
     Attributes:
-        id (str): ID of the message
-        channel_id (str): ID of the channel the message was sent in
-        guild_id (str): ID of the guild the message was sent in
+        id (Snowflake): ID of the message
+        channel_id (Snowflake): ID of the channel the message was sent in
+        guild_id (Snowflake): ID of the guild the message was sent in
         author (User): The author of this message
         member (Member): The author of this message, including guild information
         content (str): Content of the message
@@ -203,11 +238,11 @@ class Message:
         reactions (List[Reaction]): Reactions for this message
         nonce (Union[str, int, None]): Used for message verification
         pinned (bool): Whether this message is pinned
-        webhook_id (str): The ID Of the webhook that sent this message
+        webhook_id (Snowflake): The ID Of the webhook that sent this message
         type (int): Message type;
         activity (str): The Rich-Presence chat embed if any
         application (str): The application for the Rich-Presence chat embed
-        application_id (str): The ID of the application for the embed
+        application_id (Snowflake): The ID of the application for the embed
         message_reference (MessageReference): The message referred to
         flags (int): Flags for this message
         interaction (dict): An interaction for this message -- not implemented
@@ -215,51 +250,187 @@ class Message:
         components (dict): The list of components for this message -- not implemented
         sticker_items (List[StickerItem]): Stickers sent in this message
     """
-    def __init__(self, data: dict):
+    __slots__ = (
+        "__data", "_id", "_channel_id", "_guild_id", "_author", "_member", "_content",
+        "_timestamp", "_edited_timestamp", "_tts", "_mention_everyone", "_mentions",
+        "_mention_roles", "_mention_channels", "_attachments", "_embeds", "_reactions",
+        "_nonce", "_pinned", "_webhook_id", "_type", "_activity", "_application",
+        "_application_id", "_message_reference", "_flags", "_interaction", "_thread",
+        "_components", "_sticker_items"
+    )
+
+    #: Whether messages decode their attributes on first access by default
+    lazy: bool = False
+
+    def __init__(self, data: dict, *, lazy: bool = None):
+        """
+        Args:
+            data (dict): The message payload
+            lazy (bool, optional): Keep the payload and decode each attribute \
+                on first access. Defaults to `Message.lazy`.
+        """
         self.__data = data
 
-        self.id: str = data["id"]
-        self.channel_id: str = data["channel_id"]
-        self.guild_id: Optional[str] = data.get("guild_id")
-        self.author: models.User = models.User(data["author"])
+        if not (self.lazy if lazy is None else lazy):
+            utils.decode_lazy_attributes(self)
 
-        self.member: Optional[models.Member] = utils.make_optional(models.Member, data.get("member", {}))
-        self.content: str = data["content"]
-        self.timestamp: datetime = datetime.fromisoformat(data["timestamp"])
-        self.edited_timestamp: Optional[datetime] = utils.make_optional(datetime.fromisoformat, data.get("edited_timestamp"))
-        self.tts: bool = data["tts"]
+    @utils.lazy_attribute
+    def id(self) -> utils.Snowflake:
+        return utils.snowflake(self.__data["id"])
 
-        self.mention_everyone: bool = data["mention_everyone"]
+    @utils.lazy_attribute
+    def channel_id(self) -> utils.Snowflake:
+        return utils.snowflake(self.__data["channel_id"])
 
-        self.mentions: List[models.User] = list(map(models.User, data.get("mentions", [])))
-        self.mention_roles: List[models.Role] = list(map(models.Role, data.get("mention_roles", [])))
-        self.mention_channels: List[models.ChannelMention] = list(
-            map(models.ChannelMention, data.get("mention_channels", []))
-        )
+    @utils.lazy_attribute
+    def guild_id(self) -> Optional[utils.Snowflake]:
+        return utils.snowflake(self.__data.get("guild_id"))
+
+    @utils.lazy_attribute
+    def author(self) -> models.User:
+        return models.User(self.__data["author"])
+
+    @utils.lazy_attribute
+    def member(self) -> Optional[models.Member]:
+        return utils.make_optional(models.Member, self.__data.get("member", {}))
+
+    @utils.lazy_attribute
+    def content(self) -> str:
+        return self.__data["content"]
+
+    @utils.lazy_attribute
+    def timestamp(self) -> datetime:
+        return utils.parse_timestamp(self.__data["timestamp"])
+
+    @utils.lazy_attribute
+    def edited_timestamp(self) -> Optional[datetime]:
+        return utils.make_optional(utils.parse_timestamp, self.__data.get("edited_timestamp"))
+
+    @utils.lazy_attribute
+    def tts(self) -> bool:
+        return self.__data["tts"]
+
+    @utils.lazy_attribute
+    def mention_everyone(self) -> bool:
+        return self.__data["mention_everyone"]
+
+    @utils.lazy_attribute
+    def mentions(self) -> List[models.User]:
+        return list(map(models.User, self.__data.get("mentions", [])))
+
+    @utils.lazy_attribute
+    def mention_roles(self) -> List[models.Role]:
+        return list(map(models.Role, self.__data.get("mention_roles", [])))
 
-        self.attachments: List[Attachment] = list(map(Attachment, data.get("attachments", [])))
-        self.embeds: List[models.Embed] = list(map(models.Embed, data.get("embeds", [])))
-        self.reactions: List[Reaction] = list(map(Reaction, data.get("reactions", [])))
-        self.nonce: Union[str, int, None] = data.get("nonce")
-        self.pinned: bool = data["pinned"]
-        self.webhook_id: Optional[str] = data.get("webhook_id")
-        self.type: int = data["type"]
-        self.activity: Optional[MessageActivity] = utils.make_optional(MessageActivity, data.get("activity", {}))
-
-        self.application: Optional[Application] = utils.make_optional(Application, data.get("application", {}))
-        self.application_id: Optional[str] = data.get("application_id")
-        self.message_reference: MessageReference = MessageReference(
-            data.get("message_reference", {}), 
-            data.get("referenced_message", {})
+    @utils.lazy_attribute
+    def mention_channels(self) -> List[models.ChannelMention]:
+        return list(map(models.ChannelMention, self.__data.get("mention_channels", [])))
+
+    @utils.lazy_attribute
+    def attachments(self) -> List[Attachment]:
+        return list(map(Attachment, self.__data.get("attachments", [])))
+
+    @utils.lazy_attribute
+    def embeds(self) -> List[models.Embed]:
+        return list(map(models.Embed, self.__data.get("embeds", [])))
+
+    @utils.lazy_attribute
+    def reactions(self) -> List[Reaction]:
+        return list(map(Reaction, self.__data.get("reactions", [])))
+
+    @utils.lazy_attribute
+    def nonce(self) -> Union[str, int, None]:
+        return self.__data.get("nonce")
+
+    @utils.lazy_attribute
+    def pinned(self) -> bool:
+        return self.__data["pinned"]
+
+    @utils.lazy_attribute
+    def webhook_id(self) -> Optional[utils.Snowflake]:
+        return utils.snowflake(self.__data.get("webhook_id"))
+
+    @utils.lazy_attribute
+    def type(self) -> int:
+        return self.__data["type"]
+
+    @utils.lazy_attribute
+    def activity(self) -> Optional[MessageActivity]:
+        return utils.make_optional(MessageActivity, self.__data.get("activity", {}))
+
+    @utils.lazy_attribute
+    def application(self) -> Optional[Application]:
+        return utils.make_optional(Application, self.__data.get("application", {}))
+
+    @utils.lazy_attribute
+    def application_id(self) -> Optional[utils.Snowflake]:
+        return utils.snowflake(self.__data.get("application_id"))
+
+    @utils.lazy_attribute
+    def message_reference(self) -> MessageReference:
+        return MessageReference(
+            self.__data.get("message_reference", {}),
+            self.__data.get("referenced_message", {})
         )
 
-        self.flags: Optional[int] = data.get("flags")
+    @utils.lazy_attribute
+    def flags(self) -> Optional[int]:
+        return self.__data.get("flags")
+
+    @utils.lazy_attribute
+    def interaction(self) -> dict:
+        return self.__data.get("interaction", {})
+
+    @utils.lazy_attribute
+    def thread(self) -> dict:
+        return self.__data.get("thread", {})
+
+    @utils.lazy_attribute
+    def components(self) -> list:
+        return self.__data.get("components", [])
+
+    @utils.lazy_attribute
+    def sticker_items(self) -> List[StickerItem]:
+        return list(map(StickerItem, self.__data.get("sticker_items", [])))
+
+    # Payload fields an attribute is decoded from, when not only its own name
+    __sources = {"message_reference": ("message_reference", "referenced_message")}
+
+    def to_dict(self) -> dict:
+        """Return the payload this message was created from"""
+        return dict(self.__data)
+
+    def updated(self, data: dict, *, lazy: bool = None) -> Message:
+        """Return a copy of this message with a (possibly partial) update payload applied
+
+        Attributes whose payload fields are unchanged are shared with this message \
+            instead of being decoded again.
+
+        Args:
+            data (dict): A MESSAGE_UPDATE payload
+            lazy (bool, optional): Whether the copy decodes its other attributes \
+                on first access. Defaults to `Message.lazy`.
+
+        Returns: `pycordia.models.Message`
+        """
+        previous = self.__data
+        message = Message({**previous, **data}, lazy=True)
+
+        missing = object()
+        for field in utils.lazy_attributes(Message):
+            keys = self.__sources.get(field.name, (field.name,))
+            if any(key in data and data[key] != previous.get(key) for key in keys):
+                continue
+
+            value = field.peek(self, missing)
+            if value is not missing:
+                field.__set__(message, value)
 
-        self.interaction: dict = data.get("interaction", {})
-        self.thread: dict = data.get("thread", {})
-        self.components: list = data.get("components", [])
+        if not (self.lazy if lazy is None else lazy):
+            for field in utils.lazy_attributes(Message):
+                getattr(message, field.name)
 
-        self.sticker_items: List[StickerItem] = list(map(StickerItem, data.get("sticker_items", [])))
+        return message
 
     @classmethod
     async def send(cls, channel_id: str, *,
@@ -298,14 +469,18 @@ class Message:
                 "content": content or "",
                 "tts": allow_tts,
                 "allowed_mentions": allowed_mentions,
-                "embeds": [emb.to_dict() for emb in (embeds or [])]
+                "embeds": [emb.to_dict() for emb in (embeds or [])],
+                # Discord drops duplicate sends with the same nonce, so failed sends can be retried
+                "nonce": utils.nonce(),
+                "enforce_nonce": True
             },
             files=files
         )
 
-        return Message(await rs.json())
+        return Message(rs.data)
     
     @classmethod
+    @utils.singleflight(lambda cls, channel_id, message_id: utils.snowflake(message_id))
     async def from_id(cls, channel_id: str, message_id: str) -> Message:
         """Get a message given a channel ID and a message ID
         
@@ -316,7 +491,7 @@ class Message:
             raise pycordia.errors.ClientSetupError
 
         rs = await client.http.request("GET", f"channels/{channel_id}/messages/{message_id}")
-        return Message(await rs.json())
+        return Message(rs.data)
 
     @classmethod
     async def bulk_delete(cls, channel_id: str, *message_ids: List[str]) -> None:
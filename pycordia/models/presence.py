@@ -13,6 +13,8 @@ class StatusType(enum.Enum):
 
 
 class Presence:
+    __slots__ = ()
+
     def __init__(self, *, 
         since: datetime.datetime, activities,
         status: StatusType, afk: bool = True    
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import re
+import uuid
+from typing import Any, List
+
+import pycordia
+from pycordia import models, utils
+
+_encode_string = json.encoder.encode_basestring_ascii
+
+class Field:
+    """A placeholder for a value given when a `MessageTemplate` is rendered
+
+    A field stands for a whole JSON value, such as the content of a message \
+        or the title of an embed, and can be used anywhere in a template.
+
+    Attributes:
+        name (str): Name of the keyword argument holding the value
+    """
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self):
+        return f"<Field name='{self.name}'>"
+
+
+class MessageTemplate:
+    """A message whose payload is encoded once and re-used for every send
+
+    The static parts of the message are encoded to JSON when the template is \
+        created. Rendering only encodes the values of its fields and joins \
+        them with the pre-encoded parts. Like `pycordia.models.Message.send`, \
+        every rendered payload carries a new enforced nonce, so that failed \
+        sends can be retried without duplicating the message.
+
+    Example:
+        ```
+        embed = Embed.create(title=Field("title"), color=0x5865F2)
+        embed.add_field(name="Score", value=Field("score"))
+        template = MessageTemplate(embeds=[embed])
+
+        await template.send(channel_id, title="Results", score="42")
+        ```
+
+    Attributes:
+        fields (List[str]): Names of the fields of the template, in order of appearance
+    """
+
+    def __init__(self, *,
+        content: Any = "",
+        embeds: List[models.Embed] = None,
+        allowed_mentions: dict = {},
+        allow_tts: bool = False
+    ):
+        """
+        Args:
+            content (Any, optional): The content of the message, or a `Field`
+            embeds (List[models.Embed], optional): Embeds of the message, \
+                whose attributes may be `Field` objects
+            allowed_mentions (dict, optional): Allowed mentions, \
+                as in `pycordia.models.Message.send`
+            allow_tts (bool, optional): Whether the message allows text-to-speech
+        """
+        payload = {
+            "content": content or "",
+            "tts": allow_tts,
+            "allowed_mentions": allowed_mentions,
+            "embeds": [emb.to_dict() for emb in (embeds or [])]
+        }
+
+        # Fields are encoded as unique strings, then cut out of the JSON document
+        token = uuid.uuid4().hex
+        names: List[str] = []
+
+        def encode_field(obj):
+            if not isinstance(obj, Field):
+                raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+            names.append(obj.name)
+            return f"{token}:{len(names) - 1}"
+
+        document = json.dumps(payload, separators=(",", ":"), default=encode_field)
+        parts = re.split(f'"{token}:[0-9]+"', document)
+
+        self.fields = names
+        self.__chunks = [part.encode("utf-8") for part in parts]
+        # The nonce is added before the closing brace of the payload
+        self.__chunks[-1] = self.__chunks[-1][:-1]
+        self.__encode = json.JSONEncoder(separators=(",", ":")).encode
+
+    def render(self, **values) -> bytes:
+        """Return the JSON payload of the message with the given field values
+
+        Raises:
+            KeyError: If a field has no value
+        """
+        chunks = self.__chunks
+        encode = self.__encode
+
+        body = [chunks[0]]
+        for index, name in enumerate(self.fields, 1):
+            value = values[name]
+            # Strings are the most common values, and have a faster encoder
+            encoded = _encode_string(value) if type(value) is str else encode(value)
+            body.append(encoded.encode("ascii"))
+            body.append(chunks[index])
+
+        body.append(b',"nonce":"%s","enforce_nonce":true}' % utils.nonce().encode("ascii"))
+        return b"".join(body)
+
+    async def send(self, channel_id: str, **values) -> models.Message:
+        """Send the message to a channel with the given field values
+
+        Args:
+            channel_id (str): The ID of the channel where the message will be sent
+
+        Returns: `pycordia.models.Message`
+        """
+        client = models.active_client
+        if not client:
+            raise pycordia.errors.ClientSetupError
+
+        rs = await client.http.request(
+            "POST", f"channels/{channel_id}/messages", body=self.render(**values)
+        )
+        return models.Message(rs.data)
+
+    def __repr__(self):
+        return f"<MessageTemplate fields={self.fields}>"
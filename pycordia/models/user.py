@@ -10,7 +10,7 @@ class User:
     A Discord User
 
     Attributes:
-        id (str): ID of the user
+        id (Snowflake): ID of the user
         username (str): A username
         discriminator (str): A user's discriminator; a `#` followed by 4 numbers
         avatar_hash (str): User's avatar hash
@@ -31,8 +31,14 @@ class User:
         - repr(x): Returns a representation of the object
         - x == y: Checks if two users are the same (check by ID)
     """
+    __slots__ = (
+        "id", "username", "discriminator", "avatar_hash", "bot", "system", "mfa_enabled",
+        "banner_hash", "accent_color", "locale", "verified", "email", "flags", "premium_type",
+        "public_flags"
+    )
+
     def __init__(self, data):
-        self.id: str = data["id"]
+        self.id: utils.Snowflake = utils.snowflake(data["id"])
         self.username: str = data["username"]
         self.discriminator: str = data["discriminator"]
         self.avatar_hash: str = data["avatar"]
@@ -84,7 +90,7 @@ class User:
     @property
     def created_on(self) -> datetime:
         """The date and time the user was created on"""
-        return utils.snowflake_to_date(int(self.id))
+        return utils.snowflake_to_date(self.id)
 
     def is_premium(self) -> Optional[bool]:
         """Check if this user has any sort of premium subscription (Nitro)
@@ -100,6 +106,7 @@ class User:
         return self.premium_type is not None and self.premium_type != UserPremiumType.none
 
     @classmethod
+    @utils.singleflight(lambda cls, user_id, use_cache=True: (utils.snowflake(user_id), use_cache))
     async def from_id(cls, user_id: str, use_cache: bool = True):
         """
         Get a User object, given a user ID
@@ -114,24 +121,46 @@ class User:
         if not client:
             raise Exception("No initialized client found")
 
+        user_id = utils.snowflake(user_id)
+
         # Check if its present in the cache first
-        user = client.user_cache.get(user_id)
-        if user and use_cache:
-            return user
+        if use_cache:
+            user = client.user_cache.get(user_id)
+            if user:
+                return user
 
         # Otherwise, fetch directly from the API
         rs = await client.http.request("GET", f"users/{user_id}")
-        user = User(await rs.json())
+        user = User(rs.data)
 
         # Add to cache
-        if len(client.user_cache.keys()) >= client.cache_size:
-            first_user = list(client.user_cache.keys())[0]
-            del client.user_cache[first_user]
-        
         client.user_cache[user.id] = user
 
         return user
 
+    def to_dict(self) -> dict:
+        """Convert object into a dictionary, in the form Discord provides it"""
+        def flag_value(flags: Optional[List[UserFlags]]) -> Optional[int]:
+            return sum(flag.value for flag in flags) if flags is not None else None
+
+        return {
+            "id": str(self.id),
+            "username": self.username,
+            "discriminator": self.discriminator,
+            "avatar": self.avatar_hash,
+            "bot": self.bot,
+            "system": self.system,
+            "mfa_enabled": self.mfa_enabled,
+            "banner": self.banner_hash,
+            "accent_color": self.accent_color,
+            "locale": self.locale,
+            "verified": self.verified,
+            "email": self.email,
+            "flags": flag_value(self.flags),
+            "premium_type": self.premium_type.value if self.premium_type is not None else None,
+            "public_flags": flag_value(self.public_flags)
+        }
+
     def __eq__(self, other: 'User'):
         return self.id == other.id
 
@@ -161,6 +190,11 @@ class UserFlags(enum.Enum):
 
 
 class Connection:
+    __slots__ = (
+        "id", "name", "type", "revoked", "integrations", "verified", "friend_sync",
+        "show_activity", "visibility"
+    )
+
     def __init__(self, data: dict):
         self.id: str = data["id"]
         self.name: str = data["name"]
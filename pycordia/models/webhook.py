@@ -8,11 +8,16 @@ from pycordia import models, utils
 
 
 class Webhook:
+    __slots__ = (
+        "id", "type", "guild_id", "channel_id", "user", "name", "avatar_hash", "token",
+        "application_id", "source_guild", "source_channel", "url"
+    )
+
     def __init__(self, data):
-        self.id: str = data["id"]
+        self.id: utils.Snowflake = utils.snowflake(data["id"])
         self.type = WebhookType(data["type"])
-        self.guild_id: Optional[str] = data.get("guild_id")
-        self.channel_id: str = data["channel_id"]
+        self.guild_id: Optional[utils.Snowflake] = utils.snowflake(data.get("guild_id"))
+        self.channel_id: utils.Snowflake = utils.snowflake(data["channel_id"])
         self.user: Optional[models.User] = utils.make_optional(
             models.User, data.get("user")
         )
@@ -20,7 +25,7 @@ class Webhook:
         self.name: Optional[str] = data.get("name")
         self.avatar_hash: str = data.get("avatar")
         self.token: str = data.get("token")
-        self.application_id: str = data.get("application_id")
+        self.application_id: Optional[utils.Snowflake] = utils.snowflake(data.get("application_id"))
         self.source_guild: str = data.get("guild")
         self.source_channel: str = data.get("source_channel")
         self.url: str = data.get("url")
@@ -36,15 +41,16 @@ class Webhook:
             payload_json={ "name": name, "avatar": avatar }
         )
 
-        return Webhook(await rs.json())
+        return Webhook(rs.data)
     
     @classmethod
+    @utils.singleflight(lambda cls, webhook_id: utils.snowflake(webhook_id))
     async def from_id(cls, webhook_id: str) -> Webhook:
         client = models.fetch_client()
         rs = await client.http.request(
             "GET", f"webhooks/{webhook_id}"
         )
-        return Webhook(await rs.json())
+        return Webhook(rs.data)
 
     @classmethod
     async def from_token(cls, webhook_id: str, token: str) -> Webhook:
@@ -52,7 +58,7 @@ class Webhook:
         rs = await client.http.request(
             "GET", f"webhooks/{webhook_id}/token"
         )
-        return Webhook(await rs.json())
+        return Webhook(rs.data)
 
     # async def edit(self, *, name, avatar=None, channel_id) -> None:
     #     client = models.fetch_client()
@@ -0,0 +1,296 @@
+import typing
+
+from pycordia import models, state, utils
+
+
+class Permissions(utils.BoolEnum):
+    """Discord permission flags
+
+    Use `Permissions.from_int` to read a permission string sent by Discord and \
+        `int(x)` to get its integer form. Class attributes are the integer \
+        value of each flag (e.g. `Permissions.send_messages`), for bitmask checks.
+    """
+    create_instant_invite = 1 << 0
+    kick_members = 1 << 1
+    ban_members = 1 << 2
+    administrator = 1 << 3
+    manage_channels = 1 << 4
+    manage_guild = 1 << 5
+    add_reactions = 1 << 6
+    view_audit_log = 1 << 7
+    priority_speaker = 1 << 8
+    stream = 1 << 9
+    view_channel = 1 << 10
+    send_messages = 1 << 11
+    send_tts_messages = 1 << 12
+    manage_messages = 1 << 13
+    embed_links = 1 << 14
+    attach_files = 1 << 15
+    read_message_history = 1 << 16
+    mention_everyone = 1 << 17
+    use_external_emojis = 1 << 18
+    view_guild_insights = 1 << 19
+    connect = 1 << 20
+    speak = 1 << 21
+    mute_members = 1 << 22
+    deafen_members = 1 << 23
+    move_members = 1 << 24
+    use_vad = 1 << 25
+    change_nickname = 1 << 26
+    manage_nicknames = 1 << 27
+    manage_roles = 1 << 28
+    manage_webhooks = 1 << 29
+    manage_emojis_and_stickers = 1 << 30
+    use_application_commands = 1 << 31
+    request_to_speak = 1 << 32
+    manage_events = 1 << 33
+    manage_threads = 1 << 34
+    create_public_threads = 1 << 35
+    create_private_threads = 1 << 36
+    use_external_stickers = 1 << 37
+    send_messages_in_threads = 1 << 38
+    use_embedded_activities = 1 << 39
+    moderate_members = 1 << 40
+
+
+# Every known permission, granted to guild owners and administrators
+ALL_PERMISSIONS = 0
+for _field in Permissions._fields.values():
+    ALL_PERMISSIONS |= _field.value
+del _field
+
+_THREAD_TYPES = (
+    models.channel.ChannelType.news_thread,
+    models.channel.ChannelType.public_thread,
+    models.channel.ChannelType.private_thread
+)
+
+# Maximum amount of memoized results before they are all dropped
+PERMISSION_CACHE_SIZE = 1 << 16
+
+
+def base_permissions(everyone: int, roles: typing.Iterable[int], *, is_owner: bool = False) -> int:
+    """Compute the guild-wide permissions of a member
+
+    Args:
+        everyone (int): Permissions of the guild's @everyone role
+        roles (typing.Iterable[int]): Permissions of the member's other roles
+        is_owner (bool, optional): Whether the member owns the guild
+
+    Returns: The permissions as an integer
+    """
+    if is_owner:
+        return ALL_PERMISSIONS
+
+    permissions = everyone
+    for role in roles:
+        permissions |= role
+
+    if permissions & Permissions.administrator:
+        return ALL_PERMISSIONS
+    return permissions
+
+
+def apply_overwrites(base: int, overwrites: typing.List[dict], *,
+    guild_id: int, role_ids: typing.Iterable[int], user_id: int
+) -> int:
+    """Apply the permission overwrites of a channel to the guild-wide permissions of a member
+
+    Overwrites are applied in the order Discord does: @everyone, then the \
+        member's roles together, then the member itself. Members without \
+        the view channel permission have no permissions in the channel.
+
+    Args:
+        base (int): Guild-wide permissions, from `base_permissions`
+        overwrites (typing.List[dict]): The `permission_overwrites` of a channel
+        guild_id (int): ID of the guild, which is also the ID of its @everyone role
+        role_ids (typing.Iterable[int]): IDs of the member's roles
+        user_id (int): ID of the member
+
+    Returns: The permissions as an integer
+    """
+    if base & Permissions.administrator:
+        return ALL_PERMISSIONS
+
+    by_id = {int(overwrite["id"]): overwrite for overwrite in overwrites}
+    permissions = base
+
+    everyone = by_id.get(int(guild_id))
+    if everyone:
+        permissions &= ~int(everyone["deny"])
+        permissions |= int(everyone["allow"])
+
+    allow = deny = 0
+    for role_id in role_ids:
+        overwrite = by_id.get(int(role_id))
+        if overwrite and overwrite["type"] in (0, "role"):
+            allow |= int(overwrite["allow"])
+            deny |= int(overwrite["deny"])
+    permissions &= ~deny
+    permissions |= allow
+
+    member = by_id.get(int(user_id))
+    if member and member["type"] in (1, "member"):
+        permissions &= ~int(member["deny"])
+        permissions |= int(member["allow"])
+
+    if not permissions & Permissions.view_channel:
+        return 0
+    return permissions
+
+
+class PermissionEngine:
+    """Computes effective permissions from the roles, members and channels of a `StateStore`
+
+    Results are memoized per guild, member and channel, and dropped when a \
+        gateway event changes the roles, members or channels they depend on.
+    """
+
+    def __init__(self, state_store: state.StateStore):
+        """
+        Args:
+            state_store (pycordia.state.StateStore): The store to read state from
+        """
+        self.state = state_store
+
+        # guild ID - user ID - channel ID (None for guild-wide) - permissions
+        self.__cache: typing.Dict[int, typing.Dict[int, typing.Dict[typing.Optional[int], int]]] = {}
+        self.__size = 0
+
+    def compute(self, guild_id: str, member: typing.Union[str, 'models.Member'],
+        channel_id: str = None
+    ) -> typing.Optional[int]:
+        """Return the permissions of a member as an integer
+
+        Args:
+            guild_id (str): ID of the guild
+            member (Union[str, pycordia.models.Member]): A member, or the ID of a stored member. \
+                Results are only memoized for IDs.
+            channel_id (str, optional): ID of a channel to apply the overwrites of. \
+                Threads use the overwrites of their parent channel.
+
+        Returns: The permissions, or None if the guild, member or channel is not stored
+        """
+        guild_id = utils.snowflake(guild_id)
+        user_id = utils.snowflake(member.user.id if isinstance(member, models.Member) else member)
+
+        channel = None
+        if channel_id is not None:
+            channel = self.state.get_channel(channel_id)
+            if channel and channel.type in _THREAD_TYPES:
+                channel = self.state.get_channel(channel.parent_id)
+            if channel is None:
+                return None
+            channel_id = channel.id
+
+        # A member passed in may differ from the stored one (e.g. new roles), so it is not memoized
+        memoize = not isinstance(member, models.Member)
+
+        if memoize:
+            members = self.__cache.get(guild_id)
+            if members is not None:
+                channels = members.get(user_id)
+                if channels is not None and channel_id in channels:
+                    return channels[channel_id]
+
+            member = self.state.get_member(guild_id, user_id)
+        guild = self.state.get_guild(guild_id)
+        everyone = self.state.get_role(guild_id)
+        if member is None or guild is None or everyone is None:
+            return None
+
+        roles = (self.state.get_role(role_id) for role_id in member.role_ids)
+        permissions = base_permissions(
+            int(everyone.permissions or 0),
+            (int(role.permissions or 0) for role in roles if role is not None),
+            is_owner=guild.owner_id == user_id
+        )
+        if channel is not None:
+            permissions = apply_overwrites(
+                permissions, channel.permission_overwrites,
+                guild_id=guild_id, role_ids=member.role_ids, user_id=user_id
+            )
+
+        if memoize:
+            if self.__size >= PERMISSION_CACHE_SIZE:
+                self.clear()
+            self.__cache.setdefault(guild_id, {}).setdefault(user_id, {})[channel_id] = permissions
+            self.__size += 1
+
+        return permissions
+
+    def permissions_for(self, guild_id: str, member: typing.Union[str, 'models.Member'],
+        channel_id: str = None
+    ) -> typing.Optional[Permissions]:
+        """Return the permissions of a member as `Permissions`, see `PermissionEngine.compute`"""
+        permissions = self.compute(guild_id, member, channel_id)
+        return Permissions.from_int(permissions) if permissions is not None else None
+
+    def has(self, guild_id: str, member: typing.Union[str, 'models.Member'],
+        permissions: int, channel_id: str = None
+    ) -> bool:
+        """Check if a member has every permission of a bitmask
+
+        Args:
+            permissions (int): The permissions to check, \
+                e.g. `Permissions.send_messages | Permissions.embed_links`
+        """
+        computed = self.compute(guild_id, member, channel_id)
+        return computed is not None and computed & permissions == permissions
+
+    # --- Invalidation ---
+    def invalidate_guild(self, guild_id: str):
+        """Drop the results of every member of a guild"""
+        members = self.__cache.pop(utils.snowflake(guild_id), None)
+        if members:
+            self.__size -= sum(map(len, members.values()))
+
+    def invalidate_member(self, guild_id: str, user_id: str):
+        """Drop the results of a member"""
+        members = self.__cache.get(utils.snowflake(guild_id))
+        if members:
+            self.__size -= len(members.pop(utils.snowflake(user_id), ()))
+
+    def invalidate_channel(self, guild_id: str, channel_id: str):
+        """Drop the results of every member in a channel"""
+        members = self.__cache.get(utils.snowflake(guild_id))
+        if not members:
+            return
+
+        channel_id = utils.snowflake(channel_id)
+        for channels in members.values():
+            if channels.pop(channel_id, None) is not None:
+                self.__size -= 1
+
+    def clear(self):
+        """Drop every result"""
+        self.__cache.clear()
+        self.__size = 0
+
+    def parse_event(self, event_name: str, data: dict):
+        """Drop the results a gateway dispatch event makes stale
+
+        Args:
+            event_name (str): The event name, as sent by Discord (example: `GUILD_ROLE_UPDATE`)
+            data (dict): The event data
+        """
+        event_name = event_name.upper()
+
+        if event_name == "READY":
+            self.clear()
+
+        elif event_name in ("GUILD_CREATE", "GUILD_UPDATE", "GUILD_DELETE"):
+            self.invalidate_guild(data["id"])
+
+        elif event_name in ("GUILD_ROLE_CREATE", "GUILD_ROLE_UPDATE", "GUILD_ROLE_DELETE"):
+            self.invalidate_guild(data["guild_id"])
+
+        elif event_name in ("GUILD_MEMBER_ADD", "GUILD_MEMBER_UPDATE", "GUILD_MEMBER_REMOVE"):
+            self.invalidate_member(data["guild_id"], data["user"]["id"])
+
+        elif event_name == "GUILD_MEMBERS_CHUNK":
+            for member in data.get("members", []):
+                self.invalidate_member(data["guild_id"], member["user"]["id"])
+
+        elif event_name in ("CHANNEL_UPDATE", "CHANNEL_DELETE") and data.get("guild_id"):
+            self.invalidate_channel(data["guild_id"], data["id"])
@@ -0,0 +1,353 @@
+import asyncio
+import re
+import time
+import typing
+
+
+# Path segments following these are major parameters, which get their own rate limits
+_MAJOR_PARAMETERS = ("channels", "guilds", "webhooks")
+
+_SNOWFLAKE = re.compile(r"^[0-9]{15,21}$")
+
+
+def route_key(method: str, endpoint: str) -> str:
+    """Return the route of a request, keeping only its major parameters
+
+    Requests with the same route share rate limits.
+
+    Args:
+        method (str): The HTTP method of the request
+        endpoint (str): The endpoint of the request (example: `channels/123/messages/456`)
+
+    Returns: The route (example: `GET channels/123/messages/{id}`)
+    """
+    segments = endpoint.split("?", 1)[0].strip("/").split("/")
+
+    route = []
+    for index, segment in enumerate(segments):
+        previous = segments[index - 1] if index else None
+
+        if previous in _MAJOR_PARAMETERS:
+            route.append(segment)
+        elif index > 1 and segments[index - 2] == "interactions":
+            # Interaction tokens are secret and unique to every interaction
+            route.append("{token}")
+        elif previous == "reactions":
+            # Emoji reactions share a route regardless of the emoji
+            route.append("{emoji}")
+        elif _SNOWFLAKE.match(segment):
+            route.append("{id}")
+        else:
+            route.append(segment)
+
+    return f"{method.upper()} {'/'.join(route)}"
+
+
+class BucketStats:
+    """Counters kept for every rate limit bucket
+
+    Attributes:
+        requests (int): Requests that went through the bucket
+        waits (int): Requests that waited for the bucket to reset
+        wait_time (float): Total time spent waiting, in seconds
+        rate_limited (int): Responses with a 429 status
+    """
+    __slots__ = ("requests", "waits", "wait_time", "rate_limited")
+
+    def __init__(self):
+        self.requests = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.rate_limited = 0
+
+    @property
+    def average_wait(self) -> float:
+        """Average time a waiting request waited, in seconds"""
+        return self.wait_time / self.waits if self.waits else 0.0
+
+    def __repr__(self):
+        return (
+            f"<BucketStats requests={self.requests} waits={self.waits} "
+            f"wait_time={self.wait_time:.3f}s rate_limited={self.rate_limited}>"
+        )
+
+
+class Bucket:
+    """The rate limit of one or more routes
+
+    Until a response tells the limits of a bucket, and after its window \
+        resets until a response tells when the new one resets, requests wait \
+        for the responses of the requests in flight instead of guessing.
+
+    Attributes:
+        key (str): The bucket hash sent by Discord and the major parameters, \
+            or the route while the hash is unknown
+        limit (int): Requests allowed per window
+        remaining (int): Requests left in the current window
+        reset_at (Optional[float]): When the window resets, in `time.monotonic` \
+            seconds, None while unknown
+        inflight (int): Requests sent and still waiting for their response
+        last_used (float): When a request last went through or finished, \
+            in `time.monotonic` seconds
+        stats (BucketStats): Wait time and rate limit counters
+    """
+    __slots__ = (
+        "key", "limit", "remaining", "reset_at", "inflight", "last_used", "stats", "_lock", "_response"
+    )
+
+    def __init__(self, key: str):
+        self.key = key
+        self.limit = 1
+        self.remaining = 1
+        self.reset_at: typing.Optional[float] = None
+        self.inflight = 0
+        self.last_used = time.monotonic()
+        self.stats = BucketStats()
+        self._lock = asyncio.Lock()
+        # Set by the next response or failed request, while requests wait for one
+        self._response: typing.Optional[asyncio.Future] = None
+
+    @property
+    def waiting_for_response(self) -> bool:
+        """Whether requests can only be sent once a request in flight gets its response"""
+        return self.__refill(time.monotonic()) <= 0 and self.reset_at is None and self.inflight > 0
+
+    def __refill(self, now: float) -> int:
+        if self.reset_at is not None and self.reset_at <= now:
+            # The new window's reset is unknown until one of its responses arrives
+            self.remaining = self.limit
+            self.reset_at = None
+        elif self.reset_at is None and self.inflight == 0:
+            # Nothing in flight can tell the limits, so they are taken as they are
+            self.remaining = max(self.remaining, 1)
+        return self.remaining
+
+    def available(self) -> int:
+        """Requests that can be sent now without waiting"""
+        return self.__refill(time.monotonic())
+
+    def delay(self) -> float:
+        """Seconds to wait before a request can be sent, 0 if it can be sent now \
+            or if it waits for a response (see `waiting_for_response`)"""
+        now = time.monotonic()
+        if self.__refill(now) > 0 or self.reset_at is None:
+            return 0.0
+        return self.reset_at - now
+
+    async def acquire(self) -> float:
+        """Wait until a request can be sent and count it against the bucket
+
+        Returns: The time waited, in seconds
+        """
+        waited = 0.0
+
+        # Waiting requests hold the lock, so they go through in order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if self.__refill(now) > 0:
+                    self.remaining -= 1
+                    break
+
+                if self.reset_at is None:
+                    if self._response is None:
+                        self._response = asyncio.get_running_loop().create_future()
+                    # Waiting doesn't cancel the future if this request is cancelled
+                    await asyncio.wait((self._response,))
+                    waited += time.monotonic() - now
+                    continue
+
+                delay = self.reset_at - now
+                waited += delay
+                await asyncio.sleep(delay)
+
+        self.inflight += 1
+        self.last_used = time.monotonic()
+        self.stats.requests += 1
+        if waited:
+            self.stats.waits += 1
+            self.stats.wait_time += waited
+        return waited
+
+    def release(self):
+        """Finish a request that failed without a response, letting the next request through"""
+        self.__finish()
+        if self.reset_at is None:
+            self.remaining = max(self.remaining, 1)
+
+    def __finish(self):
+        self.inflight = max(self.inflight - 1, 0)
+        self.last_used = time.monotonic()
+
+        response, self._response = self._response, None
+        if response is not None and not response.done():
+            response.set_result(None)
+
+    def update(self, headers: typing.Mapping[str, str]):
+        """Finish a request and update the bucket from the `X-RateLimit-*` headers of its response"""
+        self.__finish()
+        self._apply(headers)
+
+    def _apply(self, headers: typing.Mapping[str, str]):
+        if "X-RateLimit-Limit" in headers:
+            self.limit = int(headers["X-RateLimit-Limit"])
+        if "X-RateLimit-Remaining" in headers:
+            # Requests still in flight may have been sent after this one, and
+            # aren't counted by Discord yet
+            self.remaining = max(int(headers["X-RateLimit-Remaining"]) - self.inflight, 0)
+        if "X-RateLimit-Reset-After" in headers:
+            self.reset_at = time.monotonic() + float(headers["X-RateLimit-Reset-After"])
+
+    def idle(self, now: float, timeout: float) -> bool:
+        """Whether nothing used the bucket for `timeout` seconds and its window reset, \
+            so that forgetting it loses nothing but its statistics"""
+        return (
+            self.inflight == 0 and not self._lock.locked()
+            and (self.reset_at is None or self.reset_at <= now)
+            and now - self.last_used >= timeout
+        )
+
+    def exhaust(self, retry_after: float):
+        """Block the bucket for `retry_after` seconds, after a 429 response"""
+        self.remaining = 0
+        self.reset_at = max(self.reset_at or 0.0, time.monotonic() + retry_after)
+        self.stats.rate_limited += 1
+
+    def __repr__(self):
+        return f"<Bucket key='{self.key}' remaining={self.remaining}/{self.limit}>"
+
+
+class RateLimiter:
+    """Tracks Discord's per-route and global rate limits
+
+    Routes are mapped to the bucket hash Discord sends in the `X-RateLimit-Bucket` \
+        header, so routes sharing a limit share a `Bucket`. Requests wait for \
+        their bucket when it is exhausted, and every request waits while the \
+        global limit is hit.
+
+    Buckets are per major parameter, so one is made for every channel, guild \
+        and webhook requests are sent to. Buckets left unused for `idle_timeout` \
+        seconds are forgotten, along with their statistics.
+
+    Attributes:
+        global_wait_time (float): Total time requests spent waiting for the global limit
+        idle_timeout (float): Seconds after which an unused bucket is forgotten
+    """
+
+    def __init__(self, *, idle_timeout: float = 300.0):
+        """
+        Args:
+            idle_timeout (float, optional): Seconds after which an unused bucket \
+                is forgotten. Defaults to 5 minutes.
+        """
+        # route: bucket hash sent by Discord
+        self.__hashes: typing.Dict[str, str] = {}
+        # bucket key: bucket
+        self.__buckets: typing.Dict[str, Bucket] = {}
+
+        self.__global_reset_at = 0.0
+        self.global_wait_time = 0.0
+
+        self.idle_timeout = idle_timeout
+        self.__next_expiry = time.monotonic() + idle_timeout
+
+    @staticmethod
+    def __major_parameters(route: str) -> str:
+        segments = route.split(" ", 1)[1].split("/")
+        return "/".join(
+            segment for index, segment in enumerate(segments)
+            if index and segments[index - 1] in _MAJOR_PARAMETERS
+        )
+
+    def __expire(self, now: float):
+        """Forget idle buckets, and the bucket hashes of routes without a bucket"""
+        self.__next_expiry = now + self.idle_timeout
+
+        for key, bucket in list(self.__buckets.items()):
+            if bucket.idle(now, self.idle_timeout):
+                del self.__buckets[key]
+
+        # A forgotten route's hash is learned again from its next response
+        self.__hashes = {
+            route: bucket_hash for route, bucket_hash in self.__hashes.items()
+            if f"{bucket_hash}:{self.__major_parameters(route)}" in self.__buckets
+        }
+
+    def get_bucket(self, method: str, endpoint: str) -> Bucket:
+        """Return the bucket of a request"""
+        now = time.monotonic()
+        if now >= self.__next_expiry:
+            self.__expire(now)
+
+        route = route_key(method, endpoint)
+
+        bucket_hash = self.__hashes.get(route)
+        key = f"{bucket_hash}:{self.__major_parameters(route)}" if bucket_hash else route
+
+        bucket = self.__buckets.get(key)
+        if bucket is None:
+            bucket = self.__buckets[key] = Bucket(key)
+        return bucket
+
+    async def acquire(self, method: str, endpoint: str) -> Bucket:
+        """Wait until a request can be sent, and return its bucket"""
+        bucket = self.get_bucket(method, endpoint)
+        await bucket.acquire()
+
+        delay = self.__global_reset_at - time.monotonic()
+        if delay > 0:
+            self.global_wait_time += delay
+            try:
+                await asyncio.sleep(delay)
+            except BaseException:
+                bucket.release()
+                raise
+
+        return bucket
+
+    def update(self, method: str, endpoint: str, bucket: Bucket,
+        headers: typing.Mapping[str, str]
+    ):
+        """Update the limits of a request's bucket from its response headers"""
+        bucket_hash = headers.get("X-RateLimit-Bucket")
+        route = route_key(method, endpoint)
+
+        if bucket_hash and self.__hashes.get(route) != bucket_hash:
+            self.__hashes[route] = bucket_hash
+
+            key = f"{bucket_hash}:{self.__major_parameters(route)}"
+            if key in self.__buckets:
+                # The request was counted against the route's bucket, which the
+                # requests already waiting for it keep using
+                bucket.update(headers)
+                self.__buckets[key]._apply(headers)
+                return
+            else:
+                # Keep the state and stats gathered while the hash was unknown
+                self.__buckets.pop(bucket.key, None)
+                bucket.key = key
+                self.__buckets[key] = bucket
+
+        bucket.update(headers)
+
+    def rate_limited(self, bucket: Bucket, retry_after: float, *, is_global: bool = False):
+        """Record a 429 response, blocking its bucket or every request for `retry_after` seconds"""
+        if is_global:
+            self.__global_reset_at = max(self.__global_reset_at, time.monotonic() + retry_after)
+            bucket.stats.rate_limited += 1
+        else:
+            bucket.exhaust(retry_after)
+
+    def delay(self, method: str, endpoint: str) -> float:
+        """Seconds a request would currently wait before being sent"""
+        global_delay = self.__global_reset_at - time.monotonic()
+        return max(self.get_bucket(method, endpoint).delay(), global_delay, 0.0)
+
+    @property
+    def buckets(self) -> typing.Dict[str, Bucket]:
+        """The known buckets, a mapping of bucket key - `Bucket`"""
+        return dict(self.__buckets)
+
+    def stats(self) -> typing.Dict[str, BucketStats]:
+        """Wait time and rate limit counters, a mapping of bucket key - `BucketStats`"""
+        return {key: bucket.stats for key, bucket in self.__buckets.items()}
@@ -0,0 +1,129 @@
+import asyncio
+import random
+import typing
+
+import aiohttp
+
+
+# Methods which have the same effect when sent more than once
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Failures a request is retried after, besides 5xx responses
+TRANSIENT_ERRORS = (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError)
+
+
+class RetryStats:
+    """Counters kept by a `RetryPolicy`
+
+    Attributes:
+        requests (int): Requests sent under the policy, not counting retries
+        retries (int): Retries sent
+        recovered (int): Requests which succeeded after being retried
+        exhausted (int): Requests which failed after every retry
+        budget_denied (int): Retries not sent because the budget was spent
+    """
+    __slots__ = ("requests", "retries", "recovered", "exhausted", "budget_denied")
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self.budget_denied = 0
+
+    def __repr__(self):
+        return (
+            f"<RetryStats requests={self.requests} retries={self.retries} "
+            f"recovered={self.recovered} exhausted={self.exhausted} "
+            f"budget_denied={self.budget_denied}>"
+        )
+
+
+class RetryPolicy:
+    """Decides when a request that failed with a transient error is sent again
+
+    Requests are retried after 5xx responses, connection errors and timeouts, \
+        if their method is idempotent or if they carry an enforced nonce, which \
+        makes Discord ignore duplicate sends. Retries wait a random time up to \
+        an exponentially growing delay ("full jitter").
+
+    Retries are paid from a budget, so that an outage does not multiply the \
+        load on the API: every request adds `budget_ratio` to it, up to \
+        `budget_max`, and every retry takes 1.
+
+    Attributes:
+        max_retries (int): Times a request is retried
+        base_delay (float): Upper bound of the first delay, in seconds
+        max_delay (float): Upper bound of every delay, in seconds
+        budget_ratio (float): Retries earned per request
+        budget_max (float): Retries that can be saved up
+        methods (FrozenSet[str]): Methods retried without a nonce
+        stats (RetryStats): Retry counters
+    """
+
+    def __init__(self, *, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 10.0,
+        budget_ratio: float = 0.1, budget_max: float = 10.0,
+        methods: typing.Iterable[str] = IDEMPOTENT_METHODS
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.budget_max = budget_max
+        self.methods = frozenset(method.upper() for method in methods)
+        self.stats = RetryStats()
+
+        self.__budget = budget_max
+
+    @property
+    def budget(self) -> float:
+        """Retries currently left in the budget"""
+        return self.__budget
+
+    def is_retryable(self, method: str, payload_json: typing.Any = None) -> bool:
+        """Check if a request can be sent more than once
+
+        Args:
+            method (str): The HTTP method of the request
+            payload_json (Any, optional): The JSON payload of the request, \
+                or its compact encoded form
+        """
+        if method.upper() in self.methods:
+            return True
+        if isinstance(payload_json, (bytes, bytearray)):
+            # Pre-encoded payloads, such as rendered `pycordia.models.MessageTemplate` objects
+            return b'"nonce":' in payload_json and b'"enforce_nonce":true' in payload_json
+        return isinstance(payload_json, dict) and bool(
+            payload_json.get("nonce") and payload_json.get("enforce_nonce")
+        )
+
+    def record_request(self):
+        """Count a request, adding to the budget"""
+        self.stats.requests += 1
+        self.__budget = min(self.budget_max, self.__budget + self.budget_ratio)
+
+    def next_delay(self, retries: int) -> typing.Optional[float]:
+        """Take a retry from the budget and return the time to wait before it
+
+        Args:
+            retries (int): Retries the request already went through
+
+        Returns: The delay in seconds, or None if the request must not be retried
+        """
+        if retries >= self.max_retries:
+            self.stats.exhausted += 1
+            return None
+        if self.__budget < 1:
+            self.stats.budget_denied += 1
+            self.stats.exhausted += 1
+            return None
+
+        self.__budget -= 1
+        self.stats.retries += 1
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retries))
+
+    def __repr__(self):
+        return (
+            f"<RetryPolicy max_retries={self.max_retries} "
+            f"budget={self.__budget:.1f}/{self.budget_max}>"
+        )
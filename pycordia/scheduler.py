@@ -0,0 +1,363 @@
+import asyncio
+import collections
+import contextvars
+import enum
+import heapq
+import itertools
+import time
+import typing
+
+import pycordia
+from pycordia import ratelimit
+
+
+class Priority(enum.IntEnum):
+    """Priority classes of REST requests, lower values are sent first"""
+    # Interaction responses, which Discord only accepts for 3 seconds
+    interaction = 0
+    high = 1
+    normal = 2
+    # Paging, logging and other requests nobody is waiting on
+    background = 3
+
+
+def request_priority(method: str, endpoint: str) -> Priority:
+    """Return the default priority of a request
+
+    Interaction callbacks are latency-critical, every other request is \
+        `Priority.normal`.
+    """
+    if endpoint.lstrip("/").startswith("interactions/"):
+        return Priority.interaction
+    return Priority.normal
+
+
+def fairness_key(endpoint: str,
+    resolve_guild: typing.Callable[[str], typing.Optional[str]] = None
+) -> str:
+    """Return the key requests are fairly queued by
+
+    The key is the first major parameter of the endpoint (example: `guilds/123` \
+        for `guilds/123/members`). Channels whose guild is returned by \
+        `resolve_guild` are queued with their guild, so a guild with many \
+        channels gets one turn like any other guild. Other channels and \
+        webhooks get a queue of their own, as they are rate limited on their own.
+
+    Args:
+        endpoint (str): The endpoint of the request
+        resolve_guild (Callable[[str], Optional[str]], optional): Returns the \
+            guild ID of a channel ID, or None if it is not known
+    """
+    segments = endpoint.split("?", 1)[0].strip("/").split("/")
+    if len(segments) > 1 and segments[0] in ratelimit._MAJOR_PARAMETERS:
+        if segments[0] == "channels" and resolve_guild is not None:
+            guild_id = resolve_guild(segments[1])
+            if guild_id:
+                return f"guilds/{guild_id}"
+        return f"{segments[0]}/{segments[1]}"
+    return ""
+
+
+class _Job:
+    __slots__ = (
+        "method", "endpoint", "run", "future", "deadline", "priority", "key",
+        "bucket", "holds_slot", "resumed"
+    )
+
+    def __init__(self, method: str, endpoint: str, run, future: asyncio.Future,
+        deadline: typing.Optional[float], priority: Priority, key: str
+    ):
+        self.method = method
+        self.endpoint = endpoint
+        self.run = run
+        self.future = future
+        self.deadline = deadline
+        self.priority = priority
+        self.key = key
+        # The bucket the job was counted against once it was sent
+        self.bucket: typing.Optional[ratelimit.Bucket] = None
+        self.holds_slot = False
+        # Resolved when a job that gave up its slot to sleep gets one again
+        self.resumed: typing.Optional[asyncio.Future] = None
+
+
+# The scheduler and job of the request sent by the current task
+_current_job: contextvars.ContextVar[typing.Optional[typing.Tuple['RequestScheduler', _Job]]] = \
+    contextvars.ContextVar("pycordia_scheduler_job", default=None)
+
+
+class RequestScheduler:
+    """Orders REST requests by priority, guild and deadline before they are sent
+
+    Requests are queued per priority class, and per guild, channel or webhook \
+        inside each class. Higher classes always go first; queues of the same \
+        class take turns, and among them the request with the closest deadline \
+        goes first. Requests whose rate limit bucket is exhausted, or whose \
+        bucket's remaining requests are already being sent, stay queued \
+        without taking a slot, so other requests can go through meanwhile, and \
+        requests still queued after their deadline fail without being sent.
+        Requests waiting to be retried give up their slot, see `sleep`.
+
+    Attributes:
+        max_concurrency (int): Requests sent at the same time
+        reserved (int): Slots only `Priority.interaction` requests can take, \
+            so they are never stuck behind other requests
+        expired (int): Requests dropped because their deadline passed
+        resolve_guild (Optional[Callable[[str], Optional[str]]]): Returns the \
+            guild ID of a channel ID, so that requests to the channels of a \
+            guild share its queue, see `fairness_key`
+    """
+
+    def __init__(self, ratelimiter: ratelimit.RateLimiter, *,
+        max_concurrency: int = 16, reserved: int = 2
+    ):
+        """
+        Args:
+            ratelimiter (pycordia.ratelimit.RateLimiter): Rate limits \
+                deciding which requests can be sent
+            max_concurrency (int, optional): Requests sent at the same time
+            reserved (int, optional): Slots kept for interaction requests
+        """
+        self.ratelimiter = ratelimiter
+        self.max_concurrency = max_concurrency
+        self.reserved = min(reserved, max_concurrency - 1)
+        self.expired = 0
+        self.resolve_guild: typing.Optional[typing.Callable[[str], typing.Optional[str]]] = None
+
+        # One queue per fairness key for every priority class, in turn order
+        self.__queues: typing.List[typing.Dict[str, typing.Deque[_Job]]] = [
+            collections.OrderedDict() for _ in Priority
+        ]
+        # (deadline, order, job) of queued requests with a deadline
+        self.__deadlines: typing.List[typing.Tuple[float, int, _Job]] = []
+        self.__order = itertools.count()
+        # Requests being sent per bucket, counted when they are taken from the queue
+        self.__sending: typing.Dict[ratelimit.Bucket, int] = {}
+        self.__tasks: typing.Set[asyncio.Task] = set()
+        self.__running = 0
+        self.__timer: typing.Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, method: str, endpoint: str,
+        run: typing.Callable[[], typing.Awaitable[typing.Any]], *,
+        priority: Priority = None,
+        deadline: float = None,
+        key: str = None
+    ) -> typing.Any:
+        """Queue a request and return its result once it is sent
+
+        Args:
+            method (str): The HTTP method of the request
+            endpoint (str): The endpoint of the request
+            run (Callable[[], Awaitable]): Sends the request
+            priority (Priority, optional): The priority class, \
+                from `request_priority` by default
+            deadline (float, optional): Seconds after which the request \
+                is useless and is dropped if it was not sent yet
+            key (str, optional): The key to fairly queue by, \
+                from `fairness_key` and `resolve_guild` by default
+
+        Raises:
+            `pycordia.errors.DeadlineExceeded`: If the deadline passed before the request was sent
+        """
+        if priority is None:
+            priority = request_priority(method, endpoint)
+        if key is None:
+            key = fairness_key(endpoint, self.resolve_guild)
+
+        future = asyncio.get_running_loop().create_future()
+        job = _Job(
+            method, endpoint, run, future,
+            time.monotonic() + deadline if deadline is not None else None,
+            priority, key
+        )
+
+        self.__enqueue(job)
+        if job.deadline is not None:
+            heapq.heappush(self.__deadlines, (job.deadline, next(self.__order), job))
+
+        self.__dispatch()
+        return await future
+
+    async def sleep(self, delay: float):
+        """Sleep for `delay` seconds without holding a slot
+
+        Used by requests waiting to be retried. The slot of the request is \
+            given to other requests while it sleeps, after which the request \
+            is queued again ahead of its queue, and returns once it gets a slot \
+            and its rate limit bucket lets it through. Outside of a request sent \
+            by this scheduler, this is `asyncio.sleep`.
+
+        Args:
+            delay (float): Seconds to sleep for
+        """
+        scheduler, job = _current_job.get() or (None, None)
+        if scheduler is not self or not job.holds_slot:
+            await asyncio.sleep(delay)
+            return
+
+        self.__release(job)
+        self.__dispatch()
+        await asyncio.sleep(delay)
+
+        resumed = job.resumed = asyncio.get_running_loop().create_future()
+        self.__enqueue(job, first=True)
+        self.__dispatch()
+        await resumed
+
+    @property
+    def pending(self) -> int:
+        """Requests waiting to be sent"""
+        return sum(
+            not job.future.done()
+            for queues in self.__queues for queue in queues.values() for job in queue
+        )
+
+    @property
+    def running(self) -> int:
+        """Requests being sent"""
+        return self.__running
+
+    def __dispatch(self):
+        if self.__timer:
+            self.__timer.cancel()
+            self.__timer = None
+
+        while self.__running < self.max_concurrency:
+            critical_only = self.__running >= self.max_concurrency - self.reserved
+            job, delay = self.__next_job(critical_only)
+
+            if job is None:
+                if delay is not None:
+                    self.__timer = asyncio.get_running_loop().call_later(delay, self.__dispatch)
+                return
+
+            self.__running += 1
+            job.holds_slot = True
+            job.bucket = self.ratelimiter.get_bucket(job.method, job.endpoint)
+            self.__sending[job.bucket] = self.__sending.get(job.bucket, 0) + 1
+
+            if job.resumed is not None:
+                job.resumed.set_result(None)
+                job.resumed = None
+                continue
+
+            task = asyncio.ensure_future(self.__run(job))
+            # The loop only keeps weak references to tasks
+            self.__tasks.add(task)
+            task.add_done_callback(self.__tasks.discard)
+
+    def __enqueue(self, job: _Job, *, first: bool = False):
+        queues = self.__queues[job.priority]
+        queue = queues.get(job.key)
+        if queue is None:
+            queue = queues[job.key] = collections.deque()
+
+        if first:
+            queue.appendleft(job)
+        else:
+            queue.append(job)
+
+    def __release(self, job: _Job):
+        job.holds_slot = False
+        self.__running -= 1
+        sending = self.__sending[job.bucket] - 1
+        if sending:
+            self.__sending[job.bucket] = sending
+        else:
+            del self.__sending[job.bucket]
+
+    def __expire(self, now: float):
+        deadlines = self.__deadlines
+        while deadlines and deadlines[0][0] <= now:
+            job = heapq.heappop(deadlines)[2]
+            # Sent jobs and jobs whose caller stopped waiting are skipped
+            if job.bucket is None and not job.future.done():
+                self.expired += 1
+                job.future.set_exception(pycordia.errors.DeadlineExceeded(
+                    f"{job.method} {job.endpoint} was not sent before its deadline"
+                ))
+
+    def __can_send(self, job: _Job) -> bool:
+        bucket = self.ratelimiter.get_bucket(job.method, job.endpoint)
+        # Requests taken from the queue but not counted by the bucket yet use
+        # up its remaining requests too
+        return self.__sending.get(bucket, 0) < bucket.available() + bucket.inflight
+
+    def __next_job(self, critical_only: bool
+    ) -> typing.Tuple[typing.Optional[_Job], typing.Optional[float]]:
+        now = time.monotonic()
+        self.__expire(now)
+        # Shortest wait among requests held back by their bucket
+        min_delay = None
+
+        for priority in Priority:
+            if critical_only and priority != Priority.interaction:
+                break
+
+            queues = self.__queues[priority]
+            best_key = best = None
+
+            for key in list(queues):
+                queue = queues[key]
+
+                # Expired jobs and jobs whose caller stopped waiting are done.
+                # Sleeping jobs are being sent, so they are only done once cancelled.
+                while queue and (
+                    queue[0].future.done() if queue[0].resumed is None else queue[0].resumed.done()
+                ):
+                    queue.popleft()
+
+                if not queue:
+                    del queues[key]
+                    continue
+
+                head = queue[0]
+                if not self.__can_send(head):
+                    # Without a delay, the request waits for requests being sent
+                    delay = self.ratelimiter.delay(head.method, head.endpoint)
+                    if delay > 0 and (min_delay is None or delay < min_delay):
+                        min_delay = delay
+                    continue
+
+                if best is None or (
+                    head.deadline is not None
+                    and (best.deadline is None or head.deadline < best.deadline)
+                ):
+                    best_key, best = key, head
+
+            if best is not None:
+                queue = queues[best_key]
+                queue.popleft()
+                # The queue takes its next turn after every other queue of the class
+                if queue:
+                    queues.move_to_end(best_key)
+                else:
+                    del queues[best_key]
+                return best, None
+
+        # Deadlines must be checked even while every bucket is exhausted
+        if self.__deadlines:
+            delay = self.__deadlines[0][0] - now
+            if min_delay is None or delay < min_delay:
+                min_delay = delay
+
+        return None, min_delay
+
+    async def __run(self, job: _Job):
+        _current_job.set((self, job))
+        try:
+            result = await job.run()
+        except BaseException as error:
+            if not job.future.done():
+                if isinstance(error, asyncio.CancelledError):
+                    job.future.cancel()
+                else:
+                    job.future.set_exception(error)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            # A job cancelled while sleeping has no slot
+            if job.holds_slot:
+                self.__release(job)
+            self.__dispatch()
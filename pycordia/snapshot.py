@@ -0,0 +1,187 @@
+import array
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import typing
+
+from pycordia import cache
+
+
+def _u64_array(view: memoryview) -> typing.Sequence[int]:
+    """Return little endian u64 values, without copying them on little endian hosts"""
+    if sys.byteorder == "little":
+        return view.cast("Q")
+
+    values = array.array("Q", view.tobytes())
+    values.byteswap()
+    return values
+
+
+class Snapshot:
+    """A read-only snapshot of a cache, stored in a local file
+
+    The file is memory-mapped and entries are only decoded when looked up,
+    so opening a snapshot costs the same regardless of its size. A snapshot
+    can be set as the `fallback` of a `pycordia.cache.Cache` so that cache
+    misses are served from it.
+
+    File layout, little endian:
+        header: magic (4 bytes), version (u16), padding (u16), \
+            creation time in ms (u64), entry count (u64)
+        keys: sorted integer keys (u64 each)
+        offsets: start of each entry in the data section, plus its end (u64 each)
+        data: entries encoded as compact JSON
+
+    Attributes:
+        path (str): Path of the snapshot file
+        created_at (float): Creation time, in seconds since the Unix epoch
+    """
+
+    MAGIC = b"PCSN"
+    VERSION = 1
+
+    _header = struct.Struct("<4sHHQQ")
+    _u64 = struct.Struct("<Q")
+
+    def __init__(self, path: str, *, decode: typing.Callable[[typing.Any], typing.Any] = None):
+        """
+        Args:
+            path (str): Path of the snapshot file
+            decode (typing.Callable, optional): Converts a decoded JSON object into a value
+
+        Raises:
+            ValueError: If the file is not a valid snapshot
+        """
+        self.path = path
+        self._decode = decode or (lambda value: value)
+
+        with open(path, "rb") as fp:
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < self._header.size:
+            self.close()
+            raise ValueError(f"'{path}' is not a valid snapshot")
+
+        magic, version, _, created_at, count = self._header.unpack_from(self._map, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.close()
+            raise ValueError(f"'{path}' is not a valid snapshot")
+
+        self.created_at = created_at / 1000
+        self._count = count
+
+        keys_start = self._header.size
+        offsets_start = keys_start + count * 8
+        self._data_start = offsets_start + (count + 1) * 8
+        if self._data_start > len(self._map) or \
+            self._data_start + self._u64.unpack_from(self._map, self._data_start - 8)[0] > len(self._map):
+            self.close()
+            raise ValueError(f"'{path}' is truncated")
+
+        view = memoryview(self._map)
+        self._keys = _u64_array(view[keys_start:offsets_start])
+        self._offsets = _u64_array(view[offsets_start:self._data_start])
+
+    @classmethod
+    def open(cls, path: str, *,
+        decode: typing.Callable[[typing.Any], typing.Any] = None,
+        max_age: typing.Optional[float] = None
+    ) -> typing.Optional['Snapshot']:
+        """Open a snapshot, or return None if it is missing, invalid or stale
+
+        Args:
+            path (str): Path of the snapshot file
+            decode (typing.Callable, optional): Converts a decoded JSON object into a value
+            max_age (float, optional): Maximum age of the snapshot in seconds
+        """
+        try:
+            snapshot = cls(path, decode=decode)
+        except (OSError, ValueError):
+            return None
+
+        if max_age is not None and snapshot.age > max_age:
+            snapshot.close()
+            return None
+
+        return snapshot
+
+    @property
+    def age(self) -> float:
+        """Time since the snapshot was created, in seconds"""
+        return time.time() - self.created_at
+
+    def _index(self, key: int) -> int:
+        index = bisect.bisect_left(self._keys, key)
+        if index < self._count and self._keys[index] == key:
+            return index
+        return -1
+
+    def get(self, key, default=None):
+        """Decode and return the entry for `key`, or `default` if not found"""
+        index = self._index(int(key))
+        if index == -1:
+            return default
+
+        start = self._data_start + self._offsets[index]
+        end = self._data_start + self._offsets[index + 1]
+        return self._decode(json.loads(self._map[start:end]))
+
+    def close(self):
+        """Release the memory map"""
+        for view in (getattr(self, "_keys", None), getattr(self, "_offsets", None)):
+            if isinstance(view, memoryview):
+                view.release()
+        self._map.close()
+
+    def __contains__(self, key) -> bool:
+        return self._index(int(key)) != -1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self._keys)
+
+    def __repr__(self):
+        return f"<Snapshot path='{self.path}' entries={self._count} age={self.age:.0f}s>"
+
+
+def save(path: str, source: 'cache.Cache', *,
+    encode: typing.Callable[[typing.Any], typing.Any] = None
+):
+    """Write the entries of a cache into a snapshot file
+
+    The file is written next to `path` first and then moved into place, so an
+    existing snapshot is never left half-written.
+
+    Args:
+        path (str): Path of the snapshot file
+        source (pycordia.cache.Cache): The cache to save. Keys must be integers (snowflakes).
+        encode (typing.Callable, optional): Converts a value into a JSON-serializable object
+    """
+    encode = encode or (lambda value: value)
+    dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+    entries = sorted((int(key), value) for key, value in source.items())
+
+    offsets = [0]
+    data = []
+    for _, value in entries:
+        record = dumps(encode(value)).encode("utf-8")
+        data.append(record)
+        offsets.append(offsets[-1] + len(record))
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as fp:
+        fp.write(Snapshot._header.pack(
+            Snapshot.MAGIC, Snapshot.VERSION, 0, int(time.time() * 1000), len(entries)
+        ))
+        fp.write(struct.pack(f"<{len(entries)}Q", *(key for key, _ in entries)))
+        fp.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        fp.writelines(data)
+
+    os.replace(temp_path, path)
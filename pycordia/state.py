@@ -0,0 +1,685 @@
+import array
+import sys
+import typing
+from datetime import datetime, timezone
+
+from pycordia import cache, models, utils
+
+
+Retention = typing.Union[bool, cache.Cache, 'CompactMemberStore']
+
+
+class StateStore:
+    """Guilds, channels, roles and members kept up to date by gateway events
+
+    Each type of object is kept according to its retention policy:
+    `True` keeps every object, `False` keeps none, and a `pycordia.cache.Cache`
+    keeps objects according to the cache's size limit and eviction policy.
+    Members may also be kept in a `CompactMemberStore` for very large guilds.
+
+    Attributes:
+        guilds: Guild storage, a mapping of guild ID - `pycordia.models.Guild`
+        channels: Channel storage, a mapping of channel ID - `pycordia.models.Channel`
+        roles: Role storage, a mapping of role ID - `pycordia.models.Role`
+        members: Member storage, a mapping of (guild ID, user ID) - `pycordia.models.Member`
+    """
+
+    def __init__(self, *,
+        guilds: Retention = True, channels: Retention = True,
+        roles: Retention = True, members: Retention = True
+    ):
+        """
+        Args:
+            guilds (Union[bool, pycordia.cache.Cache], optional): Retention for guilds
+            channels (Union[bool, pycordia.cache.Cache], optional): Retention for channels
+            roles (Union[bool, pycordia.cache.Cache], optional): Retention for roles
+            members (Union[bool, pycordia.cache.Cache, CompactMemberStore], optional): \
+                Retention for members
+        """
+        self.guilds = self.__make_storage(guilds)
+        self.channels = self.__make_storage(channels)
+        self.roles = self.__make_storage(roles)
+        self.members = self.__make_storage(members)
+
+        # Per-guild indexes: guild ID - set of channel IDs, role IDs or user IDs
+        self.__guild_channels: typing.Dict[str, typing.Set[str]] = {}
+        self.__guild_roles: typing.Dict[str, typing.Set[str]] = {}
+        self.__guild_members: typing.Dict[str, typing.Set[str]] = {}
+        self.__indexes = {
+            "channels": self.__guild_channels, "roles": self.__guild_roles, "members": self.__guild_members
+        }
+        # Index name - IDs added since the index was last pruned of evicted entries
+        self.__unpruned: typing.Dict[str, int] = dict.fromkeys(self.__indexes, 0)
+
+    @staticmethod
+    def __make_storage(retention: Retention):
+        if isinstance(retention, bool):
+            return {} if retention else None
+        return retention
+
+    # --- Lookups ---
+    def get_guild(self, guild_id: str) -> typing.Optional['models.Guild']:
+        """Return a stored guild, or None if it is not stored"""
+        return self.guilds.get(utils.snowflake(guild_id)) if self.guilds is not None else None
+
+    def get_channel(self, channel_id: str) -> typing.Optional['models.Channel']:
+        """Return a stored channel, or None if it is not stored"""
+        return self.channels.get(utils.snowflake(channel_id)) if self.channels is not None else None
+
+    def get_role(self, role_id: str) -> typing.Optional['models.Role']:
+        """Return a stored role, or None if it is not stored"""
+        return self.roles.get(utils.snowflake(role_id)) if self.roles is not None else None
+
+    def get_member(self, guild_id: str, user_id: str) -> typing.Optional['models.Member']:
+        """Return a stored guild member, or None if it is not stored"""
+        if self.members is None:
+            return None
+        return self.members.get((utils.snowflake(guild_id), utils.snowflake(user_id)))
+
+    def guild_channels(self, guild_id: str) -> typing.List['models.Channel']:
+        """Return all stored channels of a guild"""
+        return self.__collect(self.channels, self.__guild_channels.get(utils.snowflake(guild_id), ()))
+
+    def guild_roles(self, guild_id: str) -> typing.List['models.Role']:
+        """Return all stored roles of a guild"""
+        return self.__collect(self.roles, self.__guild_roles.get(utils.snowflake(guild_id), ()))
+
+    def guild_members(self, guild_id: str) -> typing.List['models.Member']:
+        """Return all stored members of a guild"""
+        guild_id = utils.snowflake(guild_id)
+        if isinstance(self.members, CompactMemberStore):
+            return self.members.guild_members(guild_id)
+
+        return self.__collect(
+            self.members, ((guild_id, user_id) for user_id in self.__guild_members.get(guild_id, ()))
+        )
+
+    def __index(self, name: str, guild_id: str, item_id: str):
+        """Add `item_id` to the `name` index of a guild
+
+        Bounded caches evict entries without telling the store, so each time as many \
+            IDs were added as the cache holds, the IDs of evicted entries are removed. \
+            This keeps indexes at most about twice the size of their cache.
+        """
+        index = self.__indexes[name]
+        index.setdefault(guild_id, set()).add(item_id)
+
+        storage = getattr(self, name)
+        if not isinstance(storage, cache.Cache):
+            return
+
+        self.__unpruned[name] += 1
+        if self.__unpruned[name] <= storage.max_size:
+            return
+
+        self.__unpruned[name] = 0
+        for indexed_guild_id, item_ids in list(index.items()):
+            item_ids = {
+                indexed_id for indexed_id in item_ids
+                if ((indexed_guild_id, indexed_id) if name == "members" else indexed_id) in storage
+            }
+            if item_ids:
+                index[indexed_guild_id] = item_ids
+            else:
+                del index[indexed_guild_id]
+
+    @staticmethod
+    def __collect(storage, keys) -> list:
+        if storage is None:
+            return []
+
+        found = []
+        for key in keys:
+            # Entries may have been evicted by a bounded cache
+            item = storage.get(key) if isinstance(storage, dict) else storage.peek(key)
+            if item is not None:
+                found.append(item)
+        return found
+
+    # --- Updates ---
+    def add_guild(self, guild: 'models.Guild'):
+        if self.guilds is not None:
+            self.guilds[guild.id] = guild
+
+        for channel in guild.channels:
+            # Channels sent in a guild payload do not include their guild ID
+            channel.guild_id = guild.id
+            self.add_channel(channel)
+
+        for role in guild.roles:
+            self.add_role(guild.id, role)
+
+        for member in guild.members:
+            self.add_member(guild.id, member)
+
+    def remove_guild(self, guild_id: str):
+        guild_id = utils.snowflake(guild_id)
+        if self.guilds is not None:
+            self.guilds.pop(guild_id, None)
+
+        for channel_id in self.__guild_channels.pop(guild_id, ()):
+            if self.channels is not None:
+                self.channels.pop(channel_id, None)
+
+        for role_id in self.__guild_roles.pop(guild_id, ()):
+            if self.roles is not None:
+                self.roles.pop(role_id, None)
+
+        if isinstance(self.members, CompactMemberStore):
+            self.members.remove_guild(guild_id)
+
+        for user_id in self.__guild_members.pop(guild_id, ()):
+            if self.members is not None:
+                self.members.pop((guild_id, user_id), None)
+
+    def add_channel(self, channel: 'models.Channel'):
+        if self.channels is None:
+            return
+
+        self.channels[channel.id] = channel
+        if channel.guild_id:
+            self.__index("channels", channel.guild_id, channel.id)
+
+    def remove_channel(self, channel_id: str, guild_id: str = None):
+        if self.channels is None:
+            return
+
+        channel_id, guild_id = utils.snowflake(channel_id), utils.snowflake(guild_id)
+        self.channels.pop(channel_id, None)
+        if guild_id:
+            self.__guild_channels.get(guild_id, set()).discard(channel_id)
+
+    def add_role(self, guild_id: str, role: 'models.Role'):
+        if self.roles is None:
+            return
+
+        guild_id = utils.snowflake(guild_id)
+        self.roles[role.role_id] = role
+        self.__index("roles", guild_id, role.role_id)
+
+    def remove_role(self, guild_id: str, role_id: str):
+        if self.roles is None:
+            return
+
+        guild_id, role_id = utils.snowflake(guild_id), utils.snowflake(role_id)
+        self.roles.pop(role_id, None)
+        self.__guild_roles.get(guild_id, set()).discard(role_id)
+
+    def add_member(self, guild_id: str, member: 'models.Member'):
+        if self.members is None or not member.user:
+            return
+
+        guild_id = utils.snowflake(guild_id)
+        self.members[(guild_id, member.user.id)] = member
+
+        # A compact store keeps its own per-guild index
+        if not isinstance(self.members, CompactMemberStore):
+            self.__index("members", guild_id, member.user.id)
+
+    def remove_member(self, guild_id: str, user_id: str):
+        if self.members is None:
+            return
+
+        guild_id, user_id = utils.snowflake(guild_id), utils.snowflake(user_id)
+        self.members.pop((guild_id, user_id), None)
+        self.__guild_members.get(guild_id, set()).discard(user_id)
+
+    def clear(self):
+        """Remove every stored object"""
+        for storage in (self.guilds, self.channels, self.roles, self.members):
+            if storage is not None:
+                storage.clear()
+
+        self.__guild_channels.clear()
+        self.__guild_roles.clear()
+        self.__guild_members.clear()
+
+    # --- Gateway ---
+    def parse_event(self, event_name: str, data: dict):
+        """Update the store from a gateway dispatch event.
+
+        Events that do not carry guild, channel, role or member state are ignored.
+
+        Args:
+            event_name (str): The event name, as sent by Discord (example: `GUILD_CREATE`)
+            data (dict): The event data
+        """
+        event_name = event_name.upper()
+
+        if event_name == "GUILD_CREATE":
+            # Guilds affected by an outage only include their ID
+            if data.get("unavailable"):
+                return
+
+            guild = models.Guild(data)
+            self.add_guild(guild)
+
+            for thread in data.get("threads") or []:
+                self.add_channel(models.Channel(thread))
+
+        elif event_name == "GUILD_UPDATE":
+            guild = models.Guild(data)
+            cached = self.get_guild(guild.id)
+
+            # Updates do not include members or channels
+            if cached:
+                guild.members = cached.members
+                guild.channels = cached.channels
+
+            if self.guilds is not None:
+                self.guilds[guild.id] = guild
+
+            role_ids = {role.role_id for role in guild.roles}
+            for role_id in self.__guild_roles.get(guild.id, set()) - role_ids:
+                self.remove_role(guild.id, role_id)
+            for role in guild.roles:
+                self.add_role(guild.id, role)
+
+        elif event_name == "GUILD_DELETE":
+            self.remove_guild(data["id"])
+
+        elif event_name in ("CHANNEL_CREATE", "CHANNEL_UPDATE", "THREAD_CREATE", "THREAD_UPDATE"):
+            cached = self.get_channel(data["id"])
+
+            # Keep the previous values of unchanged fields so they are shared with the cached channel
+            if cached:
+                previous = cached.to_dict()
+                changes = utils.diff_payloads(previous, data, partial=True)
+                data = {
+                    key: value if key in changes else previous.get(key, value)
+                    for key, value in data.items()
+                }
+
+            self.add_channel(models.Channel(data))
+
+        elif event_name in ("CHANNEL_DELETE", "THREAD_DELETE"):
+            self.remove_channel(data["id"], data.get("guild_id"))
+
+        elif event_name in ("GUILD_ROLE_CREATE", "GUILD_ROLE_UPDATE"):
+            self.add_role(data["guild_id"], models.Role(data["role"]))
+
+        elif event_name == "GUILD_ROLE_DELETE":
+            self.remove_role(data["guild_id"], data["role_id"])
+
+        elif event_name in ("GUILD_MEMBER_ADD", "GUILD_MEMBER_UPDATE"):
+            guild_id = data["guild_id"]
+            cached = self.get_member(guild_id, data["user"]["id"])
+
+            # Member updates may omit voice state fields
+            defaults = {
+                "deaf": cached.deaf if cached else False,
+                "mute": cached.mute if cached else False
+            }
+            self.add_member(guild_id, models.Member({**defaults, **data}))
+
+        elif event_name == "GUILD_MEMBER_REMOVE":
+            self.remove_member(data["guild_id"], data["user"]["id"])
+
+        elif event_name == "GUILD_MEMBERS_CHUNK":
+            guild_id = data["guild_id"]
+            if isinstance(self.members, CompactMemberStore):
+                self.members.add_payloads(guild_id, data.get("members", []))
+            else:
+                for member in data.get("members", []):
+                    self.add_member(guild_id, models.Member(member))
+
+
+# Member flag bits, stored in `_GuildMemberTable.flags`
+_DEAF = 1 << 0
+_MUTE = 1 << 1
+_PENDING = 1 << 2
+_BOT = 1 << 3
+_SYSTEM = 1 << 4
+
+_EMPTY = -1
+_NO_TIMESTAMP = -1
+
+
+def _datetime_to_ms(timestamp: typing.Optional[datetime]) -> int:
+    if timestamp is None:
+        return _NO_TIMESTAMP
+    return utils.datetime_to_epoch(timestamp)
+
+
+def _intern(value: typing.Optional[str]) -> typing.Optional[str]:
+    return None if value is None else sys.intern(value)
+
+
+def _ms_to_iso(ms: int) -> typing.Optional[str]:
+    if ms == _NO_TIMESTAMP:
+        return None
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).isoformat()
+
+
+class _GuildMemberTable:
+    """Columns for the members of one guild.
+
+    Rows are addressed by position. Removing a row moves the last row into its
+    place. User IDs are located through an open addressing hash table of row
+    positions, so no Python object is kept per member for the index.
+    """
+
+    def __init__(self):
+        self.user_ids = array.array("q")
+        self.joined_at = array.array("q")
+        self.premium_since = array.array("q")
+        self.role_sets = array.array("I")
+        self.flags = array.array("B")
+
+        self.usernames: typing.List[str] = []
+        self.discriminators: typing.List[str] = []
+        self.avatars: typing.List[typing.Optional[str]] = []
+        self.nicks: typing.List[typing.Optional[str]] = []
+        self.guild_avatars: typing.List[typing.Optional[str]] = []
+
+        self.slots = array.array("i", [_EMPTY]) * 8
+        self.mask = 7
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def _home(self, user_id: int) -> int:
+        # Fibonacci hashing, snowflakes share their low bits too often to use them directly
+        return ((user_id * 0x9E3779B97F4A7C15) >> 20) & self.mask
+
+    def find(self, user_id: int) -> int:
+        """Return the row of `user_id`, or -1 if not found"""
+        slots, user_ids, mask = self.slots, self.user_ids, self.mask
+        index = self._home(user_id)
+        while True:
+            row = slots[index]
+            if row == _EMPTY or user_ids[row] == user_id:
+                return row
+            index = (index + 1) & mask
+
+    def _find_slot(self, user_id: int) -> int:
+        slots, user_ids, mask = self.slots, self.user_ids, self.mask
+        index = self._home(user_id)
+        while slots[index] != _EMPTY and user_ids[slots[index]] != user_id:
+            index = (index + 1) & mask
+        return index
+
+    def _grow(self):
+        size = len(self.slots) * 2
+        self.slots = array.array("i", [_EMPTY]) * size
+        self.mask = size - 1
+
+        for row, user_id in enumerate(self.user_ids):
+            self.slots[self._find_slot(user_id)] = row
+
+    def put(self, user_id: int, joined_at: int, premium_since: int, role_set: int, flags: int,
+        username: str, discriminator: str, avatar: typing.Optional[str],
+        nick: typing.Optional[str], guild_avatar: typing.Optional[str]
+    ):
+        row = self.find(user_id)
+        if row == _EMPTY:
+            if (len(self.user_ids) + 1) * 2 > len(self.slots):
+                self._grow()
+
+            row = len(self.user_ids)
+            self.slots[self._find_slot(user_id)] = row
+
+            self.user_ids.append(user_id)
+            self.joined_at.append(joined_at)
+            self.premium_since.append(premium_since)
+            self.role_sets.append(role_set)
+            self.flags.append(flags)
+            self.usernames.append(username)
+            self.discriminators.append(discriminator)
+            self.avatars.append(avatar)
+            self.nicks.append(nick)
+            self.guild_avatars.append(guild_avatar)
+            return
+
+        self.joined_at[row] = joined_at
+        self.premium_since[row] = premium_since
+        self.role_sets[row] = role_set
+        self.flags[row] = flags
+        self.usernames[row] = username
+        self.discriminators[row] = discriminator
+        self.avatars[row] = avatar
+        self.nicks[row] = nick
+        self.guild_avatars[row] = guild_avatar
+
+    def remove(self, user_id: int) -> bool:
+        row = self.find(user_id)
+        if row == _EMPTY:
+            return False
+
+        # Backward shift deletion keeps probe sequences intact without tombstones
+        slots, mask = self.slots, self.mask
+        hole = self._find_slot(user_id)
+        index = hole
+        while True:
+            index = (index + 1) & mask
+            moved = slots[index]
+            if moved == _EMPTY:
+                break
+
+            home = self._home(self.user_ids[moved])
+            if (hole < index and hole < home <= index) or \
+                    (hole > index and (home > hole or home <= index)):
+                continue
+
+            slots[hole] = moved
+            hole = index
+        slots[hole] = _EMPTY
+
+        # Move the last row into the removed one
+        last = len(self.user_ids) - 1
+        if row != last:
+            slots[self._find_slot(self.user_ids[last])] = row
+            for column in (
+                self.user_ids, self.joined_at, self.premium_since, self.role_sets, self.flags,
+                self.usernames, self.discriminators, self.avatars, self.nicks, self.guild_avatars
+            ):
+                column[row] = column[last]
+
+        for column in (
+            self.user_ids, self.joined_at, self.premium_since, self.role_sets, self.flags,
+            self.usernames, self.discriminators, self.avatars, self.nicks, self.guild_avatars
+        ):
+            column.pop()
+
+        return True
+
+
+class CompactMemberStore:
+    """Memory-compact member storage for very large guilds
+
+    Members are held column by column: snowflakes and timestamps (as epoch
+    milliseconds) in integer arrays, and role lists as indexes into a table of
+    interned role sets shared by every guild. `pycordia.models.Member` objects
+    are only created when a member is looked up.
+
+    Can be used as the `members` retention of a `StateStore`, in which case
+    keys are (guild ID, user ID) tuples.
+
+    Operations:
+        - len(x): Amount of members stored, across all guilds
+        - (guild_id, user_id) in x: Checks if a member is stored
+    """
+
+    def __init__(self):
+        self.__guilds: typing.Dict[str, _GuildMemberTable] = {}
+
+        self.__role_sets: typing.List[typing.Tuple[int, ...]] = [()]
+        self.__role_set_ids: typing.Dict[typing.Tuple[int, ...], int] = {(): 0}
+
+    def __intern_roles(self, role_ids: typing.Iterable[str]) -> int:
+        roles = tuple(sorted(int(role_id) for role_id in role_ids))
+        index = self.__role_set_ids.get(roles)
+        if index is None:
+            index = len(self.__role_sets)
+            self.__role_sets.append(roles)
+            self.__role_set_ids[roles] = index
+        return index
+
+    def __materialize(self, table: _GuildMemberTable, row: int) -> 'models.Member':
+        flags = table.flags[row]
+        return models.Member({
+            "user": {
+                "id": str(table.user_ids[row]),
+                "username": table.usernames[row],
+                "discriminator": table.discriminators[row],
+                "avatar": table.avatars[row],
+                "bot": True if flags & _BOT else None,
+                "system": True if flags & _SYSTEM else None
+            },
+            "nick": table.nicks[row],
+            "avatar": table.guild_avatars[row],
+            "roles": [str(role_id) for role_id in self.__role_sets[table.role_sets[row]]],
+            "joined_at": _ms_to_iso(table.joined_at[row]),
+            "premium_since": _ms_to_iso(table.premium_since[row]),
+            "deaf": bool(flags & _DEAF),
+            "mute": bool(flags & _MUTE),
+            "pending": bool(flags & _PENDING)
+        })
+
+    def add(self, guild_id: str, member: 'models.Member'):
+        """Store or replace a member of a guild"""
+        user = member.user
+        if not user:
+            return
+
+        flags = (
+            _DEAF * bool(member.deaf) | _MUTE * bool(member.mute) |
+            _PENDING * bool(member.pending) | _BOT * bool(user.bot) | _SYSTEM * bool(user.system)
+        )
+
+        guild_id = utils.snowflake(guild_id)
+        table = self.__guilds.get(guild_id)
+        if table is None:
+            table = self.__guilds[guild_id] = _GuildMemberTable()
+
+        table.put(
+            int(user.id), _datetime_to_ms(member.joined_at), _datetime_to_ms(member.premium_since),
+            self.__intern_roles(member.role_ids), flags,
+            user.username, _intern(user.discriminator), user.avatar_hash,
+            member.nick, member.guild_avatar_hash
+        )
+
+    def add_payloads(self, guild_id: str, payloads: typing.List[dict]):
+        """Store or replace many members of a guild from their raw payloads
+
+        Faster than `add` for member chunks, as no `pycordia.models.Member` \
+            is created and timestamps are converted in one batch.
+        """
+        payloads = [payload for payload in payloads if payload.get("user")]
+        joined_at = utils.isos_to_epoch(payload.get("joined_at") for payload in payloads)
+        premium_since = utils.isos_to_epoch(payload.get("premium_since") for payload in payloads)
+
+        guild_id = utils.snowflake(guild_id)
+        table = self.__guilds.get(guild_id)
+        if table is None:
+            table = self.__guilds[guild_id] = _GuildMemberTable()
+
+        for payload, joined, premium in zip(payloads, joined_at, premium_since):
+            user = payload["user"]
+            flags = (
+                _DEAF * bool(payload.get("deaf")) | _MUTE * bool(payload.get("mute")) |
+                _PENDING * bool(payload.get("pending")) | _BOT * bool(user.get("bot")) |
+                _SYSTEM * bool(user.get("system"))
+            )
+
+            table.put(
+                int(user["id"]),
+                _NO_TIMESTAMP if joined is None else joined,
+                _NO_TIMESTAMP if premium is None else premium,
+                self.__intern_roles(payload.get("roles", [])), flags,
+                user["username"], _intern(user.get("discriminator")), user.get("avatar"),
+                payload.get("nick"), payload.get("avatar")
+            )
+
+    def get_member(self, guild_id: str, user_id: str) -> typing.Optional['models.Member']:
+        """Return a member of a guild, or None if it is not stored"""
+        table = self.__guilds.get(utils.snowflake(guild_id))
+        if table is None:
+            return None
+
+        row = table.find(int(user_id))
+        return self.__materialize(table, row) if row != _EMPTY else None
+
+    def remove(self, guild_id: str, user_id: str) -> bool:
+        """Remove a member of a guild, returns whether it was stored"""
+        table = self.__guilds.get(utils.snowflake(guild_id))
+        if table is None or not table.remove(int(user_id)):
+            return False
+
+        if not table:
+            del self.__guilds[utils.snowflake(guild_id)]
+        return True
+
+    def user_ids_with_role(self, guild_id: str, role_id: str) -> typing.List[utils.Snowflake]:
+        """Return the IDs of the members of a guild that have a role"""
+        table = self.__guilds.get(utils.snowflake(guild_id))
+        if table is None:
+            return []
+
+        role = int(role_id)
+        matching = {index for index, roles in enumerate(self.__role_sets) if role in roles}
+        if not matching:
+            return []
+
+        user_ids = table.user_ids
+        return [
+            utils.Snowflake(user_ids[row]) for row, index in enumerate(table.role_sets) if index in matching
+        ]
+
+    def members_with_role(self, guild_id: str, role_id: str) -> typing.List['models.Member']:
+        """Return the members of a guild that have a role"""
+        return [
+            member for member in (
+                self.get_member(guild_id, user_id)
+                for user_id in self.user_ids_with_role(guild_id, role_id)
+            ) if member
+        ]
+
+    def guild_user_ids(self, guild_id: str) -> typing.List[utils.Snowflake]:
+        """Return the IDs of every stored member of a guild"""
+        table = self.__guilds.get(utils.snowflake(guild_id))
+        return [utils.Snowflake(user_id) for user_id in table.user_ids] if table else []
+
+    def guild_members(self, guild_id: str) -> typing.List['models.Member']:
+        """Return every stored member of a guild"""
+        table = self.__guilds.get(utils.snowflake(guild_id))
+        return [self.__materialize(table, row) for row in range(len(table))] if table else []
+
+    def remove_guild(self, guild_id: str):
+        """Remove every member of a guild"""
+        self.__guilds.pop(utils.snowflake(guild_id), None)
+
+    # --- Mapping interface used by `StateStore` ---
+    def get(self, key: typing.Tuple[str, str], default=None):
+        member = self.get_member(*key)
+        return default if member is None else member
+
+    peek = get
+
+    def pop(self, key: typing.Tuple[str, str], default=None):
+        member = self.get_member(*key)
+        if member is None:
+            return default
+
+        self.remove(*key)
+        return member
+
+    def clear(self):
+        self.__guilds.clear()
+        del self.__role_sets[1:]
+        self.__role_set_ids = {(): 0}
+
+    def __setitem__(self, key: typing.Tuple[str, str], member: 'models.Member'):
+        self.add(key[0], member)
+
+    def __contains__(self, key) -> bool:
+        table = self.__guilds.get(utils.snowflake(key[0]))
+        return table is not None and table.find(int(key[1])) != _EMPTY
+
+    def __len__(self) -> int:
+        return sum(len(table) for table in self.__guilds.values())
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple[utils.Snowflake, utils.Snowflake]]:
+        for guild_id, table in self.__guilds.items():
+            for user_id in table.user_ids:
+                yield guild_id, utils.Snowflake(user_id)
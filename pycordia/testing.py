@@ -0,0 +1,421 @@
+import asyncio
+import collections
+import datetime
+import itertools
+import json
+import math
+import time
+import typing
+import zlib
+
+from aiohttp import web, WSMsgType
+
+import pycordia
+from pycordia import ratelimit
+
+
+BOT_USER = {
+    "id": "800000000000000000",
+    "username": "pycordia",
+    "discriminator": "0000",
+    "avatar": None,
+    "bot": True
+}
+
+# Events kept per session, replayed when the session is resumed
+SESSION_BACKLOG = 1000
+
+
+def message_payload(index: int, *, channel_id: str = "810000000000000000",
+    guild_id: str = "820000000000000000", content: str = None
+) -> dict:
+    """Return a synthetic `MESSAGE_CREATE` payload
+
+    Args:
+        index (int): Number of the message, which its ID and author are derived from
+        channel_id (str, optional): ID of the channel of the message
+        guild_id (str, optional): ID of the guild of the message
+        content (str, optional): Content of the message, `Message {index}` by default
+    """
+    return {
+        "id": str(900000000000000000 + index),
+        "channel_id": channel_id,
+        "guild_id": guild_id,
+        "author": {
+            "id": str(830000000000000000 + index % 100),
+            "username": f"user{index % 100}",
+            "discriminator": f"{index % 100:04}",
+            "avatar": None
+        },
+        "content": content if content is not None else f"Message {index}",
+        "timestamp": "2021-09-01T12:00:00.000000+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0
+    }
+
+
+def message_events(count: int = None, **kwargs) -> typing.Iterator[typing.Tuple[str, dict]]:
+    """Return `MESSAGE_CREATE` events made by `message_payload`
+
+    Args:
+        count (int, optional): The amount of events, endless if None
+        **kwargs: Passed to `message_payload`
+    """
+    indexes = range(count) if count is not None else itertools.count()
+    return (("MESSAGE_CREATE", message_payload(index, **kwargs)) for index in indexes)
+
+
+class _Session:
+    __slots__ = ("id", "sequence", "backlog")
+
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.sequence = 0
+        # (sequence, encoded payload) of the last events sent
+        self.backlog: typing.Deque[typing.Tuple[int, bytes]] = collections.deque(maxlen=SESSION_BACKLOG)
+
+
+class _Connection:
+    __slots__ = ("ws", "compressor", "session", "pump")
+
+    def __init__(self, ws: web.WebSocketResponse, compress: bool):
+        self.ws = ws
+        self.compressor = zlib.compressobj() if compress else None
+        self.session: typing.Optional[_Session] = None
+        self.pump: typing.Optional[asyncio.Task] = None
+
+    async def send(self, payload: typing.Union[dict, bytes]):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        if self.compressor:
+            # Every message of a zlib stream ends with a sync flush, as Discord's do
+            await self.ws.send_bytes(
+                self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+            )
+        else:
+            await self.ws.send_str(data.decode("utf-8"))
+
+
+class FakeDiscord:
+    """A local stand-in for the Discord REST API and gateway, for tests and benchmarks
+
+    The REST API answers with rate limit headers, and with 429 responses when \
+        a route goes over its limit. The gateway sends HELLO, answers IDENTIFY \
+        with READY, replays missed events on RESUME, sends zlib-stream frames \
+        when asked to, and then sends the events given to it at `event_rate`.
+
+    Example:
+        ```
+        async with FakeDiscord(events=message_events(10_000)) as server:
+            # pycordia.api_url and pycordia.ws_url point at the server,
+            # and must be set before a client is created
+            client = pycordia.Client(intents=pycordia.Intents.all())
+            ...
+        ```
+
+    Routes are added with `add_route` before the server starts. Unknown routes \
+        answer 404.
+
+    Attributes:
+        latency (float): Seconds every REST response is delayed
+        ratelimit_limit (int): Requests allowed per route and window
+        ratelimit_reset_after (float): Length of a rate limit window, in seconds
+        enforce_ratelimits (bool): Whether requests over the limit get a 429 response
+        event_rate (Optional[float]): Events sent per second, None for as fast as possible
+        heartbeat_interval (int): Heartbeat interval sent in HELLO, in milliseconds
+        api_url (Optional[str]): URL of the REST API, once started
+        ws_url (Optional[str]): URL of the gateway, once started
+        requests (int): REST requests received
+        rate_limited (int): 429 responses sent
+        identifies (int): IDENTIFY payloads received
+        resumes (int): RESUME payloads received
+        events_sent (int): Dispatch events sent, not counting replays
+    """
+
+    def __init__(self, *,
+        latency: float = 0.0,
+        ratelimit_limit: int = 5,
+        ratelimit_reset_after: float = 1.0,
+        enforce_ratelimits: bool = True,
+        events: typing.Iterable[typing.Tuple[str, dict]] = (),
+        event_rate: float = None,
+        heartbeat_interval: int = 41250
+    ):
+        """
+        Args:
+            events (Iterable[Tuple[str, dict]], optional): Event name - data pairs \
+                sent after READY. Connections share them, so a connection \
+                continues where the previous one stopped.
+        """
+        self.latency = latency
+        self.ratelimit_limit = ratelimit_limit
+        self.ratelimit_reset_after = ratelimit_reset_after
+        self.enforce_ratelimits = enforce_ratelimits
+        self.event_rate = event_rate
+        self.heartbeat_interval = heartbeat_interval
+
+        self.api_url: typing.Optional[str] = None
+        self.ws_url: typing.Optional[str] = None
+
+        self.requests = 0
+        self.rate_limited = 0
+        self.identifies = 0
+        self.resumes = 0
+        self.events_sent = 0
+
+        self.__events = iter(events)
+        self.__routes: typing.List[typing.Tuple[str, str, typing.Callable]] = [
+            ("GET", "gateway", self.__get_gateway),
+            ("GET", "gateway/bot", self.__get_gateway),
+            ("GET", "users/@me", self.__get_me),
+            ("POST", "channels/{channel_id}/messages", self.__create_message)
+        ]
+        # route: (remaining, reset time)
+        self.__buckets: typing.Dict[str, typing.Tuple[int, float]] = {}
+        self.__sessions: typing.Dict[str, _Session] = {}
+        self.__connections: typing.List[_Connection] = []
+        self.__runner: typing.Optional[web.AppRunner] = None
+        self.__installed: typing.Optional[typing.Tuple[str, str]] = None
+        self.__messages = itertools.count(1)
+
+    def add_route(self, method: str, path: str, handler: typing.Callable[[web.Request], typing.Awaitable]):
+        """Add a REST route, replacing the default one of the same method and path
+
+        Args:
+            method (str): The HTTP method
+            path (str): The path, without the API version (example: `guilds/{guild_id}`)
+            handler (Callable[[aiohttp.web.Request], Awaitable]): A coroutine function \
+                returning the JSON data of the response, or an `aiohttp.web.Response`
+        """
+        if self.__runner:
+            raise RuntimeError("Routes must be added before the server starts")
+
+        path = path.strip("/")
+        self.__routes = [route for route in self.__routes if route[:2] != (method.upper(), path)]
+        self.__routes.append((method.upper(), path, handler))
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        """Start the server, on a free port by default"""
+        app = web.Application(middlewares=[self.__rest_middleware], client_max_size=0)
+        app.router.add_get("/", self.__gateway)
+        for method, path, handler in self.__routes:
+            app.router.add_route(method, f"/api/v9/{path}", self.__wrap(handler))
+        app.router.add_route("*", "/api/v9/{tail:.*}", self.__not_found)
+
+        self.__runner = web.AppRunner(app)
+        await self.__runner.setup()
+        site = web.TCPSite(self.__runner, host, port)
+        await site.start()
+
+        host, port = self.__runner.addresses[0][:2]
+        self.api_url = f"http://{host}:{port}/api/v9"
+        self.ws_url = f"ws://{host}:{port}"
+
+    def install(self):
+        """Point `pycordia.api_url` and `pycordia.ws_url` at the server"""
+        if self.__installed is None:
+            self.__installed = (pycordia.api_url, pycordia.ws_url)
+        pycordia.api_url = self.api_url
+        pycordia.ws_url = self.ws_url
+
+    async def stop(self):
+        """Close every gateway connection, stop the server and restore the URLs"""
+        for connection in list(self.__connections):
+            await connection.ws.close()
+
+        if self.__runner:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+        if self.__installed is not None:
+            pycordia.api_url, pycordia.ws_url = self.__installed
+            self.__installed = None
+
+    async def __aenter__(self) -> 'FakeDiscord':
+        await self.start()
+        self.install()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    # --- Gateway ---
+    async def dispatch(self, event_name: str, data: dict):
+        """Send an event to every identified connection"""
+        for connection in list(self.__connections):
+            if connection.session:
+                await self.__dispatch(connection, event_name, data)
+
+    async def request_reconnect(self):
+        """Ask every connection to reconnect (opcode 7)"""
+        for connection in list(self.__connections):
+            await connection.send({"op": 7, "d": None})
+
+    async def __dispatch(self, connection: _Connection, event_name: str, data: dict):
+        session = connection.session
+        session.sequence += 1
+        payload = json.dumps(
+            {"op": 0, "t": event_name, "s": session.sequence, "d": data}
+        ).encode("utf-8")
+        session.backlog.append((session.sequence, payload))
+
+        await connection.send(payload)
+        self.events_sent += 1
+
+    async def __pump(self, connection: _Connection):
+        interval = 1 / self.event_rate if self.event_rate else 0.0
+        start = time.monotonic()
+
+        for index, (event_name, data) in enumerate(self.__events, 1):
+            await self.__dispatch(connection, event_name, data)
+
+            if interval:
+                # Sleep until the next event is due, so the rate does not drift
+                delay = start + index * interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+    async def __gateway(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        connection = _Connection(ws, request.query.get("compress") == "zlib-stream")
+        self.__connections.append(connection)
+
+        try:
+            await connection.send({"op": 10, "d": {"heartbeat_interval": self.heartbeat_interval}})
+
+            async for message in ws:
+                if message.type not in (WSMsgType.TEXT, WSMsgType.BINARY):
+                    continue
+
+                payload = json.loads(message.data)
+                op, data = payload.get("op"), payload.get("d")
+
+                if op == 1:
+                    await connection.send({"op": 11, "d": None})
+
+                elif op == 2:
+                    self.identifies += 1
+                    session = _Session(f"session{self.identifies}")
+                    self.__sessions[session.id] = connection.session = session
+
+                    await self.__dispatch(connection, "READY", {
+                        "v": 9,
+                        "user": BOT_USER,
+                        "guilds": [],
+                        "session_id": session.id,
+                        "application": {"id": BOT_USER["id"], "flags": 0}
+                    })
+                    connection.pump = asyncio.ensure_future(self.__pump(connection))
+
+                elif op == 6:
+                    self.resumes += 1
+                    session = self.__sessions.get(data.get("session_id"))
+                    if session is None:
+                        # Invalid session, not resumable
+                        await connection.send({"op": 9, "d": False})
+                        continue
+
+                    connection.session = session
+                    for sequence, event in list(session.backlog):
+                        if sequence > (data.get("seq") or 0):
+                            await connection.send(event)
+                    await self.__dispatch(connection, "RESUMED", {})
+                    connection.pump = asyncio.ensure_future(self.__pump(connection))
+        finally:
+            if connection.pump:
+                connection.pump.cancel()
+            self.__connections.remove(connection)
+
+        return ws
+
+    # --- REST ---
+    @web.middleware
+    async def __rest_middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        if not request.path.startswith("/api/"):
+            return await handler(request)
+
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        route = ratelimit.route_key(request.method, request.path[len("/api/v9/"):])
+        now = time.monotonic()
+        remaining, reset_at = self.__buckets.get(route, (self.ratelimit_limit, 0.0))
+        if reset_at <= now:
+            remaining, reset_at = self.ratelimit_limit, now + self.ratelimit_reset_after
+
+        # Rounded up, so the window has reset once the client waited for it
+        reset_after = math.ceil((reset_at - now) * 1000) / 1000
+        headers = {
+            "X-RateLimit-Bucket": f"{zlib.crc32(route.encode('utf-8')):08x}",
+            "X-RateLimit-Limit": str(self.ratelimit_limit),
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}"
+        }
+
+        if remaining <= 0 and self.enforce_ratelimits:
+            self.rate_limited += 1
+            headers["X-RateLimit-Remaining"] = "0"
+            headers["Retry-After"] = f"{reset_after:.3f}"
+            return web.json_response({
+                "message": "You are being rate limited.",
+                "retry_after": reset_after,
+                "global": False
+            }, status=429, headers=headers)
+
+        remaining = max(remaining - 1, 0)
+        self.__buckets[route] = (remaining, reset_at)
+        headers["X-RateLimit-Remaining"] = str(remaining)
+
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    @staticmethod
+    def __wrap(handler):
+        async def wrapper(request: web.Request) -> web.StreamResponse:
+            result = await handler(request)
+            if isinstance(result, web.StreamResponse):
+                return result
+            if result is None:
+                return web.Response(status=204)
+            return web.json_response(result)
+        return wrapper
+
+    async def __not_found(self, request: web.Request) -> web.Response:
+        return web.json_response({"message": "404: Not Found", "code": 0}, status=404)
+
+    async def __get_gateway(self, request: web.Request) -> dict:
+        return {"url": self.ws_url, "shards": 1}
+
+    async def __get_me(self, request: web.Request) -> dict:
+        return BOT_USER
+
+    async def __create_message(self, request: web.Request) -> dict:
+        if request.content_type == "multipart/form-data":
+            reader = await request.multipart()
+            payload = {}
+            async for part in reader:
+                if part.name == "payload_json":
+                    payload = await part.json()
+                else:
+                    await part.release()
+        else:
+            payload = await request.json() if request.can_read_body else {}
+
+        message = message_payload(
+            next(self.__messages), channel_id=request.match_info["channel_id"],
+            content=payload.get("content", "")
+        )
+        message["author"] = BOT_USER
+        message["embeds"] = payload.get("embeds") or []
+        message["nonce"] = payload.get("nonce")
+        message["timestamp"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        return message
@@ -1,8 +1,18 @@
+import asyncio
+import collections
+import functools
 import typing
 import inspect
+import operator
 import datetime
 import enum
 import random
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class Color:
@@ -24,10 +34,33 @@ class Color:
 
 
 class BoolEnumKey:
-    def __init__(self, name: str, value: typing.Any, is_set: bool):
+    """A flag of a `BoolEnum`
+
+    Keys returned by a `BoolEnum` are views: setting `is_set` updates the enum.
+    """
+    __slots__ = ("name", "value", "__owner", "__bit", "__is_set")
+
+    def __init__(self, name: str, value: typing.Any, is_set: bool, *,
+        owner: 'BoolEnum' = None, bit: int = 0
+    ):
         self.name = name
         self.value = value
-        self.is_set = is_set
+        self.__owner = owner
+        self.__bit = bit
+        self.__is_set = is_set
+
+    @property
+    def is_set(self) -> bool:
+        if self.__owner is None:
+            return self.__is_set
+        return bool(self.__owner._state & self.__bit)
+
+    @is_set.setter
+    def is_set(self, value: bool):
+        if self.__owner is None:
+            self.__is_set = value
+        else:
+            setattr(self.__owner, self.name, value)
 
     def __str__(self):
         return str(self.value)
@@ -36,52 +69,143 @@ class BoolEnumKey:
         return f"<EnumKey{':set'*bool(self.is_set)} name='{self.name}' value={self.value}>"
 
 
+class _BoolEnumField:
+    """A flag declared on a `BoolEnum` subclass, returns `BoolEnumKey` views on instances"""
+    __slots__ = ("name", "value", "bit")
+
+    def __init__(self, name: str, value: typing.Any, bit: int):
+        self.name = name
+        self.value = value
+        self.bit = bit
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self.value
+        return BoolEnumKey(self.name, self.value, False, owner=obj, bit=self.bit)
+
+    def __set__(self, obj, value):
+        if not isinstance(value, bool):
+            raise ValueError(f"'{self.name}' must have a value of boolean form")
+
+        if value:
+            obj._state |= self.bit
+        else:
+            obj._state &= ~self.bit
+
+
 class BoolEnum:
-    def __new__(cls, **kwargs):       
-        # Get defined class attributes
+    """A set of named boolean flags
+
+    Flags are declared as class attributes of a subclass, and set with keyword arguments. \
+        When every flag value is a distinct power of two (like Discord permissions), \
+        the state of the enum is the integer Discord uses.
 
-        attribs = {}
+    Operations:
+        - int(x): Returns the integer form of the set flags
+        - iter(x): Iterates over the flags as `BoolEnumKey` objects
+        - x == y: Checks if two enums of the same class have the same flags set. \
+            As flags can be changed, enums are not hashable: use `int(x)` as a key instead.
+    """
+    __slots__ = ("_state",)
+
+    # Computed once per subclass
+    _fields: typing.Dict[str, _BoolEnumField] = {}
+    _is_bitfield: bool = True
 
-        init = object.__new__(cls)
-       
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
 
+        members = {}
         for name, value in inspect.getmembers(cls):
-            # If member is not a routine (a function) and if it's not a dunder
-            if not inspect.isroutine(value) and \
-                not (name.startswith("__") and name.endswith("__")):    
-                attribs[name] = value
+            if isinstance(value, _BoolEnumField):
+                # Inherited from another BoolEnum
+                members[name] = value.value
+            elif not name.startswith("_") and not inspect.isroutine(value) \
+                and not isinstance(value, property):
+                members[name] = value
+
+        values = list(members.values())
+        cls._is_bitfield = all(
+            type(value) is int and value > 0 and value & (value - 1) == 0 for value in values
+        ) and len(set(values)) == len(values)
+
+        cls._fields = {}
+        for index, (name, value) in enumerate(members.items()):
+            field = _BoolEnumField(name, value, value if cls._is_bitfield else 1 << index)
+            cls._fields[name] = field
+            setattr(cls, name, field)
+
+    def __init__(self, **kwargs):
+        self._state = 0
 
         for name, value in kwargs.items():
-            if name not in attribs:
+            if name not in self._fields:
                 raise ValueError(f"'{name}' is not a valid keyword argument")
             
-            if name in attribs and not isinstance(value, bool):
+            if not isinstance(value, bool):
                 raise ValueError(f"Argument '{name}' value must be of boolean form")
-            
-        for name, value in attribs.items():
-            setattr(init, name, BoolEnumKey(name, value, kwargs.get(name, False)))
 
-        return init
+            if value:
+                self._state |= self._fields[name].bit
+
+    @classmethod
+    def from_int(cls, value: typing.Union[int, str]):
+        """Create an enum from the integer form of its flags
+
+        Args:
+            value (Union[int, str]): An integer, or a string of digits \
+                as Discord sends permissions
+        """
+        obj = cls.__new__(cls)
+        value = int(value)
+
+        if cls._is_bitfield:
+            # Unknown bits are kept, so that they are sent back as they were received
+            obj._state = value
+        else:
+            obj._state = 0
+            for field in cls._fields.values():
+                if isinstance(field.value, int) and value & field.value == field.value:
+                    obj._state |= field.bit
+
+        return obj
+
+    def __int__(self) -> int:
+        if self._is_bitfield:
+            return self._state
+
+        result = 0
+        for field in self._fields.values():
+            if self._state & field.bit:
+                result |= field.value
+        return result
 
-    def __setattr__(self, name, value):
-        attr = getattr(self, name, None)
-        if attr and isinstance(attr, BoolEnumKey):
-            if isinstance(value, bool):
-                attr.is_set = value
-                return
+    def __iter__(self) -> typing.Iterator[BoolEnumKey]:
+        return (
+            BoolEnumKey(field.name, field.value, False, owner=self, bit=field.bit)
+            for field in self._fields.values()
+        )
 
-            raise ValueError(f"'{name}' must have a value of boolean form")
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._state == other._state
 
-        return object.__setattr__(self, name, value)
+    # Flags are mutable, so enums are not hashable
+    __hash__ = None
+
+    def __repr__(self):
+        names = ", ".join(name for name, field in self._fields.items() if self._state & field.bit)
+        return f"<{type(self).__name__} {names}>"
 
-    def __iter__(self) -> typing.Iterator[BoolEnumKey]:
-        return iter(value for _, value in inspect.getmembers(
-            self, predicate=lambda member: isinstance(member, BoolEnumKey)
-        ))
+
+_parameters: typing.Dict[typing.Callable, typing.Tuple[str, ...]] = {}
 
 
 def obj_from_dict(data: dict, obj: typing.Callable, alias: dict = None):
     """Convert a dictionary `data` into an `obj`.
+
+    The parameters of `obj` are read once per callable.
     
     Parameters:
         data (dict): The data to provide.
@@ -89,18 +213,86 @@ def obj_from_dict(data: dict, obj: typing.Callable, alias: dict = None):
         alias (dict): A dictionary containing aliases for any parts of the dictionary. \
             Follows a (param-alias) pair
     """
-    sig = inspect.signature(obj)
+    params = _parameters.get(obj)
+    if params is None:
+        params = _parameters[obj] = tuple(inspect.signature(obj).parameters)
+
+    if not alias:
+        return obj(**{param: data[param] for param in params if param in data})
+
     new_inf = {}
-    for param in sig.parameters:
-        if alias and param in alias:
+    for param in params:
+        if param in alias:
             new_inf[param] = data[alias[param]]
         elif param in data:    
             new_inf[param] = data[param]
 
     return obj(**new_inf)
 
+_public_fields: typing.Dict[type, typing.Optional[typing.Tuple[str, ...]]] = {}
+
+
+def _fields_of(cls: type) -> typing.Optional[typing.Tuple[str, ...]]:
+    """Return the public slot names of `cls`, or None if its instances have a `__dict__`"""
+    try:
+        return _public_fields[cls]
+    except KeyError:
+        pass
+
+    fields = None
+    if "__dict__" not in dir(cls):
+        fields = []
+        for base in reversed(cls.__mro__):
+            for name in base.__dict__.get("__slots__", ()):
+                if not name.startswith("_") and name not in fields:
+                    fields.append(name)
+        fields = tuple(fields)
+
+    _public_fields[cls] = fields
+    return fields
+
+def _json_value(value: typing.Any) -> typing.Any:
+    """Return IDs as strings, the form Discord sends and expects them in"""
+    return str(value) if type(value) is Snowflake else value
+
+_serializers: typing.Dict[tuple, typing.Optional[typing.Callable[[typing.Any], dict]]] = {}
+
+
+def _serializer(cls: type, alias: typing.Optional[dict], ignore_fields: typing.Optional[list]):
+    """Return a function converting instances of a slotted class into dictionaries
+
+    Fields are read all at once by an `operator.attrgetter`. Returns None for \
+        classes whose instances have a `__dict__`, as their fields are not known in advance.
+    """
+    key = (cls, tuple(alias.items()) if alias else (), tuple(ignore_fields or ()))
+    try:
+        return _serializers[key]
+    except KeyError:
+        pass
+
+    fields = _fields_of(cls)
+    serialize = None
+    if fields is not None:
+        fields = tuple(field for field in fields if field not in key[2])
+        keys = tuple(alias.get(field, field) for field in fields) if alias else fields
+
+        if not fields:
+            serialize = lambda obj: {}
+        elif len(fields) == 1:
+            getter = operator.attrgetter(fields[0])
+            serialize = lambda obj: {keys[0]: _json_value(getter(obj))}
+        else:
+            getter = operator.attrgetter(*fields)
+            serialize = lambda obj: dict(zip(keys, map(_json_value, getter(obj))))
+
+    _serializers[key] = serialize
+    return serialize
+
 def obj_to_dict(obj: typing.Any, *, alias: dict = None, ignore_fields: list = None):
     """Convert an `obj` into a dictionary.
+
+    Snowflakes are converted into strings. For classes defining `__slots__`, a serializer is built once per class, \
+        alias and ignored fields.
     
     Parameters:
         obj (typing.Any): The object to convert
@@ -108,20 +300,132 @@ def obj_to_dict(obj: typing.Any, *, alias: dict = None, ignore_fields: list = No
             Follows a (attribute-alias) pair
         ignore_fields (list): A list of attributes to ignore when converting
     """
+    serialize = _serializer(type(obj), alias, ignore_fields)
+    if serialize is not None:
+        try:
+            return serialize(obj)
+        except AttributeError:
+            # A slot was never assigned, leave it out
+            missing = object()
+            items = (
+                (key, value) for key, value in (
+                    (key, getattr(obj, key, missing)) for key in _fields_of(type(obj))
+                ) if value is not missing
+            )
+    else:
+        items = ((key, value) for key, value in obj.__dict__.items() if not key.startswith("_"))
+
     new_inf = {}
-    if ignore_fields is None:
-        ignore_fields = []
-    
-    if obj.__dict__:
-        for key, value in obj.__dict__.items():
-            if not key.startswith("_"):
-                if key not in ignore_fields:
-                    if alias and key in alias:
-                        new_inf[alias[key]] = value
-                    else:
-                        new_inf[key] = value
+    for key, value in items:
+        if ignore_fields and key in ignore_fields:
+            continue
+        if alias and key in alias:
+            new_inf[alias[key]] = _json_value(value)
+        else:
+            new_inf[key] = _json_value(value)
+
+    return new_inf
+
+
+def diff_payloads(before: dict, after: dict, *, partial: bool = False
+) -> typing.Dict[str, typing.Tuple[typing.Any, typing.Any]]:
+    """Return the top-level fields that differ between two payloads of an object
+
+    Raw payloads are plain JSON values, so comparing them is much cheaper \
+        than comparing the models built from them.
+
+    Args:
+        before (dict): The previous payload
+        after (dict): The new payload
+        partial (bool, optional): Whether `after` only contains updated fields, \
+            in which case missing fields are considered unchanged
+
+    Returns: A mapping of field name - (old value, new value)
+    """
+    keys = after.keys() if partial else after.keys() | before.keys()
+
+    changes = {}
+    for key in keys:
+        old, new = before.get(key), after.get(key)
+        if old is not new and old != new:
+            changes[key] = (old, new)
+    return changes
+
+
+class lazy_attribute:
+    """A model attribute that is decoded on first access and then cached
 
-    return new_inf        
+    Works like `functools.cached_property` for classes that define `__slots__`:
+    the decoded value is stored in a slot named after the attribute with a
+    leading underscore, which the class must declare.
+    """
+
+    def __init__(self, decode: typing.Callable[[typing.Any], typing.Any]):
+        self.decode = decode
+        self.name = decode.__name__
+        self.slot = None
+        self.__doc__ = decode.__doc__
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+        self.slot = owner.__dict__.get(f"_{name}")
+        if self.slot is None:
+            raise TypeError(
+                f"'{owner.__name__}' must declare a slot named '_{name}' "
+                f"to use the lazy attribute '{name}'"
+            )
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+
+        try:
+            return self.slot.__get__(obj, owner)
+        except AttributeError:
+            value = self.decode(obj)
+            self.slot.__set__(obj, value)
+            return value
+
+    def __set__(self, obj, value):
+        self.slot.__set__(obj, value)
+
+    def peek(self, obj, default=None):
+        """Return the value of this attribute for `obj` if it was decoded, else `default`"""
+        try:
+            return self.slot.__get__(obj, type(obj))
+        except AttributeError:
+            return default
+
+    def __delete__(self, obj):
+        # Deleting the cached value makes the attribute decode again on next access
+        try:
+            self.slot.__delete__(obj)
+        except AttributeError:
+            pass
+
+
+_lazy_fields: typing.Dict[type, typing.Tuple[lazy_attribute, ...]] = {}
+
+
+def lazy_attributes(cls: type) -> typing.Tuple[lazy_attribute, ...]:
+    """Return the lazy attributes of a class, including inherited ones"""
+    fields = _lazy_fields.get(cls)
+    if fields is None:
+        fields = _lazy_fields[cls] = tuple(
+            value for base in reversed(cls.__mro__)
+            for value in base.__dict__.values() if isinstance(value, lazy_attribute)
+        )
+    return fields
+
+
+def decode_lazy_attributes(obj: typing.Any):
+    """Decode every `lazy_attribute` of `obj`
+
+    Args:
+        obj (typing.Any): An instance of a class using `lazy_attribute`
+    """
+    for field in lazy_attributes(type(obj)):
+        field.slot.__set__(obj, field.decode(obj))
 
 def mutually_exclusive(*argument_names):
     def factory(fun):
@@ -138,6 +442,113 @@ def mutually_exclusive(*argument_names):
         return wrapper
     return factory
 
+DISCORD_EPOCH = 1420070400000
+
+# Maximum amount of entries in the snowflake intern table, least recently used IDs are dropped first
+SNOWFLAKE_TABLE_SIZE = 1 << 16
+
+
+class Snowflake(int):
+    """An integer-backed Discord ID
+
+    Snowflakes compare, hash and sort as integers, and format as their decimal
+    digits, so they can be used anywhere an ID string was used in an URL.
+    Like integers, they do not compare equal to strings: convert string IDs
+    with `snowflake` before comparing them.
+
+    Operations:
+        - str(x): Returns the ID as a string of digits
+        - x == y: Checks if two IDs are the same, `y` can be an int
+        - x < y: Checks if `x` was created before `y`
+    """
+    __slots__ = ()
+
+    @property
+    def timestamp(self) -> int:
+        """The time this ID was created at, in milliseconds since the Unix epoch"""
+        return (self >> 22) + DISCORD_EPOCH
+
+    @property
+    def created_at(self) -> datetime.datetime:
+        """The time this ID was created at"""
+        return datetime.datetime.fromtimestamp(self.timestamp / 1000, datetime.timezone.utc)
+
+    @classmethod
+    def from_timestamp(cls, timestamp: int) -> 'Snowflake':
+        """Return the lowest snowflake created at a time in milliseconds since the Unix epoch.
+
+        Useful for range queries, e.g. `Snowflake.from_timestamp(start) <= message.id`.
+        """
+        return cls((int(timestamp) - DISCORD_EPOCH) << 22)
+
+
+_snowflakes: typing.OrderedDict[typing.Union[str, int], Snowflake] = collections.OrderedDict()
+
+
+def snowflake(value: typing.Union[str, int, None]) -> typing.Optional[Snowflake]:
+    """Convert an ID into a `Snowflake`, sharing instances for repeated IDs
+
+    Args:
+        value (Union[str, int, None]): An ID as a string or an integer
+
+    Returns: A `Snowflake`, or None if `value` is None
+    """
+    if value is None:
+        return None
+
+    flake = _snowflakes.get(value)
+    if flake is not None:
+        _snowflakes.move_to_end(value)
+        return flake
+
+    flake = value if type(value) is Snowflake else Snowflake(value)
+
+    # Share the instance between the string and integer forms of the ID
+    key = int(flake)
+    flake = _snowflakes.setdefault(key, flake)
+    _snowflakes.move_to_end(key)
+    _snowflakes[value] = flake
+
+    while len(_snowflakes) > SNOWFLAKE_TABLE_SIZE:
+        _snowflakes.popitem(last=False)
+
+    return flake
+
+
+def singleflight(key: typing.Callable[..., typing.Hashable] = None):
+    """Make concurrent calls of a coroutine function with the same key share one call
+
+    Cancelling a caller does not cancel the shared call for the other callers.
+
+    Args:
+        key (typing.Callable, optional): Returns the key of a call from its arguments. \
+            Defaults to the arguments themselves.
+    """
+    def factory(fun):
+        inflight: typing.Dict[typing.Hashable, asyncio.Task] = {}
+
+        def finish(call_key, task: asyncio.Task):
+            del inflight[call_key]
+            # Retrieve the exception so that it is not logged when every caller was cancelled
+            if not task.cancelled():
+                task.exception()
+
+        @functools.wraps(fun)
+        async def wrapper(*args, **kwargs):
+            call_key = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+
+            # The call runs in a task of its own, so that a caller being
+            # cancelled does not cancel it for the other callers
+            task = inflight.get(call_key)
+            if task is None:
+                task = inflight[call_key] = asyncio.ensure_future(fun(*args, **kwargs))
+                task.add_done_callback(functools.partial(finish, call_key))
+
+            return await asyncio.shield(task)
+
+        return wrapper
+    return factory
+
 def snowflake_to_date(snowflake: int) -> datetime.datetime:
     """Converts a snowflake to a valid `datetime.datetime` object
 
@@ -151,11 +562,106 @@ def snowflake_to_date(snowflake: int) -> datetime.datetime:
     # https://discord.com/developers/docs/reference
 
     # (snowflake >> 22) + Discord Epoch
-    ms = (snowflake >> 22) + 1420070400000
+    ms = (snowflake >> 22) + DISCORD_EPOCH
     
     # Divided by 1000 and then provided to datetime.datetime
     return datetime.datetime.utcfromtimestamp(ms / 1000)
 
+def nonce() -> str:
+    """Return a nonce for a message send: a snowflake of the current time, with random lower bits
+
+    Returns: str
+    """
+    return str(((time.time_ns() // 1_000_000 - DISCORD_EPOCH) << 22) | random.getrandbits(22))
+
+# Maximum amount of timestamp strings remembered by `parse_timestamp` and `iso_to_epoch`
+TIMESTAMP_CACHE_SIZE = 1024
+
+_UTC_SUFFIX = "+00:00"
+_UNIX_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+@functools.lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def parse_timestamp(timestamp: str) -> datetime.datetime:
+    """Parse an ISO 8601 timestamp sent by Discord
+
+    Results are cached, as the same timestamps are often sent many times \
+        (e.g. the join date of a member in every member update).
+
+    Args:
+        timestamp (str): An ISO 8601 timestamp
+
+    Returns: `datetime.datetime`
+    """
+    return datetime.datetime.fromisoformat(timestamp)
+
+@functools.lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def iso_to_epoch(timestamp: typing.Optional[str]) -> typing.Optional[int]:
+    """Convert an ISO 8601 timestamp into milliseconds since the Unix epoch
+
+    Args:
+        timestamp (str): An ISO 8601 timestamp, or None
+
+    Returns: The timestamp in milliseconds, or None if `timestamp` is None
+    """
+    if timestamp is None:
+        return None
+    return datetime_to_epoch(parse_timestamp(timestamp))
+
+def datetime_to_epoch(date: datetime.datetime) -> int:
+    """Convert an aware `datetime.datetime` into milliseconds since the Unix epoch
+
+    Sub-millisecond precision is floored, as NumPy does in `isos_to_epoch`.
+
+    Args:
+        date (datetime.datetime): A timezone aware datetime
+
+    Returns: The datetime in milliseconds
+    """
+    return (date - _UNIX_EPOCH) // datetime.timedelta(milliseconds=1)
+
+def isos_to_epoch(timestamps: typing.Iterable[typing.Optional[str]]) -> typing.List[typing.Optional[int]]:
+    """Convert many ISO 8601 timestamps into milliseconds since the Unix epoch
+
+    Uses NumPy when it is installed and every timestamp is in UTC, as Discord sends them.
+
+    Args:
+        timestamps (typing.Iterable[str]): ISO 8601 timestamps, may contain None
+
+    Returns: A list of timestamps in milliseconds, with None where `timestamps` had None
+    """
+    timestamps = list(timestamps)
+
+    if numpy is None or not all(
+        timestamp is None or timestamp.endswith(_UTC_SUFFIX) for timestamp in timestamps
+    ):
+        return [iso_to_epoch(timestamp) for timestamp in timestamps]
+
+    # NumPy only parses naive timestamps, which it treats as UTC
+    values = numpy.array(
+        [timestamp and timestamp[:-len(_UTC_SUFFIX)] for timestamp in timestamps],
+        dtype="datetime64[ms]"
+    )
+    return [
+        None if missing else epoch
+        for missing, epoch in zip(numpy.isnat(values).tolist(), values.astype(numpy.int64).tolist())
+    ]
+
+def snowflakes_to_epoch(snowflakes: typing.Iterable[typing.Union[str, int]]) -> typing.List[int]:
+    """Return the creation times of many snowflakes, in milliseconds since the Unix epoch
+
+    Uses NumPy when it is installed.
+
+    Args:
+        snowflakes (typing.Iterable[Union[str, int]]): Snowflakes as integers or strings
+    """
+    if numpy is None:
+        return [(int(flake) >> 22) + DISCORD_EPOCH for flake in snowflakes]
+
+    # Snowflakes fit in 63 bits
+    values = numpy.fromiter(map(int, snowflakes), dtype=numpy.int64)
+    return ((values >> 22) + DISCORD_EPOCH).tolist()
+
 def make_optional(callable: typing.Callable, *args, **kwargs) -> typing.Optional[typing.Any]:
     """Return the result of `callable` if `args` or `kwargs` evaluate to True, else None
 
@@ -181,7 +181,9 @@ class DiscordWebSocket:
     async def start(self):
         """Start a WebSocket for connecting to Discord"""
 
-        async with aiohttp.ClientSession() as session:
+        # Gateway connections share the connector of REST requests, and its DNS cache
+        async with self.client.http.websocket_session() as session:
+            self.session = session
             self.sock = await session.ws_connect(self.gateway_url)
 
             await asyncio.gather(
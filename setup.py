@@ -25,6 +25,7 @@ setup(name='pycordia',
       long_description=readme,
       long_description_content_type="text/markdown",
       install_requires=requirements,
+      extras_require={"speed": ["numpy"]},
       python_requires='>=3.7.0',
       classifiers=[
         "Development Status :: 2 - Pre-Alpha",
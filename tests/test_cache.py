@@ -0,0 +1,283 @@
+import os
+
+import pytest
+
+from pycordia import cache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    lru = cache.LRUCache(2)
+    lru["a"] = 1
+    lru["b"] = 2
+    assert lru.get("a") == 1
+
+    lru["c"] = 3
+    assert "b" not in lru
+    assert lru.keys() == ["a", "c"]
+    assert lru.stats.evictions == 1
+
+
+def test_lru_overwrite_does_not_evict():
+    lru = cache.LRUCache(2)
+    lru["a"] = 1
+    lru["b"] = 2
+    lru["a"] = 3
+
+    assert len(lru) == 2
+    assert lru.peek("a") == 3
+    assert lru.stats.evictions == 0
+
+
+def test_stats_count_hits_and_misses():
+    lru = cache.LRUCache(2)
+    lru["a"] = 1
+    lru.get("a")
+    lru.get("b")
+
+    assert (lru.stats.hits, lru.stats.misses) == (1, 1)
+    assert lru.stats.hit_ratio == 0.5
+
+    # Peeking and membership checks are not lookups
+    lru.peek("a")
+    assert "a" in lru
+    assert (lru.stats.hits, lru.stats.misses) == (1, 1)
+
+
+def test_zero_size_cache_stores_nothing():
+    lru = cache.LRUCache(0)
+    lru["a"] = 1
+    assert len(lru) == 0
+
+
+def test_negative_size_is_rejected():
+    with pytest.raises(ValueError):
+        cache.LRUCache(-1)
+
+
+def test_ttl_entries_expire():
+    timer = FakeTimer()
+    ttl = cache.TTLCache(10, ttl=5, timer=timer)
+    ttl["a"] = 1
+
+    timer.now = 4.9
+    assert ttl.get("a") == 1
+
+    timer.now = 5.0
+    assert ttl.get("a") is None
+    assert ttl.stats.evictions == 1
+
+
+def test_ttl_evicts_closest_to_expiring_when_full():
+    timer = FakeTimer()
+    ttl = cache.TTLCache(2, ttl=5, timer=timer)
+    ttl["a"] = 1
+    timer.now = 1
+    ttl["b"] = 2
+    ttl["c"] = 3
+
+    assert ttl.keys() == ["b", "c"]
+
+
+def test_lfu_evicts_least_frequently_used():
+    lfu = cache.LFUCache(2)
+    lfu["a"] = 1
+    lfu["b"] = 2
+    lfu.get("a")
+    lfu.get("a")
+    lfu.get("b")
+
+    lfu["c"] = 3
+    assert "b" not in lfu
+    assert set(lfu.keys()) == {"a", "c"}
+
+
+def test_lfu_breaks_ties_by_recency():
+    lfu = cache.LFUCache(2)
+    lfu["a"] = 1
+    lfu["b"] = 2
+
+    lfu["c"] = 3
+    assert set(lfu.keys()) == {"b", "c"}
+
+
+def test_lfu_pop_and_clear():
+    lfu = cache.LFUCache(3)
+    lfu["a"] = 1
+    lfu["b"] = 2
+
+    assert lfu.pop("a") == 1
+    assert lfu.pop("a", "missing") == "missing"
+
+    lfu.clear()
+    assert len(lfu) == 0
+    lfu["c"] = 3
+    assert lfu["c"] == 3
+
+
+def test_fallback_fills_the_cache():
+    lru = cache.LRUCache(2)
+    lru.fallback = {"a": 1}
+
+    assert lru.get("a") == 1
+    assert lru.peek("a") == 1
+    assert lru.stats.hits == 1
+
+
+def test_fallback_is_masked_for_keys_replaced_or_removed():
+    lru = cache.LRUCache(1)
+    lru.fallback = {"a": 1, "b": 2, "c": 3}
+
+    lru.pop("a")
+    assert lru.get("b") == 2
+    del lru["b"]
+    lru["c"] = 30
+    lru["d"] = 4
+
+    assert lru.get("a") is None and lru.get("b") is None
+    # Evicted by "d", the stored value must not be replaced by the fallback one
+    assert lru.get("c") is None
+
+    lru.fallback = {"a": 1}
+    assert lru.get("a") == 1
+
+
+def test_fallback_entries_are_loaded_again_once_evicted():
+    lru = cache.LRUCache(1)
+    lru.fallback = {"a": 1, "b": 2}
+
+    assert lru.get("a") == 1 and lru.get("b") == 2
+    assert lru.peek("a") is None
+    assert lru.get("a") == 1
+
+
+@pytest.fixture
+def shared_cache():
+    caches = []
+
+    def make(max_size=16, **kwargs):
+        kwargs.setdefault("encode", lambda value: value)
+        kwargs.setdefault("decode", lambda value: value)
+        shared = cache.SharedMemoryCache(f"pycordia-test-{os.getpid()}-{len(caches)}", max_size, **kwargs)
+        caches.append(shared)
+        return shared
+
+    yield make
+
+    for shared in caches:
+        shared.close()
+        shared.unlink()
+
+
+def test_shared_memory_cache_stores_values(shared_cache):
+    shared = shared_cache(slot_size=128)
+    shared[810000000000000000] = {"name": "user"}
+
+    assert shared.get("810000000000000000") == {"name": "user"}
+    assert list(shared) == [810000000000000000]
+
+    del shared[810000000000000000]
+    assert shared.get(810000000000000000) is None
+
+
+def test_shared_memory_cache_is_shared_between_instances(shared_cache):
+    first = shared_cache(slot_size=128)
+    second = cache.SharedMemoryCache(first.name, encode=str, decode=int)
+    try:
+        first[1] = 42
+        assert second.get(1) == 42
+        assert second.max_size == 16 and second.slot_size == 128
+    finally:
+        second.close()
+
+
+def test_shared_memory_cache_replaces_oversized_values(shared_cache):
+    shared = shared_cache(slot_size=64)
+    shared[1] = "small"
+
+    with pytest.warns(RuntimeWarning):
+        shared[1] = "x" * 100
+
+    assert shared.get(1) is None
+    assert shared.oversized == 1
+
+
+def test_shared_memory_cache_validates_sizes():
+    with pytest.raises(ValueError):
+        cache.SharedMemoryCache("pycordia-test-invalid", 0, encode=str, decode=str)
+    with pytest.raises(ValueError):
+        cache.SharedMemoryCache("pycordia-test-invalid", 8, slot_size=20, encode=str, decode=str)
+    with pytest.raises(TypeError):
+        cache.SharedMemoryCache("pycordia-test-invalid", 8)
+
+
+def test_file_lock_can_be_taken_again():
+    lock = cache._FileLock(f"pycordia-test-{os.getpid()}")
+    try:
+        with lock:
+            pass
+        with lock:
+            pass
+    finally:
+        lock.close()
+
+
+def test_channel_history_answers_recent_queries():
+    history = cache.ChannelHistory(5)
+    for message_id in range(1, 8):
+        history.add(1, message_id)
+
+    assert history.query(1, 3) == [7, 6, 5]
+    assert history.query(1, 2, before=6) == [5, 4]
+    assert history.query(1, 2, after=4) == [6, 5]
+    assert history.query(1, 10, after=5) == [7, 6]
+
+
+def test_channel_history_refuses_queries_outside_the_buffer():
+    history = cache.ChannelHistory(5)
+    for message_id in range(1, 8):
+        history.add(1, message_id)
+
+    assert history.query(1, 6) is None
+    assert history.query(1, 3, before=4) is None
+    assert history.query(1, 3, after=1) is None
+    assert history.query(2, 1) is None
+
+
+def test_channel_history_keeps_out_of_order_messages_sorted():
+    history = cache.ChannelHistory(3)
+    for message_id in (10, 30, 20, 20):
+        history.add(1, message_id)
+
+    assert history.query(1, 3) == [30, 20, 10]
+
+    # The buffer is full: older messages are dropped, newer ones evict the oldest
+    history.add(1, 5)
+    history.add(1, 25)
+    assert history.query(1, 3) == [30, 25, 20]
+
+
+def test_channel_history_remove_and_clear():
+    history = cache.ChannelHistory(5)
+    for message_id in range(1, 4):
+        history.add(1, message_id)
+
+    history.remove(1, [2])
+    assert history.query(1, 2) == [3, 1]
+
+    history.clear()
+    assert history.query(1, 1) is None
+
+
+def test_channel_history_of_size_zero_keeps_nothing():
+    history = cache.ChannelHistory(0)
+    history.add(1, 1)
+
+    assert history.query(1, 1) is None
@@ -0,0 +1,120 @@
+import asyncio
+
+import pycordia
+from pycordia import events
+from pycordia.testing import message_payload
+
+
+MESSAGE_ID = 900000000000000001
+
+
+def dispatch(client: pycordia.Client, *events):
+    async def main():
+        for event_name, data in events:
+            await client.call_event_handler(event_name, data)
+            # Handlers run in tasks of their own
+            await asyncio.sleep(0)
+
+    asyncio.run(main())
+
+
+def test_partial_update_of_uncached_message_is_not_cached():
+    client = pycordia.Client(intents=0)
+    dispatch(client, ("MESSAGE_UPDATE", {
+        "id": str(MESSAGE_ID), "channel_id": "810000000000000000", "embeds": []
+    }))
+
+    assert client.message_cache.peek(MESSAGE_ID) is None
+
+
+def test_full_update_of_uncached_message_is_cached():
+    client = pycordia.Client(intents=0)
+    dispatch(client, ("MESSAGE_UPDATE", message_payload(1, content="Edited")))
+
+    assert client.message_cache.peek(MESSAGE_ID).content == "Edited"
+
+
+def test_partial_update_is_merged_into_cached_message():
+    client = pycordia.Client(intents=0)
+    dispatch(client, ("MESSAGE_CREATE", message_payload(1)), ("MESSAGE_UPDATE", {
+        "id": str(MESSAGE_ID), "channel_id": "810000000000000000", "content": "Edited"
+    }))
+
+    message = client.message_cache.peek(MESSAGE_ID)
+    assert message.content == "Edited"
+    assert message.author.username == "user1"
+
+
+def test_message_update_handlers_receive_before_and_after():
+    client = pycordia.Client(intents=0)
+    received = []
+
+    @client.event
+    async def on_message_update(before, after):
+        received.append((before.content, after.content))
+
+    dispatch(client, ("MESSAGE_CREATE", message_payload(1)), ("MESSAGE_UPDATE", {
+        "id": str(MESSAGE_ID), "channel_id": "810000000000000000", "content": "Edited"
+    }))
+
+    assert received == [("Message 1", "Edited")]
+
+
+def test_message_diff_handlers_receive_changes():
+    client = pycordia.Client(intents=0)
+    received = []
+
+    @client.event
+    async def on_message_diff(event: events.UpdateEvent):
+        received.append(event)
+
+    dispatch(client, ("MESSAGE_CREATE", message_payload(1)), ("MESSAGE_UPDATE", {
+        "id": str(MESSAGE_ID), "channel_id": "810000000000000000", "content": "Edited", "pinned": False
+    }))
+
+    assert len(received) == 1
+    assert received[0].changes == {"content": ("Message 1", "Edited")}
+    assert received[0].changed("content") and not received[0].changed("pinned")
+    assert received[0].after.content == "Edited"
+
+
+def test_channel_update_handlers_receive_the_channel_and_diff():
+    client = pycordia.Client(intents=0)
+    channels, diffs = [], []
+
+    @client.event
+    async def on_channel_update(channel):
+        channels.append(channel)
+
+    @client.event
+    async def on_channel_diff(event: events.UpdateEvent):
+        diffs.append(event)
+
+    channel = {"id": "810000000000000001", "type": 0, "guild_id": "810000000000000000", "name": "general"}
+    dispatch(client, ("CHANNEL_CREATE", channel), ("CHANNEL_UPDATE", {**channel, "name": "renamed"}))
+
+    assert [channel.name for channel in channels] == ["renamed"]
+    assert diffs[0].changes == {"name": ("general", "renamed")}
+    assert diffs[0].before.name == "general"
+
+
+def test_full_message_update_diff_only_reports_changed_fields():
+    client = pycordia.Client(intents=0)
+    received = []
+
+    @client.event
+    async def on_message_diff(event: events.UpdateEvent):
+        received.append(event)
+
+    dispatch(
+        client, ("MESSAGE_CREATE", message_payload(1)),
+        ("MESSAGE_UPDATE", {**message_payload(1, content="Edited"), "edited_timestamp": "2021-09-01T12:05:00+00:00"})
+    )
+
+    event = received[0]
+    assert event.changes == {
+        "content": ("Message 1", "Edited"),
+        "edited_timestamp": (None, "2021-09-01T12:05:00+00:00")
+    }
+    assert event.after.author is event.before.author
+    assert event.after.content == "Edited"
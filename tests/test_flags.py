@@ -0,0 +1,40 @@
+import pytest
+
+from pycordia import models
+from pycordia.permissions import Permissions
+
+
+def guild_payload(**fields) -> dict:
+    return {
+        "id": "810000000000000000", "name": "Guild", "owner_id": "810000000000000002",
+        "afk_timeout": 300, "verification_level": 0, "default_message_notifications": 0,
+        "explicit_content_filter": 0, "roles": [], "emojis": [], "features": [], "mfa_level": 0,
+        "premium_tier": 0, "preferred_locale": "en-US", "nsfw_level": 0, **fields
+    }
+
+
+def test_flags_round_trip_through_integers():
+    flags = models.SystemChannelFlags(suppress_join_notifications=True)
+    flags.suppress_guild_reminder_notifications = True
+
+    assert int(flags) == 0b101
+    assert models.SystemChannelFlags.from_int(5) == flags
+    assert flags.suppress_join_notifications.is_set
+    assert not flags.suppress_premium_subscriptions.is_set
+
+
+def test_flags_keep_unknown_bits():
+    assert int(Permissions.from_int(str(1 << 60 | 8))) == 1 << 60 | 8
+
+
+def test_flags_are_not_hashable():
+    with pytest.raises(TypeError):
+        hash(Permissions(administrator=True))
+
+
+def test_guild_system_channel_flags_are_decoded():
+    guild = models.Guild(guild_payload(system_channel_flags=3))
+    assert guild.system_channel_flags == models.SystemChannelFlags.from_int(3)
+
+    assert int(models.Guild(guild_payload(system_channel_flags=0)).system_channel_flags) == 0
+    assert models.Guild(guild_payload()).system_channel_flags is None
@@ -0,0 +1,236 @@
+import asyncio
+import contextlib
+
+import pytest
+from aiohttp import web
+
+import pycordia
+from pycordia import errors, http
+from pycordia.testing import FakeDiscord
+
+
+@contextlib.asynccontextmanager
+async def serve(routes=(), **kwargs):
+    server = FakeDiscord(**kwargs)
+    for route in routes:
+        server.add_route(*route)
+
+    async with server:
+        client = http.HTTPClient("token")
+        await client.login()
+        try:
+            yield server, client
+        finally:
+            await client.close()
+
+
+def test_concurrent_gets_share_one_request():
+    async def main():
+        received = 0
+
+        async def get_user(request):
+            nonlocal received
+            received += 1
+            await asyncio.sleep(0.05)
+            return {"id": request.match_info["user_id"]}
+
+        async with serve([("GET", "users/{user_id}", get_user)]) as (server, client):
+            responses = await asyncio.gather(*(client.request("GET", "users/1") for _ in range(5)))
+
+        assert received == 1
+        assert [rs.data for rs in responses] == [{"id": "1"}] * 5
+
+    asyncio.run(main())
+
+
+def test_cancelled_caller_does_not_cancel_shared_get():
+    async def main():
+        async def get_user(request):
+            await asyncio.sleep(0.05)
+            return {"id": request.match_info["user_id"]}
+
+        async with serve([("GET", "users/{user_id}", get_user)]) as (server, client):
+            first = asyncio.ensure_future(client.request("GET", "users/1"))
+            await asyncio.sleep(0.01)
+            second = asyncio.ensure_future(client.request("GET", "users/1"))
+            await asyncio.sleep(0.01)
+
+            first.cancel()
+            assert (await second).data == {"id": "1"}
+            with pytest.raises(asyncio.CancelledError):
+                await first
+
+    asyncio.run(main())
+
+
+def test_not_found_gets_fail_without_a_request():
+    async def main():
+        async with serve() as (server, client):
+            with pytest.raises(errors.NotFound):
+                await client.request("GET", "users/1")
+            with pytest.raises(errors.NotFound):
+                await client.request("GET", "users/1")
+            assert server.requests == 1
+
+            client.negative_ttl = 0
+            with pytest.raises(errors.NotFound):
+                await client.request("GET", "users/2")
+            with pytest.raises(errors.NotFound):
+                await client.request("GET", "users/2")
+            assert server.requests == 3
+
+    asyncio.run(main())
+
+
+def test_not_found_endpoints_are_bounded(monkeypatch):
+    monkeypatch.setattr(http, "NOT_FOUND_CACHE_SIZE", 2)
+
+    async def main():
+        async with serve() as (server, client):
+            for user_id in (1, 2, 3, 1):
+                with pytest.raises(errors.NotFound):
+                    await client.request("GET", f"users/{user_id}")
+
+            # users/1 was dropped to remember users/3
+            assert server.requests == 4
+
+    asyncio.run(main())
+
+
+def test_connector_settings_are_applied():
+    async def main():
+        settings = http.ConnectorSettings(limit=10, limit_per_host=4, dns_cache_ttl=None)
+        connector = settings.create_connector()
+        try:
+            assert connector.limit == 10 and connector.limit_per_host == 4
+        finally:
+            await connector.close()
+
+    asyncio.run(main())
+
+
+def test_rest_and_gateway_sessions_share_the_connector():
+    async def main():
+        async def get_user(request):
+            return {"id": request.match_info["user_id"]}
+
+        async with serve([("GET", "users/{user_id}", get_user)]) as (server, client):
+            connector = client.connector
+            async with client.websocket_session() as session:
+                assert session.connector is connector
+                assert client.session.connector is connector
+                assert "Authorization" not in session.headers
+
+            # Closing the gateway session leaves the pool to REST requests
+            assert not connector.closed
+            assert (await client.request("GET", "users/1")).data == {"id": "1"}
+
+            # Logging in again keeps the pool, and its connections
+            await client.login()
+            assert client.connector is connector and not connector.closed
+
+        assert connector.closed and client.connector is None
+
+    asyncio.run(main())
+
+
+def test_prewarm_opens_connections_at_login():
+    async def main():
+        async with FakeDiscord() as server:
+            client = http.HTTPClient("token", connector_settings=http.ConnectorSettings(prewarm=3))
+            await client.login()
+            try:
+                assert server.requests == 3
+            finally:
+                await client.close()
+
+    asyncio.run(main())
+
+
+def test_prewarm_ignores_unreachable_hosts(monkeypatch):
+    async def main():
+        client = http.HTTPClient("token")
+        await client.login()
+        try:
+            # Nothing listens on port 1
+            monkeypatch.setattr(pycordia, "api_url", "http://127.0.0.1:1/api/v9")
+            await client.prewarm(2)
+            assert not client.connector.closed
+        finally:
+            await client.close()
+
+        with pytest.raises(errors.ClientSetupError):
+            await client.prewarm(1)
+
+    asyncio.run(main())
+
+
+def test_responses_are_decoded_by_content_type():
+    async def main():
+        async def get_json(request):
+            return {"id": "1"}
+
+        async def get_empty(request):
+            return None
+
+        async def get_text(request):
+            return web.Response(text="plain ünïcode", content_type="text/plain", charset="utf-8")
+
+        async def get_binary(request):
+            return web.Response(body=b"\xffbytes", content_type="application/octet-stream")
+
+        routes = [
+            ("GET", "json", get_json), ("DELETE", "empty", get_empty),
+            ("GET", "text", get_text), ("GET", "binary", get_binary)
+        ]
+        async with serve(routes, ratelimit_limit=5) as (server, client):
+            json_response = await client.request("GET", "json")
+            empty = await client.request("DELETE", "empty")
+            text = await client.request("GET", "text")
+            binary = await client.request("GET", "binary")
+
+        assert json_response.status == 200 and json_response.ok
+        assert json_response.data == {"id": "1"} and await json_response.json() == {"id": "1"}
+        assert json_response.limit == 5 and json_response.remaining == 4 and json_response.reset_after > 0
+
+        assert empty.status == 204 and empty.data is None
+        assert text.data == "plain ünïcode"
+        # Undecodable bytes are replaced rather than failing the request
+        assert binary.data == "�bytes"
+
+    asyncio.run(main())
+
+
+def test_json_bodies_are_decoded_with_json_loads():
+    async def main():
+        async def get_json(request):
+            return {"id": "1"}
+
+        decoded = []
+
+        def json_loads(raw):
+            decoded.append(raw)
+            return {"decoded": True}
+
+        async with serve([("GET", "json", get_json)]) as (server, client):
+            client.json_loads = json_loads
+            response = await client.request("GET", "json")
+
+        assert response.data == {"decoded": True}
+        assert len(decoded) == 1 and isinstance(decoded[0], bytes)
+
+    asyncio.run(main())
+
+
+def test_non_json_error_bodies_become_error_messages():
+    async def main():
+        async def get_error(request):
+            return web.Response(status=400, text="<html>Bad request</html>", content_type="text/html")
+
+        async with serve([("GET", "error", get_error)]) as (server, client):
+            with pytest.raises(errors.BadRequest) as error:
+                await client.request("GET", "error")
+
+        assert error.value.message == "<html>Bad request</html>"
+
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+import copy
+
+import pytest
+
+from pycordia import models, utils
+from pycordia.testing import message_payload
+
+
+def full_payload() -> dict:
+    payload = message_payload(1)
+    payload.update({
+        "member": {"roles": ["820000000000000001"], "joined_at": "2021-09-01T12:00:00.123000+00:00",
+                   "deaf": False, "mute": False},
+        "mentions": [{"id": "830000000000000005", "username": "user5", "discriminator": "0005", "avatar": None}],
+        "attachments": [{"id": "840000000000000000", "filename": "file.txt", "size": 12}],
+        "reactions": [{"count": 2, "me": False, "emoji": {"id": None, "name": "👍"}}],
+        "sticker_items": [{"id": "850000000000000000", "name": "sticker", "format_type": 1}],
+        "message_reference": {"message_id": "900000000000000000", "channel_id": "810000000000000000"},
+        "referenced_message": message_payload(0)
+    })
+    return payload
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_message_keeps_its_payload(lazy):
+    payload = full_payload()
+    message = models.Message(payload, lazy=lazy)
+
+    assert message.to_dict() == payload
+    assert message.content == "Message 1"
+    assert message.member.role_ids == [820000000000000001]
+
+
+def test_eager_message_can_be_updated():
+    message = models.Message(full_payload(), lazy=False)
+    after = message.updated({"id": "900000000000000001", "content": "Edited"}, lazy=False)
+
+    assert after.content == "Edited"
+    assert after.author is message.author
+    assert after.to_dict() == {**full_payload(), "content": "Edited"}
+
+    again = after.updated({"id": "900000000000000001", "pinned": True}, lazy=False)
+    assert again.content == "Edited" and again.pinned
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_full_update_shares_unchanged_attributes(lazy):
+    message = models.Message(full_payload(), lazy=lazy)
+    before = {field.name: getattr(message, field.name) for field in utils.lazy_attributes(models.Message)}
+
+    # A new payload, as decoded from the gateway, equal but for the content
+    after = message.updated({**copy.deepcopy(full_payload()), "content": "Edited"}, lazy=lazy)
+
+    assert after.content == "Edited"
+    for name, value in before.items():
+        if name != "content":
+            assert getattr(after, name) is value, name
@@ -0,0 +1,52 @@
+import asyncio
+
+from pycordia import metrics
+from tests.test_http import serve
+
+
+def test_route_template_replaces_ids_and_tokens():
+    assert metrics.route_template("get", "channels/810000000000000000/messages/810000000000000001?limit=5") \
+        == "GET channels/{channel_id}/messages/{id}"
+    assert metrics.route_template("POST", "webhooks/810000000000000000/d2ViaG9vaw?wait=true") \
+        == "POST webhooks/{webhook_id}/{token}"
+    assert metrics.route_template("PATCH", "webhooks/810000000000000000/d2ViaG9vaw/messages/@original") \
+        == "PATCH webhooks/{webhook_id}/{token}/messages/@original"
+
+
+def test_route_template_hides_interaction_tokens():
+    assert metrics.route_template("POST", "interactions/810000000000000000/aW50ZXJhY3Rpb24/callback") \
+        == "POST interactions/{id}/{token}/callback"
+
+
+def test_histogram_counts_values_in_buckets():
+    histogram = metrics.Histogram((1, 10, 100))
+    for value in (0.5, 5, 5, 50, 500):
+        histogram.observe(value)
+
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.count == 5 and histogram.min == 0.5 and histogram.max == 500
+    assert histogram.mean == sum((0.5, 5, 5, 50, 500)) / 5
+    assert histogram.percentile(50) == 10
+    assert histogram.percentile(100) == 500
+
+
+def test_requests_are_recorded_per_route():
+    async def main():
+        async def callback(request):
+            return None
+
+        sink = metrics.InMemoryMetrics()
+        async with serve([("POST", "interactions/{id}/{token}/callback", callback)]) as (server, client):
+            client.metrics = sink
+            for token in ("Zmlyc3Q", "c2Vjb25k"):
+                await client.request(
+                    "POST", f"interactions/810000000000000000/{token}/callback", payload_json={"type": 1}
+                )
+
+        route = "POST interactions/{id}/{token}/callback"
+        assert sink.routes() == [route]
+        assert sink.counter("http.requests", route) == 2
+        assert sink.counter("http.status.204", route) == 2
+        assert sink.histogram("http.latency", route).count == 2
+
+    asyncio.run(main())
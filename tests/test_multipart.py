@@ -0,0 +1,144 @@
+import asyncio
+import io
+import json
+import mmap
+
+import pytest
+
+from pycordia import http, models
+from tests.test_http import serve
+
+# Spans several chunks, with a partial last one
+DATA = bytes(range(256)) * (http.UPLOAD_CHUNK_SIZE * 2 // 256 + 3)
+
+
+class Writer:
+    def __init__(self):
+        self.chunks = []
+
+    async def write(self, chunk):
+        self.chunks.append(bytes(chunk))
+
+    @property
+    def data(self) -> bytes:
+        return b"".join(self.chunks)
+
+
+def write(body: http.MultipartBody) -> bytes:
+    writer = Writer()
+    asyncio.run(body.write(writer))
+    return writer.data
+
+
+def expected(payload, files) -> bytes:
+    body = (
+        b'--b\r\nContent-Disposition: form-data; name="payload_json"\r\n'
+        b'Content-Type: application/json\r\n\r\n' + json.dumps(payload, separators=(",", ":")).encode() + b"\r\n"
+    )
+    for i, (filename, data) in enumerate(files):
+        body += (
+            f'--b\r\nContent-Disposition: form-data; name="files[{i}]"; filename="{filename}"\r\n'
+            'Content-Type: application/octet-stream\r\n\r\n'
+        ).encode() + data + b"\r\n"
+    return body + b"--b--\r\n"
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(DATA)
+    return path
+
+
+@pytest.mark.parametrize("source", ["bytes", "memoryview", "file", "path", "str", "mmap"])
+def test_attachment_sources_send_the_same_body(source, path):
+    with open(path, "rb") as fp:
+        fp = {
+            "bytes": lambda: DATA,
+            "memoryview": lambda: memoryview(DATA),
+            "file": lambda: fp,
+            "path": lambda: path,
+            "str": lambda: str(path),
+            "mmap": lambda: mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ),
+        }[source]()
+
+        body = http.MultipartBody({"content": "Backup"}, [models.File(filename="data.bin", fp=fp)], "b")
+        data = write(body)
+
+    assert data == expected({"content": "Backup"}, [("data.bin", DATA)])
+    assert body.size == len(data)
+
+
+def test_body_can_be_written_again():
+    fp = io.BytesIO(DATA)
+    body = http.MultipartBody({}, [models.File(filename="a.bin", fp=fp), models.File(filename="b", fp=b"b")], "b")
+
+    assert write(body) == write(body) == expected({}, [("a.bin", DATA), ("b", b"b")])
+
+
+def test_file_objects_are_sent_from_their_position():
+    fp = io.BytesIO(b"header" + DATA)
+    fp.seek(6)
+    body = http.MultipartBody({}, [models.File(filename="data.bin", fp=fp)], "b")
+
+    assert write(body) == expected({}, [("data.bin", DATA)])
+    assert body.size == len(expected({}, [("data.bin", DATA)]))
+
+
+def test_unseekable_files_have_no_size():
+    class Stream(io.RawIOBase):
+        def __init__(self):
+            self.data = io.BytesIO(DATA)
+
+        def readable(self):
+            return True
+
+        def read(self, size=-1):
+            return self.data.read(size)
+
+    body = http.MultipartBody({}, [models.File(filename="data.bin", fp=Stream())], "b")
+
+    assert body.size is None
+    assert write(body) == expected({}, [("data.bin", DATA)])
+
+
+def test_quotes_in_filenames_are_escaped():
+    body = http.MultipartBody({}, [models.File(filename='a"b.txt', fp=b"")], "b")
+
+    assert b'filename="a%22b.txt"' in write(body)
+
+
+def test_decoding_a_body_fails():
+    with pytest.raises(TypeError):
+        http.MultipartBody({}, [], "b").decode()
+
+
+def test_attachments_are_uploaded(path):
+    async def main():
+        received = {}
+
+        async def create_message(request):
+            async for part in await request.multipart():
+                # The server has no body size limit, which `part.read` takes as a limit of 0
+                data = bytearray()
+                while True:
+                    chunk = await part.read_chunk()
+                    if not chunk:
+                        break
+                    data += chunk
+                received[part.name] = (part.filename, bytes(data))
+            return {"id": "1"}
+
+        async with serve([("POST", "channels/{channel_id}/messages", create_message)]) as (server, client):
+            with open(path, "rb") as fp:
+                await client.request(
+                    "POST", "channels/810000000000000000/messages",
+                    payload_json={"content": "Backup"},
+                    files=[models.File(filename="a.bin", fp=fp), models.File(filename="b.bin", fp=path)]
+                )
+
+        assert json.loads(received["payload_json"][1]) == {"content": "Backup"}
+        assert received["files[0]"] == ("a.bin", DATA)
+        assert received["files[1]"] == ("b.bin", DATA)
+
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+from pycordia import models, state
+from pycordia.permissions import PermissionEngine, Permissions
+
+
+GUILD_ID = "810000000000000000"
+CHANNEL_ID = "810000000000000001"
+ROLE_ID = "810000000000000003"
+USER_ID = "810000000000000002"
+OWNER_ID = "810000000000000009"
+
+
+def member_payload(roles=()) -> dict:
+    return {
+        "user": {"id": USER_ID, "username": "user", "discriminator": "0001", "avatar": None},
+        "roles": list(roles), "joined_at": "2021-09-01T12:00:00+00:00", "deaf": False, "mute": False
+    }
+
+
+def make_engine(overwrites=()) -> PermissionEngine:
+    store = state.StateStore()
+    store.parse_event("GUILD_CREATE", {
+        "id": GUILD_ID, "name": "Guild", "owner_id": OWNER_ID, "afk_timeout": 300,
+        "verification_level": 0, "default_message_notifications": 0, "explicit_content_filter": 0,
+        "emojis": [], "features": [], "mfa_level": 0, "premium_tier": 0,
+        "preferred_locale": "en-US", "nsfw_level": 0,
+        "roles": [
+            {"id": GUILD_ID, "name": "@everyone", "permissions": str(int(Permissions.view_channel))},
+            {"id": ROLE_ID, "name": "Mods", "permissions": str(int(Permissions.manage_messages))}
+        ],
+        "channels": [{"id": CHANNEL_ID, "type": 0, "permission_overwrites": list(overwrites)}],
+        "members": [member_payload()]
+    })
+    return PermissionEngine(store)
+
+
+def test_compute_applies_roles():
+    engine = make_engine()
+
+    assert engine.compute(GUILD_ID, USER_ID) == Permissions.view_channel
+    assert engine.compute(GUILD_ID, models.Member(member_payload([ROLE_ID]))) == \
+        Permissions.view_channel | Permissions.manage_messages
+
+
+def test_compute_applies_channel_overwrites():
+    engine = make_engine([
+        {"id": USER_ID, "type": 1, "allow": "0", "deny": str(int(Permissions.view_channel))}
+    ])
+
+    assert engine.compute(GUILD_ID, USER_ID) == Permissions.view_channel
+    assert engine.compute(GUILD_ID, USER_ID, CHANNEL_ID) == 0
+    assert not engine.has(GUILD_ID, USER_ID, Permissions.view_channel, CHANNEL_ID)
+
+
+def test_member_objects_are_not_memoized():
+    engine = make_engine()
+    assert engine.compute(GUILD_ID, USER_ID) == Permissions.view_channel
+
+    # A member with roles the stored member does not have yet
+    member = models.Member(member_payload([ROLE_ID]))
+    assert engine.compute(GUILD_ID, member) & Permissions.manage_messages
+
+    # ...does not change the result memoized for the stored member, nor the other way around
+    assert engine.compute(GUILD_ID, USER_ID) == Permissions.view_channel
+    assert engine.compute(GUILD_ID, member) & Permissions.manage_messages
+
+
+def test_role_update_invalidates_results():
+    engine = make_engine()
+    assert engine.compute(GUILD_ID, USER_ID) == Permissions.view_channel
+
+    data = {"guild_id": GUILD_ID, "role": {"id": GUILD_ID, "name": "@everyone", "permissions": "0"}}
+    engine.state.parse_event("GUILD_ROLE_UPDATE", data)
+    engine.parse_event("GUILD_ROLE_UPDATE", data)
+
+    assert engine.compute(GUILD_ID, USER_ID) == 0
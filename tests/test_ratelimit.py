@@ -0,0 +1,163 @@
+import asyncio
+
+from pycordia import ratelimit
+from tests.test_http import serve
+
+
+def test_route_key_keeps_major_parameters_only():
+    assert ratelimit.route_key("get", "channels/810000000000000000/messages/810000000000000001") \
+        == "GET channels/810000000000000000/messages/{id}"
+    assert ratelimit.route_key("PUT", "channels/810000000000000000/messages/810000000000000001/reactions/%F0%9F%91%8D/@me") \
+        == "PUT channels/810000000000000000/messages/{id}/reactions/{emoji}/@me"
+
+
+def test_route_key_hides_interaction_tokens():
+    first = ratelimit.route_key("POST", "interactions/810000000000000000/aW50ZXJhY3Rpb24/callback")
+    second = ratelimit.route_key("POST", "interactions/810000000000000001/c2Vjb25k/callback")
+
+    assert first == second == "POST interactions/{id}/{token}/callback"
+
+
+def test_unknown_bucket_sends_one_request_until_its_headers_arrive():
+    async def main():
+        bucket = ratelimit.Bucket("GET users/{id}")
+        await bucket.acquire()
+        assert bucket.waiting_for_response
+
+        waiting = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+
+        bucket.update({"X-RateLimit-Limit": "5", "X-RateLimit-Remaining": "4", "X-RateLimit-Reset-After": "1"})
+        await asyncio.wait_for(waiting, 1)
+        assert bucket.remaining == 3 and bucket.inflight == 1
+
+    asyncio.run(main())
+
+
+def test_failed_request_to_unknown_bucket_lets_the_next_one_probe():
+    async def main():
+        bucket = ratelimit.Bucket("GET users/{id}")
+        await bucket.acquire()
+        waiting = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0.01)
+
+        bucket.release()
+        await asyncio.wait_for(waiting, 1)
+        assert bucket.waiting_for_response and bucket.inflight == 1
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_does_not_let_other_requests_through():
+    async def main():
+        bucket = ratelimit.Bucket("GET users/{id}")
+        await bucket.acquire()
+        first = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+
+        second = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0.01)
+        assert not second.done()
+
+        bucket.update({})
+        await asyncio.wait_for(second, 1)
+
+    asyncio.run(main())
+
+
+def test_concurrent_requests_to_a_new_route_are_not_rate_limited():
+    async def main():
+        async def create_message(request):
+            return {"id": "1"}
+
+        async with serve(
+            [("POST", "channels/{channel_id}/messages", create_message)],
+            ratelimit_limit=2, ratelimit_reset_after=0.1
+        ) as (server, client):
+            await asyncio.gather(*(
+                client.request("POST", "channels/810000000000000000/messages", payload_json={"content": str(i)})
+                for i in range(6)
+            ))
+
+        assert server.requests == 6
+        assert server.rate_limited == 0
+
+    asyncio.run(main())
+
+
+def test_responses_do_not_count_requests_still_in_flight():
+    async def main():
+        bucket = ratelimit.Bucket("GET users/{id}")
+        await bucket.acquire()
+        bucket.update({"X-RateLimit-Limit": "3", "X-RateLimit-Remaining": "2", "X-RateLimit-Reset-After": "1"})
+        await bucket.acquire()
+        await bucket.acquire()
+
+        # Sent before the two requests in flight were counted by Discord
+        bucket.update({"X-RateLimit-Limit": "3", "X-RateLimit-Remaining": "1", "X-RateLimit-Reset-After": "1"})
+        assert bucket.remaining == 0
+
+    asyncio.run(main())
+
+
+def test_window_reset_waits_for_the_new_window_before_refilling_again():
+    async def main():
+        bucket = ratelimit.Bucket("GET users/{id}")
+        await bucket.acquire()
+        bucket.update({"X-RateLimit-Limit": "2", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.01"})
+        await asyncio.sleep(0.02)
+
+        await bucket.acquire()
+        await bucket.acquire()
+        third = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0.02)
+        assert not third.done()
+
+        bucket.update({"X-RateLimit-Limit": "2", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.01"})
+        await asyncio.wait_for(third, 1)
+
+    asyncio.run(main())
+
+
+def test_routes_sharing_a_bucket_hash_share_limits():
+    limiter = ratelimit.RateLimiter()
+    headers = {"X-RateLimit-Bucket": "abcd", "X-RateLimit-Limit": "5", "X-RateLimit-Remaining": "4"}
+
+    first = limiter.get_bucket("GET", "channels/810000000000000000/messages/810000000000000001")
+    limiter.update("GET", "channels/810000000000000000/messages/810000000000000001", first, headers)
+    second = limiter.get_bucket("PATCH", "channels/810000000000000000/messages/810000000000000001")
+    limiter.update("PATCH", "channels/810000000000000000/messages/810000000000000001", second, headers)
+
+    assert limiter.get_bucket("PATCH", "channels/810000000000000000/messages/810000000000000002") is first
+    assert first.key == "abcd:810000000000000000"
+    assert second.inflight == 0 and first.remaining == 4
+
+
+def test_idle_buckets_are_forgotten():
+    async def main():
+        limiter = ratelimit.RateLimiter(idle_timeout=0.05)
+        headers = {"X-RateLimit-Bucket": "abcd", "X-RateLimit-Limit": "5", "X-RateLimit-Remaining": "4",
+            "X-RateLimit-Reset-After": "0.01"}
+
+        idle = await limiter.acquire("GET", "channels/810000000000000000/messages")
+        limiter.update("GET", "channels/810000000000000000/messages", idle, headers)
+        busy = await limiter.acquire("GET", "channels/810000000000000001/messages")
+        exhausted = limiter.get_bucket("GET", "guilds/810000000000000000")
+        exhausted.exhaust(10)
+
+        await asyncio.sleep(0.06)
+        limiter.get_bucket("GET", "users/@me")
+
+        # Buckets with requests in flight or still exhausted are kept
+        assert set(limiter.buckets) == {
+            "GET channels/810000000000000001/messages", "GET guilds/810000000000000000", "GET users/@me"
+        }
+        # Its route's hash is forgotten too, and learned again from the next response
+        assert limiter.get_bucket("GET", "channels/810000000000000000/messages").key \
+            == "GET channels/810000000000000000/messages"
+        assert limiter.get_bucket("GET", "channels/810000000000000001/messages") is busy
+
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from pycordia import errors, http, retry
+from tests.test_http import serve
+
+ENDPOINT = "channels/810000000000000000/messages/810000000000000001"
+
+
+def failing(*statuses: int):
+    """A handler answering with `statuses` in turn, then with the last one"""
+    calls = []
+
+    async def handler(request):
+        status = statuses[min(len(calls), len(statuses) - 1)]
+        calls.append(request.method)
+        if status >= 300:
+            return web.json_response({"message": "Failure", "code": 0}, status=status)
+        return {"id": "1"}
+
+    return handler, calls
+
+
+def fast_policy(**kwargs) -> retry.RetryPolicy:
+    return retry.RetryPolicy(base_delay=0.001, **kwargs)
+
+
+def test_idempotent_methods_and_enforced_nonces_are_retryable():
+    policy = retry.RetryPolicy()
+
+    assert policy.is_retryable("get") and policy.is_retryable("DELETE")
+    assert not policy.is_retryable("POST", {"content": "Hi"})
+    assert not policy.is_retryable("POST", {"content": "Hi", "nonce": "1"})
+    assert policy.is_retryable("POST", {"content": "Hi", "nonce": "1", "enforce_nonce": True})
+    assert policy.is_retryable("POST", b'{"content":"Hi","nonce":"1","enforce_nonce":true}')
+    assert not policy.is_retryable("POST", b'{"content":"Hi"}')
+
+
+def test_retries_are_limited_by_count_and_budget():
+    policy = retry.RetryPolicy(max_retries=2, base_delay=1.0, budget_max=3.0)
+
+    assert 0 <= policy.next_delay(0) <= 1.0
+    assert 0 <= policy.next_delay(1) <= 2.0
+    assert policy.next_delay(2) is None
+    assert policy.next_delay(0) is not None
+    assert policy.next_delay(0) is None
+    assert policy.stats.retries == 3
+    assert policy.stats.exhausted == 2 and policy.stats.budget_denied == 1
+
+    for _ in range(10):
+        policy.record_request()
+    assert policy.budget == pytest.approx(1.0)
+
+
+def test_default_policy_is_created():
+    assert isinstance(http.HTTPClient("token").retry_policy, retry.RetryPolicy)
+
+
+def test_server_errors_are_retried():
+    async def main():
+        handler, calls = failing(503, 200)
+        async with serve([("GET", ENDPOINT, handler)]) as (server, client):
+            client.retry_policy = fast_policy()
+            response = await client.request("GET", ENDPOINT)
+
+        assert response.data == {"id": "1"}
+        assert len(calls) == 2
+        assert client.retry_policy.stats.recovered == 1
+
+    asyncio.run(main())
+
+
+def test_none_disables_retries():
+    async def main():
+        handler, calls = failing(503, 200)
+        async with serve([("GET", ENDPOINT, handler)]) as (server, client):
+            client.retry_policy = None
+            with pytest.raises(errors.HTTPError):
+                await client.request("GET", ENDPOINT)
+
+        assert len(calls) == 1
+        assert http.HTTPClient("token", retry_policy=None).retry_policy is None
+
+    asyncio.run(main())
+
+
+def test_sends_without_enforced_nonce_are_not_retried():
+    async def main():
+        handler, calls = failing(503, 503, 200)
+        async with serve([("POST", "channels/810000000000000000/messages", handler)]) as (server, client):
+            client.retry_policy = fast_policy()
+            with pytest.raises(errors.HTTPError):
+                await client.request(
+                    "POST", "channels/810000000000000000/messages", payload_json={"content": "Hi"}
+                )
+            await client.request("POST", "channels/810000000000000000/messages", payload_json={
+                "content": "Hi", "nonce": "1", "enforce_nonce": True
+            })
+
+        assert len(calls) == 3
+
+    asyncio.run(main())
+
+
+def test_retried_delete_answered_with_not_found_succeeds():
+    async def main():
+        handler, calls = failing(503, 404)
+        async with serve([("DELETE", ENDPOINT, handler)]) as (server, client):
+            client.retry_policy = fast_policy()
+            response = await client.request("DELETE", ENDPOINT)
+
+        assert response.status == 404
+        assert calls == ["DELETE", "DELETE"]
+
+    asyncio.run(main())
+
+
+def test_delete_answered_with_not_found_fails_without_retries():
+    async def main():
+        handler, calls = failing(404)
+        async with serve([("DELETE", ENDPOINT, handler)]) as (server, client):
+            with pytest.raises(errors.HTTPError):
+                await client.request("DELETE", ENDPOINT)
+
+        assert len(calls) == 1
+
+    asyncio.run(main())
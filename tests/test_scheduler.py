@@ -0,0 +1,247 @@
+import asyncio
+import time
+
+import pytest
+
+import pycordia
+from pycordia import errors, ratelimit, scheduler
+
+HEADERS = {"X-RateLimit-Limit": "5", "X-RateLimit-Remaining": "4", "X-RateLimit-Reset-After": "1"}
+
+
+def request(limiter: ratelimit.RateLimiter, log: list, method: str, endpoint: str,
+    duration: float = 0.02, headers: dict = HEADERS
+):
+    async def run():
+        bucket = await limiter.acquire(method, endpoint)
+        log.append(("start", endpoint))
+        await asyncio.sleep(duration)
+        limiter.update(method, endpoint, bucket, headers)
+        log.append(("end", endpoint))
+        return endpoint
+    return run
+
+
+def test_interaction_requests_go_first():
+    async def main():
+        limiter, log = ratelimit.RateLimiter(), []
+        queue = scheduler.RequestScheduler(limiter, max_concurrency=1, reserved=0)
+
+        first = asyncio.ensure_future(queue.submit("POST", "users/@me/channels", request(limiter, log, "POST", "users/@me/channels")))
+        await asyncio.sleep(0)
+        await asyncio.gather(
+            queue.submit("GET", "users/@me", request(limiter, log, "GET", "users/@me")),
+            queue.submit("POST", "interactions/810000000000000000/token/callback",
+                request(limiter, log, "POST", "interactions/810000000000000000/token/callback")),
+            first
+        )
+
+        starts = [endpoint for event, endpoint in log if event == "start"]
+        assert starts == ["users/@me/channels", "interactions/810000000000000000/token/callback", "users/@me"]
+
+    asyncio.run(main())
+
+
+def test_queues_of_a_class_take_turns():
+    async def main():
+        limiter, log = ratelimit.RateLimiter(), []
+        queue = scheduler.RequestScheduler(limiter, max_concurrency=1, reserved=0)
+
+        # Holds the only slot while the others are queued
+        endpoints = ["users/@me"] + ["guilds/810000000000000000/roles"] * 3 + ["guilds/810000000000000001/roles"]
+        await asyncio.gather(*(
+            queue.submit("GET", endpoint, request(limiter, log, "GET", endpoint, 0.0))
+            for endpoint in endpoints
+        ))
+
+        starts = [endpoint for event, endpoint in log if event == "start"]
+        assert starts[1:4] == [
+            "guilds/810000000000000000/roles", "guilds/810000000000000001/roles", "guilds/810000000000000000/roles"
+        ]
+
+    asyncio.run(main())
+
+
+def test_requests_waiting_for_their_bucket_do_not_take_slots():
+    async def main():
+        limiter, log = ratelimit.RateLimiter(), []
+        queue = scheduler.RequestScheduler(limiter, max_concurrency=2, reserved=0)
+
+        busy = "channels/810000000000000000/messages"
+        other = "channels/810000000000000001/messages"
+        # The busy bucket is unknown, so only its first request is sent until it gets a response
+        await asyncio.gather(
+            *(queue.submit("POST", busy, request(limiter, log, "POST", busy)) for _ in range(3)),
+            queue.submit("POST", other, request(limiter, log, "POST", other))
+        )
+
+        assert log[:2] == [("start", busy), ("start", other)]
+
+    asyncio.run(main())
+
+
+def test_bucket_is_not_overcommitted_at_dispatch():
+    async def main():
+        limiter, log = ratelimit.RateLimiter(), []
+        queue = scheduler.RequestScheduler(limiter, max_concurrency=8, reserved=0)
+        endpoint = "channels/810000000000000000/messages"
+        headers = {"X-RateLimit-Limit": "2", "X-RateLimit-Remaining": "1", "X-RateLimit-Reset-After": "0.05"}
+
+        async def watch():
+            peak = 0
+            while len(log) < 8:
+                peak = max(peak, queue.running)
+                await asyncio.sleep(0.001)
+            return peak
+
+        watcher = asyncio.ensure_future(watch())
+        await asyncio.gather(*(
+            queue.submit("POST", endpoint, request(limiter, log, "POST", endpoint, 0.01, headers))
+            for _ in range(4)
+        ))
+
+        assert await watcher <= 2
+
+    asyncio.run(main())
+
+
+def test_requests_expire_behind_an_exhausted_bucket():
+    async def main():
+        limiter = ratelimit.RateLimiter()
+        endpoint = "channels/810000000000000000/messages"
+        bucket = limiter.get_bucket("POST", endpoint)
+        bucket.update({"X-RateLimit-Limit": "1", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "10"})
+
+        queue = scheduler.RequestScheduler(limiter)
+        jobs = [
+            asyncio.ensure_future(queue.submit("POST", endpoint, request(limiter, [], "POST", endpoint), deadline=deadline))
+            for deadline in (0.2, 0.05)
+        ]
+
+        started = time.monotonic()
+        with pytest.raises(errors.DeadlineExceeded):
+            await asyncio.wait_for(jobs[1], 1)
+        assert time.monotonic() - started < 0.15
+        assert not jobs[0].done()
+        assert queue.expired == 1 and queue.pending == 1
+
+        with pytest.raises(errors.DeadlineExceeded):
+            await asyncio.wait_for(jobs[0], 1)
+        assert queue.expired == 2 and queue.pending == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_callers_are_not_sent():
+    async def main():
+        limiter, log = ratelimit.RateLimiter(), []
+        queue = scheduler.RequestScheduler(limiter, max_concurrency=1, reserved=0)
+
+        first = asyncio.ensure_future(queue.submit("GET", "users/@me", request(limiter, log, "GET", "users/@me")))
+        second = asyncio.ensure_future(queue.submit("GET", "gateway", request(limiter, log, "GET", "gateway")))
+        await asyncio.sleep(0)
+        second.cancel()
+        await first
+
+        assert ("start", "gateway") not in log
+        assert queue.pending == 0 and queue.running == 0
+
+    asyncio.run(main())
+
+
+def test_channels_are_queued_with_their_guild_when_known():
+    guilds = {"810000000000000001": "820000000000000000"}
+
+    assert scheduler.fairness_key("channels/810000000000000001/messages", guilds.get) == "guilds/820000000000000000"
+    assert scheduler.fairness_key("channels/810000000000000002/messages", guilds.get) == "channels/810000000000000002"
+    assert scheduler.fairness_key("channels/810000000000000001/messages") == "channels/810000000000000001"
+    assert scheduler.fairness_key("webhooks/810000000000000001/token", guilds.get) == "webhooks/810000000000000001"
+
+
+def test_client_resolves_channel_guilds_from_its_state():
+    client = pycordia.Client(intents=0)
+    client.state.parse_event("CHANNEL_CREATE", {
+        "id": "810000000000000001", "type": 0, "guild_id": "820000000000000000", "name": "general"
+    })
+
+    assert scheduler.fairness_key("channels/810000000000000001/messages", client.http.scheduler.resolve_guild) \
+        == "guilds/820000000000000000"
+
+
+def test_sleeping_requests_give_up_their_slot():
+    async def main():
+        limiter, log = ratelimit.RateLimiter(), []
+        queue = scheduler.RequestScheduler(limiter, max_concurrency=1, reserved=0)
+
+        async def retried():
+            log.append("retried sent")
+            await queue.sleep(0.05)
+            log.append("retried sent again")
+
+        other = request(limiter, log, "GET", "users/@me", 0.0)
+        first = asyncio.ensure_future(queue.submit("GET", "gateway", retried))
+        await asyncio.sleep(0)
+        await asyncio.gather(first, queue.submit("GET", "users/@me", other))
+
+        assert log == ["retried sent", ("start", "users/@me"), ("end", "users/@me"), "retried sent again"]
+        assert queue.running == 0 and queue.pending == 0
+
+    asyncio.run(main())
+
+
+def test_woken_requests_go_before_their_queue():
+    async def main():
+        limiter, log = ratelimit.RateLimiter(), []
+        queue = scheduler.RequestScheduler(limiter, max_concurrency=1, reserved=0)
+        endpoint = "guilds/810000000000000000/roles"
+
+        async def retried():
+            await queue.sleep(0)
+            log.append("retried")
+
+        async def blocker():
+            await asyncio.sleep(0.02)
+            log.append("blocker")
+
+        await asyncio.gather(
+            queue.submit("GET", endpoint, retried),
+            queue.submit("GET", endpoint, blocker),
+            queue.submit("GET", endpoint, request(limiter, log, "GET", endpoint, 0.0))
+        )
+
+        assert log[:2] == ["blocker", "retried"]
+
+    asyncio.run(main())
+
+
+def test_requests_cancelled_while_sleeping_keep_counts_balanced():
+    async def main():
+        limiter = ratelimit.RateLimiter()
+        queue = scheduler.RequestScheduler(limiter, max_concurrency=1, reserved=0)
+
+        async def retried():
+            await queue.sleep(10)
+
+        job = asyncio.ensure_future(queue.submit("GET", "gateway", retried))
+        await asyncio.sleep(0.01)
+        assert queue.running == 0
+        for task in asyncio.all_tasks():
+            if task is not asyncio.current_task() and task is not job:
+                task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await job
+        assert queue.running == 0 and queue.pending == 0
+        assert await queue.submit("GET", "users/@me", request(limiter, [], "GET", "users/@me", 0.0)) == "users/@me"
+
+    asyncio.run(main())
+
+
+def test_sleeping_outside_the_scheduler_just_sleeps():
+    async def main():
+        queue = scheduler.RequestScheduler(ratelimit.RateLimiter())
+        started = time.monotonic()
+        await queue.sleep(0.01)
+        assert time.monotonic() - started >= 0.01
+
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+import asyncio
+import struct
+
+import pytest
+
+import pycordia
+from pycordia import cache, snapshot
+from pycordia.testing import message_payload
+
+
+def test_snapshot_round_trips_entries(tmp_path):
+    path = str(tmp_path / "entries.snapshot")
+    source = cache.LRUCache(10)
+    for key in (30, 10, 20):
+        source[key] = {"value": key}
+    snapshot.save(path, source)
+
+    saved = snapshot.Snapshot(path)
+    try:
+        assert len(saved) == 3
+        assert list(saved) == [10, 20, 30]
+        assert saved.get("20") == {"value": 20}
+        assert saved.get(40) is None
+        assert 30 in saved and 40 not in saved
+    finally:
+        saved.close()
+
+
+def test_snapshot_keys_are_little_endian(tmp_path):
+    path = str(tmp_path / "entries.snapshot")
+    source = cache.LRUCache(10)
+    source[0x0102030405060708] = 1
+    snapshot.save(path, source)
+
+    with open(path, "rb") as fp:
+        data = fp.read()
+    assert struct.unpack_from("<Q", data, snapshot.Snapshot._header.size)[0] == 0x0102030405060708
+
+
+def test_snapshot_open_rejects_invalid_and_stale_files(tmp_path):
+    invalid = tmp_path / "invalid.snapshot"
+    invalid.write_bytes(b"not a snapshot at all, not even close")
+    assert snapshot.Snapshot.open(str(invalid)) is None
+    assert snapshot.Snapshot.open(str(tmp_path / "missing.snapshot")) is None
+
+    path = str(tmp_path / "entries.snapshot")
+    snapshot.save(path, cache.LRUCache(1))
+    assert snapshot.Snapshot.open(path, max_age=-1) is None
+
+
+def test_snapshot_open_rejects_truncated_files(tmp_path):
+    path = tmp_path / "entries.snapshot"
+    source = cache.LRUCache(10)
+    for key in range(1, 4):
+        source[key] = {"value": key}
+    snapshot.save(str(path), source)
+    data = path.read_bytes()
+
+    # Cut in the middle of the keys, of the offsets and of the data
+    for size in (snapshot.Snapshot._header.size + 4, snapshot.Snapshot._header.size + 28, len(data) - 1):
+        path.write_bytes(data[:size])
+        with pytest.raises(ValueError):
+            snapshot.Snapshot(str(path))
+        assert snapshot.Snapshot.open(str(path)) is None
+
+
+def test_restore_caches_closes_previous_snapshots(tmp_path):
+    client = pycordia.Client(intents=0)
+    client.user_cache[1] = pycordia.models.User({
+        "id": "1", "username": "user", "discriminator": "0001", "avatar": None
+    })
+    client.save_caches(str(tmp_path))
+
+    client.restore_caches(str(tmp_path))
+    first = client.user_cache.fallback
+    client.restore_caches(str(tmp_path))
+
+    assert first._map.closed
+    assert client.user_cache.fallback is not first
+    assert client.user_cache.fallback.get(1).username == "user"
+    client.user_cache.fallback.close()
+
+
+def test_deleted_messages_are_not_restored_from_snapshots(tmp_path):
+    client = pycordia.Client(intents=0)
+    for index in (1, 2):
+        client.message_cache[900000000000000000 + index] = pycordia.models.Message(message_payload(index))
+    client.save_caches(str(tmp_path))
+
+    client = pycordia.Client(intents=0)
+    client.restore_caches(str(tmp_path))
+    asyncio.run(client.call_event_handler("MESSAGE_DELETE", {
+        "id": "900000000000000001", "channel_id": "810000000000000000"
+    }))
+
+    assert client.message_cache.get(900000000000000001) is None
+    assert client.message_cache.get(900000000000000002).content == "Message 2"
+    client.message_cache.fallback.close()
@@ -0,0 +1,61 @@
+import datetime
+
+from pycordia import utils
+from pycordia.models.message import Attachment
+
+
+ID = 175928847299117063
+
+
+def test_snowflake_behaves_like_an_int():
+    flake = utils.snowflake(str(ID))
+
+    assert isinstance(flake, utils.Snowflake)
+    assert flake == ID and hash(flake) == hash(ID)
+    assert str(flake) == f"{flake}" == str(ID)
+    assert {flake: 1}[ID] == 1
+
+
+def test_snowflake_does_not_equal_strings():
+    flake = utils.snowflake(ID)
+
+    assert flake != str(ID)
+    assert not flake == str(ID)
+    # Equal objects must hash the same, so a string key is a different key
+    assert len({flake, str(ID)}) == 2
+
+
+def test_snowflake_timestamps():
+    flake = utils.Snowflake(ID)
+
+    assert flake.timestamp == 1462015105796
+    assert flake.created_at == datetime.datetime(2016, 4, 30, 11, 18, 25, 796000, tzinfo=datetime.timezone.utc)
+    assert utils.Snowflake.from_timestamp(flake.timestamp) <= flake
+    assert utils.Snowflake.from_timestamp(flake.timestamp + 1) > flake
+
+
+def test_snowflake_shares_instances_between_forms():
+    assert utils.snowflake(str(ID)) is utils.snowflake(ID)
+    assert utils.snowflake(None) is None
+
+
+def test_snowflake_table_drops_least_recently_used(monkeypatch):
+    monkeypatch.setattr(utils, "SNOWFLAKE_TABLE_SIZE", 4)
+    monkeypatch.setattr(utils, "_snowflakes", type(utils._snowflakes)())
+
+    first = utils.snowflake(1)
+    utils.snowflake(2)
+    utils.snowflake(1)
+    utils.snowflake(3)
+    utils.snowflake(4)
+    utils.snowflake(5)
+
+    assert len(utils._snowflakes) == 4
+    assert utils.snowflake(1) is first
+    assert 2 not in utils._snowflakes
+
+
+def test_to_dict_outputs_snowflakes_as_strings():
+    attachment = Attachment({"id": str(ID), "filename": "file.txt"})
+
+    assert attachment.to_dict()["id"] == str(ID)
@@ -0,0 +1,178 @@
+from pycordia import cache, models, state, utils
+
+
+GUILD_ID = "810000000000000000"
+CHANNEL_ID = "810000000000000001"
+USER_ID = "810000000000000002"
+
+
+def guild_payload(**fields) -> dict:
+    return {
+        "id": GUILD_ID, "name": "Guild", "owner_id": USER_ID, "afk_timeout": 300,
+        "verification_level": 0, "default_message_notifications": 0,
+        "explicit_content_filter": 0, "roles": [], "emojis": [], "features": [],
+        "mfa_level": 0, "premium_tier": 0, "preferred_locale": "en-US", "nsfw_level": 0,
+        **fields
+    }
+
+
+def member_payload(user_id: str = USER_ID, **fields) -> dict:
+    return {
+        "user": {"id": user_id, "username": "user", "discriminator": "0001", "avatar": None},
+        "roles": [], "joined_at": "2021-09-01T12:00:00.123456+00:00", "deaf": False, "mute": False,
+        **fields
+    }
+
+
+def channel_payload(**fields) -> dict:
+    return {"id": CHANNEL_ID, "type": 0, "guild_id": GUILD_ID, "name": "general", **fields}
+
+
+def test_guild_create_stores_channels_roles_and_members():
+    store = state.StateStore()
+    store.parse_event("GUILD_CREATE", guild_payload(
+        roles=[{"id": GUILD_ID, "name": "@everyone", "permissions": "0"}],
+        channels=[{"id": CHANNEL_ID, "type": 0, "name": "general"}],
+        members=[member_payload()]
+    ))
+
+    assert store.get_guild(GUILD_ID).name == "Guild"
+    assert store.get_channel(CHANNEL_ID).guild_id == int(GUILD_ID)
+    assert [channel.id for channel in store.guild_channels(GUILD_ID)] == [int(CHANNEL_ID)]
+    assert [role.role_id for role in store.guild_roles(GUILD_ID)] == [int(GUILD_ID)]
+    assert store.get_member(GUILD_ID, USER_ID).user.username == "user"
+
+
+def test_guild_update_keeps_members_and_channels_and_drops_removed_roles():
+    store = state.StateStore()
+    store.parse_event("GUILD_CREATE", guild_payload(
+        roles=[{"id": GUILD_ID, "name": "@everyone"}, {"id": "810000000000000003", "name": "Old"}],
+        channels=[{"id": CHANNEL_ID, "type": 0, "name": "general"}],
+        members=[member_payload()]
+    ))
+    store.parse_event("GUILD_UPDATE", guild_payload(
+        name="Renamed", roles=[{"id": GUILD_ID, "name": "@everyone"}]
+    ))
+
+    guild = store.get_guild(GUILD_ID)
+    assert guild.name == "Renamed"
+    assert len(guild.members) == 1 and len(guild.channels) == 1
+    assert store.get_role("810000000000000003") is None
+    assert [role.role_id for role in store.guild_roles(GUILD_ID)] == [int(GUILD_ID)]
+
+
+def test_member_update_keeps_voice_state():
+    store = state.StateStore()
+    store.parse_event("GUILD_MEMBER_ADD", {"guild_id": GUILD_ID, **member_payload(deaf=True)})
+
+    update = member_payload(nick="nick")
+    del update["deaf"], update["mute"]
+    store.parse_event("GUILD_MEMBER_UPDATE", {"guild_id": GUILD_ID, **update})
+
+    member = store.get_member(GUILD_ID, USER_ID)
+    assert member.nick == "nick"
+    assert member.deaf is True and member.mute is False
+
+
+def test_channel_update_replaces_changed_fields():
+    store = state.StateStore()
+    store.parse_event("CHANNEL_CREATE", channel_payload(topic="Old"))
+    store.parse_event("CHANNEL_UPDATE", channel_payload(topic="New"))
+
+    channel = store.get_channel(CHANNEL_ID)
+    assert channel.topic == "New"
+    assert channel.name == "general"
+
+
+def test_guild_delete_removes_everything_of_the_guild():
+    store = state.StateStore()
+    store.parse_event("GUILD_CREATE", guild_payload(
+        channels=[{"id": CHANNEL_ID, "type": 0}], members=[member_payload()]
+    ))
+    store.parse_event("GUILD_DELETE", {"id": GUILD_ID})
+
+    assert store.get_guild(GUILD_ID) is None
+    assert store.get_channel(CHANNEL_ID) is None
+    assert store.get_member(GUILD_ID, USER_ID) is None
+    assert store.guild_members(GUILD_ID) == []
+
+
+def test_indexes_drop_entries_evicted_from_bounded_caches():
+    store = state.StateStore(channels=cache.LRUCache(4), members=cache.LRUCache(4))
+    for index in range(100):
+        store.parse_event("CHANNEL_CREATE", channel_payload(id=str(820000000000000000 + index)))
+        store.parse_event("GUILD_MEMBER_ADD", {**member_payload(str(830000000000000000 + index)), "guild_id": GUILD_ID})
+
+    assert sorted(channel.id for channel in store.guild_channels(GUILD_ID)) == [820000000000000096 + i for i in range(4)]
+    assert len(store.guild_members(GUILD_ID)) == 4
+    # Evicted IDs are pruned once the index holds twice as many IDs as its cache
+    assert len(store._StateStore__guild_channels[int(GUILD_ID)]) <= 8
+    assert len(store._StateStore__guild_members[int(GUILD_ID)]) <= 8
+
+
+def test_disabled_retention_stores_nothing():
+    store = state.StateStore(channels=False)
+    store.parse_event("CHANNEL_CREATE", channel_payload())
+
+    assert store.channels is None
+    assert store.get_channel(CHANNEL_ID) is None
+
+
+def test_compact_store_round_trips_members():
+    store = state.CompactMemberStore()
+    store.add(GUILD_ID, models.Member(member_payload(roles=[GUILD_ID], nick="nick", deaf=True)))
+
+    member = store.get_member(GUILD_ID, USER_ID)
+    assert member.nick == "nick" and member.deaf is True
+    assert member.role_ids == [int(GUILD_ID)]
+    assert store.user_ids_with_role(GUILD_ID, GUILD_ID) == [int(USER_ID)]
+    assert (GUILD_ID, USER_ID) in store and len(store) == 1
+
+
+def test_compact_store_accepts_members_without_discriminator():
+    payload = member_payload()
+    payload["user"]["discriminator"] = None
+
+    store = state.CompactMemberStore()
+    store.add(GUILD_ID, models.Member(payload))
+    store.add_payloads(GUILD_ID, [member_payload("810000000000000004")])
+    del payload["user"]["discriminator"]
+    store.add_payloads(GUILD_ID, [payload])
+
+    assert store.get_member(GUILD_ID, USER_ID).user.discriminator is None
+    assert len(store) == 2
+
+
+def test_compact_store_add_and_add_payloads_store_the_same_timestamps():
+    payload = member_payload(
+        joined_at="2021-09-01T12:00:00.999999+00:00", premium_since="2021-09-02T00:00:00.000500+00:00"
+    )
+
+    single, batch = state.CompactMemberStore(), state.CompactMemberStore()
+    single.add(GUILD_ID, models.Member(payload))
+    batch.add_payloads(GUILD_ID, [payload])
+
+    for store in (single, batch):
+        member = store.get_member(GUILD_ID, USER_ID)
+        assert utils.datetime_to_epoch(member.joined_at) == utils.iso_to_epoch(payload["joined_at"])
+        assert utils.datetime_to_epoch(member.premium_since) == utils.iso_to_epoch(payload["premium_since"])
+
+
+def test_compact_store_removes_members():
+    store = state.CompactMemberStore()
+    store.add_payloads(GUILD_ID, [member_payload(str(810000000000000010 + i)) for i in range(10)])
+
+    assert store.remove(GUILD_ID, "810000000000000013")
+    assert not store.remove(GUILD_ID, "810000000000000013")
+    assert store.get_member(GUILD_ID, "810000000000000019").user.id == 810000000000000019
+    assert len(store.guild_user_ids(GUILD_ID)) == 9
+
+
+def test_channel_update_with_fields_missing_from_the_cached_channel():
+    store = state.StateStore()
+    store.parse_event("CHANNEL_CREATE", channel_payload())
+    store.parse_event("CHANNEL_UPDATE", channel_payload(parent_id=None, topic="New"))
+
+    channel = store.get_channel(CHANNEL_ID)
+    assert channel.parent_id is None
+    assert channel.topic == "New"
@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+import pycordia
+from pycordia import models, retry
+from pycordia.testing import FakeDiscord
+
+
+def make_template() -> models.MessageTemplate:
+    embed = models.Embed.create(title=models.Field("title"), color=0x5865F2)
+    embed.add_field(name="Score", value=models.Field("score"))
+    return models.MessageTemplate(content="Results", embeds=[embed])
+
+
+def test_render_fills_fields():
+    template = make_template()
+    payload = json.loads(template.render(title="Round 1", score="42"))
+
+    assert template.fields == ["title", "score"]
+    assert payload["content"] == "Results"
+    assert payload["embeds"][0]["title"] == "Round 1"
+    assert payload["embeds"][0]["fields"][0]["value"] == "42"
+
+
+def test_render_adds_a_new_enforced_nonce():
+    template = make_template()
+    first = template.render(title="Round 1", score="42")
+    second = json.loads(template.render(title="Round 1", score="42"))
+
+    assert json.loads(first)["enforce_nonce"] is True
+    assert json.loads(first)["nonce"] != second["nonce"]
+    assert retry.RetryPolicy().is_retryable("POST", first)
+
+
+def test_send_posts_the_rendered_payload():
+    async def main():
+        async with FakeDiscord() as server:
+            client = pycordia.Client(intents=0)
+            await client.setup_http("token")
+            try:
+                message = await make_template().send("810000000000000000", title="Round 1", score="42")
+            finally:
+                await client.http.close()
+
+        assert message.content == "Results"
+        assert message.nonce is not None
+
+    asyncio.run(main())
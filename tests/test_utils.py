@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+
+from pycordia import utils
+
+
+def counted():
+    calls = []
+
+    @utils.singleflight()
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.02)
+        if value < 0:
+            raise ValueError(value)
+        return value * 2
+
+    return fetch, calls
+
+
+def test_singleflight_shares_concurrent_calls():
+    async def main():
+        fetch, calls = counted()
+        assert await asyncio.gather(fetch(1), fetch(1), fetch(2)) == [2, 2, 4]
+        assert calls == [1, 2]
+
+        # Later calls run again
+        assert await fetch(1) == 2
+        assert calls == [1, 2, 1]
+
+    asyncio.run(main())
+
+
+def test_singleflight_shares_errors():
+    async def main():
+        fetch, calls = counted()
+        results = await asyncio.gather(fetch(-1), fetch(-1), return_exceptions=True)
+
+        assert [type(result) for result in results] == [ValueError, ValueError]
+        assert calls == [-1]
+
+    asyncio.run(main())
+
+
+def test_cancelling_the_first_caller_does_not_cancel_the_others():
+    async def main():
+        fetch, calls = counted()
+        leader = asyncio.ensure_future(fetch(1))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(fetch(1))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        assert await follower == 2
+        assert calls == [1]
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+    asyncio.run(main())
+
+
+class Plain:
+    def __init__(self, id, label, style=None):
+        self.id = id
+        self.label = label
+        self.style = style
+        self._internal = "hidden"
+
+
+class Slotted:
+    __slots__ = ("id", "label", "style", "_internal")
+
+    def __init__(self, id, label, style=None):
+        self.id = id
+        self.label = label
+        self.style = style
+        self._internal = "hidden"
+
+
+class SlottedChild(Slotted):
+    __slots__ = ("extra",)
+
+
+@pytest.mark.parametrize("cls", [Plain, Slotted])
+def test_obj_to_dict_keeps_public_fields(cls):
+    obj = cls(utils.Snowflake(810000000000000000), "Click", 1)
+
+    assert utils.obj_to_dict(obj) == {"id": "810000000000000000", "label": "Click", "style": 1}
+    assert utils.obj_to_dict(obj, alias={"label": "name"}) == {"id": "810000000000000000", "name": "Click", "style": 1}
+    assert utils.obj_to_dict(obj, ignore_fields=["style"]) == {"id": "810000000000000000", "label": "Click"}
+    assert utils.obj_to_dict(obj, alias={"style": "kind"}, ignore_fields=["id", "label"]) == {"kind": 1}
+    # Serializers are cached per alias and ignored fields, so earlier calls must not leak into later ones
+    assert utils.obj_to_dict(obj) == {"id": "810000000000000000", "label": "Click", "style": 1}
+
+
+def test_obj_to_dict_leaves_out_unassigned_slots():
+    obj = SlottedChild("1", "Click")
+
+    assert utils.obj_to_dict(obj) == {"id": "1", "label": "Click", "style": None}
+    obj.extra = 2
+    assert utils.obj_to_dict(obj, alias={"extra": "more"}) == {"id": "1", "label": "Click", "style": None, "more": 2}
+
+    del obj.label
+    assert utils.obj_to_dict(obj, alias={"extra": "more"}, ignore_fields=["id"]) == {"style": None, "more": 2}
+
+
+def test_obj_from_dict_maps_aliases_and_ignores_unknown_keys():
+    obj = utils.obj_from_dict({"id": "1", "name": "Click", "unknown": True}, Plain, alias={"label": "name"})
+    assert (obj.id, obj.label, obj.style) == ("1", "Click", None)
+
+    obj = utils.obj_from_dict({"id": "1", "label": "Click", "style": 2}, Plain)
+    assert (obj.id, obj.label, obj.style) == ("1", "Click", 2)
+
+    with pytest.raises(KeyError):
+        utils.obj_from_dict({"id": "1"}, Plain, alias={"label": "name"})
+
+
+def test_obj_from_dict_reads_signatures_once(monkeypatch):
+    def make(id, label):
+        return (id, label)
+
+    assert utils.obj_from_dict({"id": "1", "label": "a"}, make) == ("1", "a")
+
+    def fail(obj):
+        raise AssertionError("signature read again")
+
+    monkeypatch.setattr(utils.inspect, "signature", fail)
+    assert utils.obj_from_dict({"id": "2", "label": "b", "style": 1}, make) == ("2", "b")
+    assert utils._parameters[make] == ("id", "label")
+
+
+TIMESTAMPS = [
+    "2021-06-01T12:34:56.789123+00:00",
+    None,
+    "2015-01-01T00:00:00+00:00",
+    "1969-12-31T23:59:59.999500+00:00",
+    "2021-06-01T14:34:56.789+02:00",
+    "2021-06-01T07:04:56.789-05:30",
+]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(utils, "numpy", None)
+    return request.param
+
+
+@pytest.mark.parametrize("timestamps", [
+    TIMESTAMPS, [stamp for stamp in TIMESTAMPS if stamp is None or stamp.endswith("+00:00")], [None, None], []
+])
+def test_isos_to_epoch_matches_iso_to_epoch(backend, timestamps):
+    assert utils.isos_to_epoch(iter(timestamps)) == [utils.iso_to_epoch(stamp) for stamp in timestamps]
+
+
+def test_isos_to_epoch_floors_sub_milliseconds_and_applies_offsets(backend):
+    assert utils.isos_to_epoch(TIMESTAMPS) == [
+        1622550896789, None, 1420070400000, -1, 1622550896789, 1622550896789
+    ]
+
+
+def test_snowflakes_to_epoch_matches_snowflake_timestamps(backend):
+    snowflakes = ["175928847299117063", 810000000000000000, "0", utils.Snowflake(2 ** 63 - 1)]
+
+    assert utils.snowflakes_to_epoch(iter(snowflakes)) == [
+        (int(flake) >> 22) + utils.DISCORD_EPOCH for flake in snowflakes
+    ]
+    assert utils.snowflakes_to_epoch([]) == []